@@ -0,0 +1,41 @@
+"""add conversation rolling summary
+
+Revision ID: 3f6c2a9d1b47
+Revises: 79133423d163
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3f6c2a9d1b47"
+down_revision: Union[str, Sequence[str], None] = "79133423d163"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "conversations",
+        sa.Column("summary", sa.Text(), nullable=True),
+    )
+    op.add_column(
+        "conversations",
+        sa.Column(
+            "summary_upto_seq",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("conversations", "summary_upto_seq")
+    op.drop_column("conversations", "summary")
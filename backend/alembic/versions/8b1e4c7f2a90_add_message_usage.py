@@ -0,0 +1,38 @@
+"""add per-turn token usage to messages
+
+Revision ID: 8b1e4c7f2a90
+Revises: 3f6c2a9d1b47
+Create Date: 2026-10-17 11:03:27.541912
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "8b1e4c7f2a90"
+down_revision: Union[str, Sequence[str], None] = "3f6c2a9d1b47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("messages", sa.Column("model", sa.String(length=64), nullable=True))
+    op.add_column("messages", sa.Column("prompt_tokens", sa.Integer(), nullable=True))
+    op.add_column("messages", sa.Column("completion_tokens", sa.Integer(), nullable=True))
+    op.add_column("messages", sa.Column("cached_tokens", sa.Integer(), nullable=True))
+    op.add_column("messages", sa.Column("embedding_tokens", sa.Integer(), nullable=True))
+    op.add_column("messages", sa.Column("cost_usd", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("messages", "cost_usd")
+    op.drop_column("messages", "embedding_tokens")
+    op.drop_column("messages", "cached_tokens")
+    op.drop_column("messages", "completion_tokens")
+    op.drop_column("messages", "prompt_tokens")
+    op.drop_column("messages", "model")
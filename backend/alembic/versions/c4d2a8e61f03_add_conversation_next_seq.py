@@ -0,0 +1,47 @@
+"""add conversation next_seq counter
+
+Revision ID: c4d2a8e61f03
+Revises: 8b1e4c7f2a90
+Create Date: 2026-10-17 14:21:05.330817
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d2a8e61f03"
+down_revision: Union[str, Sequence[str], None] = "8b1e4c7f2a90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "conversations",
+        sa.Column(
+            "next_seq",
+            sa.Integer(),
+            server_default="1",
+            nullable=False,
+        ),
+    )
+
+    ## 기존 메시지 기준으로 카운터 backfill: max(seq) + 1
+    op.execute(
+        """
+        UPDATE conversations
+        SET next_seq = COALESCE(
+            (SELECT MAX(messages.seq) FROM messages WHERE messages.conversation_id = conversations.id),
+            0
+        ) + 1
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("conversations", "next_seq")
@@ -0,0 +1,38 @@
+"""add conversation archive index
+
+Revision ID: d7a3f5b2c9e1
+Revises: c4d2a8e61f03
+Create Date: 2026-10-17 16:42:18.204551
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d7a3f5b2c9e1"
+down_revision: Union[str, Sequence[str], None] = "c4d2a8e61f03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "conversation_archives",
+        sa.Column("conversation_id", sa.String(length=64), nullable=False),
+        sa.Column("segment", sa.String(length=255), nullable=False),
+        sa.Column("offset", sa.BigInteger(), nullable=False),
+        sa.Column("length", sa.Integer(), nullable=False),
+        sa.Column("message_count", sa.Integer(), nullable=False),
+        sa.Column("last_activity_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("conversation_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("conversation_archives")
@@ -0,0 +1,49 @@
+"""add chunks and message_sources
+
+Revision ID: e5b8c1d4a7f2
+Revises: d7a3f5b2c9e1
+Create Date: 2026-10-17 18:05:44.912376
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e5b8c1d4a7f2"
+down_revision: Union[str, Sequence[str], None] = "d7a3f5b2c9e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "chunks",
+        sa.Column("chunk_id", sa.String(length=255), nullable=False),
+        sa.Column("meta", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("chunk_id"),
+    )
+    op.create_table(
+        "message_sources",
+        sa.Column("conversation_id", sa.String(length=64), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("ref_id", sa.Integer(), nullable=False),
+        sa.Column("chunk_id", sa.String(length=255), nullable=False),
+        sa.ForeignKeyConstraint(["chunk_id"], ["chunks.chunk_id"]),
+        sa.ForeignKeyConstraint(
+            ["conversation_id", "seq"],
+            ["messages.conversation_id", "messages.seq"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("conversation_id", "seq", "ref_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("message_sources")
+    op.drop_table("chunks")
@@ -0,0 +1,174 @@
+"""
+core/admission.py
+
+LLM을 호출하는 요청의 동시 실행 수를 제한하는 admission control (worker 프로세스 단위)
+
+동작
+- 슬롯(max_concurrent)이 비어 있고 대기열이 없으면 즉시 통과
+- 슬롯이 모두 사용 중이면 FIFO 대기열에서 최대 max_wait초 대기
+  - 대기열이 가득 찼으면(max_queue) 즉시 Overloaded(queue_full → 429)
+  - max_wait 안에 슬롯을 받지 못하면 Overloaded(queue_timeout → 503)
+- Retry-After: 최근 슬롯 점유 시간(EWMA) × (대기 요청 수 + 1) / max_concurrent 추정치 (1~60초)
+
+메트릭 (core.metrics, pool 라벨)
+- chatbot_admission_in_flight / chatbot_admission_queue_depth (gauge)
+- chatbot_admission_wait_seconds (histogram), chatbot_admission_rejected_total{reason} (counter)
+
+주의
+- OpenAI가 느려질 때 요청이 무한정 쌓여 gunicorn --timeout에 worker가 죽는 대신,
+  초과 부하는 빠르게 거절해 처리 중인 요청의 지연을 예측 가능하게 유지
+- 이벤트 루프 단일 스레드에서만 사용 (asyncio 전용)
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Deque, Optional
+
+from app.core.config import LLM_MAX_CONCURRENCY, LLM_MAX_QUEUE, LLM_MAX_QUEUE_WAIT_SECONDS
+from app.core.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_REJECTED,
+    ADMISSION_WAIT,
+)
+
+
+class Overloaded(Exception):
+    """슬롯을 받지 못함 (reason: queue_full | queue_timeout)"""
+
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def status_code(self) -> int:
+        ## 대기열 초과는 즉시 거절(429), 대기 후 실패는 서버 측 과부하(503)
+        return 429 if self.reason == "queue_full" else 503
+
+
+class AdmissionTicket:
+    """획득한 슬롯. release()는 여러 번 호출해도 한 번만 반납"""
+
+    def __init__(self, controller: Optional["AdmissionController"]) -> None:
+        self._controller = controller
+        self._start = time.perf_counter()
+
+    def release(self) -> None:
+        controller, self._controller = self._controller, None
+        if controller is not None:
+            controller._release(time.perf_counter() - self._start)
+
+    def __enter__(self) -> "AdmissionTicket":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class AdmissionController:
+    def __init__(
+            self,
+            max_concurrent: int,
+            max_queue: int,
+            max_wait: float,
+            pool: str = "llm",
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.pool = pool
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._avg_hold = 1.0  ## 슬롯 점유 시간 EWMA (초)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrent > 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        estimate = self._avg_hold * (len(self._waiters) + 1) / max(self.max_concurrent, 1)
+        return min(max(math.ceil(estimate), 1), 60)
+
+    async def acquire(self, max_wait: Optional[float] = None) -> AdmissionTicket:
+        """max_wait: 이번 요청의 최대 대기 시간 (기본 self.max_wait, 더 길게 늘릴 수는 없음)"""
+        if not self.enabled:
+            return AdmissionTicket(None)
+
+        if self._in_flight < self.max_concurrent and not self._waiters:
+            self._in_flight += 1
+            self._observe(0.0)
+            return AdmissionTicket(self)
+
+        if len(self._waiters) >= self.max_queue:
+            ADMISSION_REJECTED.inc(self.pool, "queue_full")
+            raise Overloaded("queue_full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters), self.pool)
+        start = time.perf_counter()
+
+        try:
+            ## shield: 타임아웃이 나도 waiter 자체는 취소하지 않고 아래에서 직접 정리
+            timeout = self.max_wait if max_wait is None else min(max_wait, self.max_wait)
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done():
+                ## 타임아웃/취소와 동시에 슬롯을 넘겨받음 → 다음 대기자에게 반납
+                self._release(None)
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            ADMISSION_QUEUE_DEPTH.set(len(self._waiters), self.pool)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            ADMISSION_REJECTED.inc(self.pool, "queue_timeout")
+            raise Overloaded("queue_timeout", self.retry_after()) from None
+
+        self._observe(time.perf_counter() - start)
+        return AdmissionTicket(self)
+
+    def _observe(self, waited: float) -> None:
+        ADMISSION_WAIT.observe(waited, self.pool)
+        ADMISSION_IN_FLIGHT.set(self._in_flight, self.pool)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters), self.pool)
+
+    def _release(self, held: Optional[float]) -> None:
+        if held is not None:
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * held
+
+        ## 대기자가 있으면 슬롯을 그대로 넘김 (in_flight 유지)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        self._in_flight -= 1
+        ADMISSION_IN_FLIGHT.set(self._in_flight, self.pool)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters), self.pool)
+
+
+@lru_cache(maxsize=1)
+def get_llm_admission() -> AdmissionController:
+    return AdmissionController(
+        max_concurrent=LLM_MAX_CONCURRENCY,
+        max_queue=LLM_MAX_QUEUE,
+        max_wait=LLM_MAX_QUEUE_WAIT_SECONDS,
+        pool="llm",
+    )
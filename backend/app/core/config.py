@@ -13,6 +13,7 @@ core/config.py
 - OPENAI_API_KEY: (필수) OpenAI API Key
 - OPENAI_MODEL: (선택) 기본값 gpt-4o-mini
 - PINECONE_API_KEY: (선택)
+- RETRIEVER_BACKEND: (선택) pinecone | local (기본값: pinecone)
 - LANGCHAIN_TRACING_V2: (선택) true/false 문자열 → bool
 - LANGSMITH_API_KEY: (선택)
 
@@ -21,7 +22,9 @@ core/config.py
 """
 
 
+import json
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 
@@ -33,6 +36,15 @@ load_dotenv()
 
 ENV = os.getenv('ENV', 'local')
 
+## 데이터 파일 경로의 기준 디렉터리 (backend/) — 실행 위치(cwd)와 무관하게 같은 파일을 가리킴
+BASE_DIR = Path(__file__).resolve().parents[2]
+
+
+def _backend_path(name: str, default: str) -> str:
+    """환경변수(없으면 default) 경로를 반환. 상대 경로는 BASE_DIR 기준으로 해석"""
+    path = Path(os.getenv(name, default))
+    return str(path if path.is_absolute() else BASE_DIR / path)
+
 
 # ======================================
 # Required settings
@@ -50,6 +62,16 @@ def validate_runtime_env():
 OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
 OPENAI_EMBEDDING_MODEL = os.getenv('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small')
 
+## 모델별 단가 (USD / 1M tokens) — 턴 단위 비용 추정용
+## MODEL_PRICING_JSON으로 덮어쓰기 가능: {"<model>": {"input": .., "cached_input": .., "output": ..}}
+MODEL_PRICING = {
+    'gpt-4o-mini': {'input': 0.15, 'cached_input': 0.075, 'output': 0.60},
+    'gpt-4o': {'input': 2.50, 'cached_input': 1.25, 'output': 10.00},
+    'text-embedding-3-small': {'input': 0.02},
+    'text-embedding-3-large': {'input': 0.13},
+}
+MODEL_PRICING.update(json.loads(os.getenv('MODEL_PRICING_JSON', '{}') or '{}'))
+
 # ======================================
 # Optional / future settings
 # ======================================
@@ -62,9 +84,128 @@ PINECONE_NAMESPACE = os.getenv("PINECONE_NAMESPACE", "")
 
 RAG_TOP_K = int(os.getenv('RAG_TOP_K', '5'))  # 검색된 문서 개수
 
+## 검색 백엔드: pinecone(기본) | local(인덱싱 파이프라인이 만든 로컬 벡터 스냅샷)
+RETRIEVER_BACKEND = os.getenv('RETRIEVER_BACKEND', 'pinecone').strip().lower()
+LOCAL_INDEX_DIR = _backend_path('LOCAL_INDEX_DIR', 'data/local_index')
+
+## Hybrid 검색: dense 결과 + lexical(BM25, 문자 n-gram) 결과를 RRF로 병합
+## (lexical 인덱스 파일이 없으면 dense 단독으로 동작)
+HYBRID_RETRIEVAL = os.getenv('HYBRID_RETRIEVAL', 'true').lower() == 'true'
+LEXICAL_INDEX_PATH = _backend_path('LEXICAL_INDEX_PATH', 'data/local_index/lexical.json')
+HYBRID_CANDIDATE_K = int(os.getenv('HYBRID_CANDIDATE_K', '10'))  # 각 검색기에서 가져올 후보 수
+RRF_K = int(os.getenv('RRF_K', '60'))
+
+## 조문 인용형 질의("…법 제10조") fast path: 법령명/조문 번호로 chunk를 직접 조회
+CITATION_FAST_PATH = os.getenv('CITATION_FAST_PATH', 'true').lower() == 'true'
+LAW_MAP_PATH = _backend_path('LAW_MAP_PATH', 'data/law_map.json')
+
+## 인덱싱 파이프라인이 갱신하는 manifest (doc sha / pipeline_version → 인덱스 버전)
+INDEX_MANIFEST_PATH = _backend_path('INDEX_MANIFEST_PATH', 'data/index_manifest.json')
+
+
+# ======================================
+# Conversation history (토큰 예산 + 누적 요약)
+# ======================================
+HISTORY_TOKEN_BUDGET = int(os.getenv('HISTORY_TOKEN_BUDGET', '1200'))  # 요약 + 대화 원문 합계 상한
+HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv('HISTORY_SUMMARY_MAX_TOKENS', '300'))
+## 후속 질문을 독립 검색 질의로 재작성 (LLM 1회 추가 호출, 기본 비활성화)
+CONDENSE_FOLLOWUPS = os.getenv('CONDENSE_FOLLOWUPS', 'false').lower() == 'true'
+## 세션별 최근 메시지 캐시 (프로세스 메모리, 0이면 비활성화)
+HISTORY_CACHE_MAX_BYTES = int(os.getenv('HISTORY_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+HISTORY_CACHE_MESSAGES = int(os.getenv('HISTORY_CACHE_MESSAGES', '20'))  # 세션당 보관 메시지 수
+
+
+# ======================================
+# Answer cache (semantic, 히스토리 없는 첫 턴 전용)
+# ======================================
+ANSWER_CACHE_ENABLED = os.getenv('ANSWER_CACHE_ENABLED', 'true').lower() == 'true'
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', '512'))
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv('ANSWER_CACHE_TTL_SECONDS', '3600'))
+ANSWER_CACHE_THRESHOLD = float(os.getenv('ANSWER_CACHE_THRESHOLD', '0.95'))  # cosine similarity
+
+
+# ======================================
+# Admission control (LLM 호출 동시 실행 제한)
+# ======================================
+## 동시에 LLM 파이프라인을 실행하는 요청 수 (0이면 비활성화)
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '32'))
+## 슬롯을 기다릴 수 있는 요청 수 (초과 시 즉시 429)
+LLM_MAX_QUEUE = int(os.getenv('LLM_MAX_QUEUE', '64'))
+## 최대 대기 시간 (초과 시 503), gunicorn --timeout(60s)보다 충분히 짧게
+LLM_MAX_QUEUE_WAIT_SECONDS = float(os.getenv('LLM_MAX_QUEUE_WAIT_SECONDS', '10'))
+
+
+# ======================================
+# Request deadline (단계별 시간 예산)
+# ======================================
+## 채팅 요청 1건의 기본/최대 처리 시간 (gunicorn --timeout 60s 이내)
+REQUEST_DEADLINE_SECONDS = float(os.getenv('REQUEST_DEADLINE_SECONDS', '40'))
+## 남은 시간 중 각 단계에 배정하는 비율 (생성 단계는 나머지 전부)
+DEADLINE_HISTORY_SHARE = float(os.getenv('DEADLINE_HISTORY_SHARE', '0.15'))
+DEADLINE_RETRIEVAL_SHARE = float(os.getenv('DEADLINE_RETRIEVAL_SHARE', '0.35'))
+## 저장/응답 전송용으로 남겨 두는 시간
+DEADLINE_RESERVE_SECONDS = float(os.getenv('DEADLINE_RESERVE_SECONDS', '1.5'))
+
+
+# ======================================
+# Outbound HTTP pools (OpenAI httpx 클라이언트 공유, Pinecone 풀)
+# ======================================
+## OpenAI(ChatOpenAI + OpenAIEmbeddings)가 공유하는 httpx 풀 — 동시 LLM 요청(LLM_MAX_CONCURRENCY) + 임베딩 여유분
+HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', '64'))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('HTTP_MAX_KEEPALIVE_CONNECTIONS', '32'))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv('HTTP_KEEPALIVE_EXPIRY_SECONDS', '60'))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv('HTTP_CONNECT_TIMEOUT_SECONDS', '5'))
+HTTP_READ_TIMEOUT_SECONDS = float(os.getenv('HTTP_READ_TIMEOUT_SECONDS', '60'))
+## 풀이 꽉 찼을 때 커넥션을 기다리는 최대 시간
+HTTP_POOL_TIMEOUT_SECONDS = float(os.getenv('HTTP_POOL_TIMEOUT_SECONDS', '10'))
+## HTTP/2는 h2 패키지가 있어야 사용 가능 (없으면 HTTP/1.1로 동작)
+HTTP_HTTP2 = os.getenv('HTTP_HTTP2', 'false').lower() == 'true'
+
+## Pinecone 동기 클라이언트(urllib3) 풀 크기 / 스레드 수
+PINECONE_POOL_MAXSIZE = int(os.getenv('PINECONE_POOL_MAXSIZE', '32'))
+PINECONE_POOL_THREADS = int(os.getenv('PINECONE_POOL_THREADS', '4'))
+
+
+# ======================================
+# Warm-up / readiness (/health/ready)
+# ======================================
+## 시작 시 백그라운드로 체인/retriever 생성, DB 연결, probe 질의 실행
+WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'true').lower() == 'true'
+WARMUP_QUERY = os.getenv('WARMUP_QUERY', '전세사기피해자 결정 신청')
+## dependency별 probe 결과 재사용 시간 / probe 1회 제한 시간
+READINESS_PROBE_TTL_SECONDS = float(os.getenv('READINESS_PROBE_TTL_SECONDS', '30'))
+READINESS_PROBE_TIMEOUT_SECONDS = float(os.getenv('READINESS_PROBE_TIMEOUT_SECONDS', '5'))
+
+
+# ======================================
+# Idempotency (채팅 턴 재전송 방지)
+# ======================================
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', str(24 * 3600)))
+IDEMPOTENCY_KEY_MAX_LENGTH = 128
+
+
+# ======================================
+# Query embedding cache
+# ======================================
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', '2048'))  # 0이면 비활성화
+## SQLite 파일 경로 (비우면 디스크 tier 비활성화, 같은 경로를 쓰는 worker 간 공유)
+EMBEDDING_CACHE_PATH = os.getenv('EMBEDDING_CACHE_PATH', '')
+
 
 # ======================================
 # Database settings
 # ======================================
 # DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./dev.db")
\ No newline at end of file
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./dev.db")
+## 비동기 엔진용 URL (미설정 시 DATABASE_URL의 드라이버를 asyncpg / aiosqlite로 치환)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")
+
+
+# ======================================
+# Conversation archive (오래된 대화 → zstd JSONL 세그먼트)
+# ======================================
+ARCHIVE_DIR = _backend_path('ARCHIVE_DIR', 'data/archive')
+ARCHIVE_IDLE_DAYS = int(os.getenv('ARCHIVE_IDLE_DAYS', '180'))  # updated_at 기준 방치 기간
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '200'))  # 트랜잭션 1회당 대화 수
+ARCHIVE_SEGMENT_MAX_BYTES = int(os.getenv('ARCHIVE_SEGMENT_MAX_BYTES', str(64 * 1024 * 1024)))
+ARCHIVE_ZSTD_LEVEL = int(os.getenv('ARCHIVE_ZSTD_LEVEL', '10'))
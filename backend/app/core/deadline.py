@@ -0,0 +1,120 @@
+"""
+core/deadline.py
+
+요청 단위 마감 시각(deadline) 전파
+
+- 라우터가 요청 시작 시 Deadline을 만들고(기본 REQUEST_DEADLINE_SECONDS, 클라이언트 헤더로 단축 가능)
+  use_deadline()으로 현재 컨텍스트에 설정
+- 서비스/체인은 current_deadline()으로 조회해 단계별 시간 예산을 계산
+  - history: 남은 시간 × DEADLINE_HISTORY_SHARE
+  - retrieval(캐시 조회, 질의 재작성, 검색): 남은 시간 × DEADLINE_RETRIEVAL_SHARE
+  - generation: 남은 시간 전부 (DEADLINE_RESERVE_SECONDS는 저장/응답용으로 남김)
+- 예산을 넘기면 DeadlineExceeded(stage) → 호출부가 축소된(degraded) 응답으로 대체
+
+주의
+- 설정된 deadline이 없으면(스크립트, 동기 invoke 경로) 시간 제한 없이 동작
+- 예산 초과 시 진행 중인 await를 취소 → 진행 중인 HTTP 요청(OpenAI, Pinecone)도 함께 취소됨
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+from app.core.config import (
+    DEADLINE_HISTORY_SHARE,
+    DEADLINE_RESERVE_SECONDS,
+    DEADLINE_RETRIEVAL_SHARE,
+    REQUEST_DEADLINE_SECONDS,
+)
+
+
+T = TypeVar("T")
+
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+
+STAGE_SHARES = {
+    "history": DEADLINE_HISTORY_SHARE,
+    "retrieval": DEADLINE_RETRIEVAL_SHARE,
+    "generation": 1.0,
+}
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, stage: str) -> None:
+        super().__init__(f"deadline exceeded during {stage}")
+        self.stage = stage
+
+
+class Deadline:
+    def __init__(self, seconds: float, reserve: float = DEADLINE_RESERVE_SECONDS) -> None:
+        self.seconds = seconds
+        self.reserve = min(reserve, seconds / 2)
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def from_header(cls, value: Optional[str], default: float = REQUEST_DEADLINE_SECONDS) -> "Deadline":
+        """클라이언트 헤더(ms)는 기본값보다 짧을 때만 적용 (잘못된 값은 무시)"""
+        seconds = default
+        if value:
+            try:
+                requested = float(value) / 1000
+            except ValueError:
+                requested = 0.0
+            if requested > 0:
+                seconds = min(requested, default)
+        return cls(seconds)
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def budget(self, stage: str) -> float:
+        """이 단계에 쓸 수 있는 시간(초) — 저장/응답용 reserve를 뺀 남은 시간 × 단계 비율"""
+        return max(self.remaining() - self.reserve, 0.0) * STAGE_SHARES[stage]
+
+    def until(self, stage: str) -> float:
+        """이 단계 예산이 끝나는 이벤트 루프 시각 (asyncio.timeout_at용)"""
+        return asyncio.get_running_loop().time() + self.budget(stage)
+
+    async def run(self, awaitable: Awaitable[T], stage: str) -> T:
+        ## wait_for와 달리 같은 task에서 실행 → ContextVar(사용량/타이밍) 그대로 공유
+        timeout = asyncio.timeout_at(self.until(stage))
+        try:
+            async with timeout:
+                return await awaitable
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+            raise DeadlineExceeded(stage) from None
+
+
+_deadline_ctx: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _deadline_ctx.get()
+
+
+@contextmanager
+def use_deadline(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    token = _deadline_ctx.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline_ctx.reset(token)
+
+
+async def within(awaitable: Awaitable[T], stage: str) -> T:
+    """현재 deadline의 단계 예산 안에서 실행 (deadline이 없으면 그대로 await)"""
+    deadline = current_deadline()
+    if deadline is None:
+        return await awaitable
+    return await deadline.run(awaitable, stage)
@@ -0,0 +1,218 @@
+"""
+core/http_clients.py
+
+외부 API 호출용 공유 httpx 커넥션 풀 (동기 / 비동기 각 1개, 프로세스 단위)
+
+- ChatOpenAI(chain_builder), OpenAIEmbeddings(embeddings_service)에 http_client / http_async_client로 주입
+  → 서비스마다 기본 설정 풀을 따로 만들지 않고, 턴마다 TLS handshake를 반복하지 않음 (keep-alive)
+- 풀 크기 / keep-alive / timeout / HTTP/2는 core.config의 HTTP_* 설정으로 조정
+  - HTTP_POOL_TIMEOUT_SECONDS: 풀이 가득 찼을 때 커넥션 대기 한도 (초과 시 httpx.PoolTimeout)
+- 풀 사용량 메트릭 (core.metrics, client=sync|async)
+  - chatbot_http_client_in_flight: 응답 본문이 닫힐 때까지 커넥션을 점유한 요청 수 (스트리밍 포함)
+  - chatbot_http_client_connections{state=open|idle}: 요청이 끝날 때마다 풀 상태로 갱신
+  - chatbot_http_client_requests_total{host, status}
+
+주의
+- 비동기 풀은 처음 사용한 이벤트 루프에 묶임 → app.main lifespan 종료 시 close_http_clients()로 정리
+- Pinecone SDK는 httpx가 아닌 자체 클라이언트(urllib3 / aiohttp)를 쓰므로 retriever_service에서 별도 설정
+"""
+
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, Iterator
+
+import httpx
+
+from app.core.config import (
+    HTTP_CONNECT_TIMEOUT_SECONDS,
+    HTTP_HTTP2,
+    HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_POOL_TIMEOUT_SECONDS,
+    HTTP_READ_TIMEOUT_SECONDS,
+)
+from app.core.logger import get_logger
+from app.core.metrics import HTTP_CLIENT_CONNECTIONS, HTTP_CLIENT_IN_FLIGHT, HTTP_CLIENT_REQUESTS
+
+logger = get_logger("chatbot-law-prod.http_clients")
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=HTTP_CONNECT_TIMEOUT_SECONDS,
+        read=HTTP_READ_TIMEOUT_SECONDS,
+        write=HTTP_READ_TIMEOUT_SECONDS,
+        pool=HTTP_POOL_TIMEOUT_SECONDS,
+    )
+
+
+def _http2_enabled() -> bool:
+    if not HTTP_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP_HTTP2=true but the h2 package is not installed. Using HTTP/1.1.")
+        return False
+    return True
+
+
+# -----------------------------------------------------------------------------
+# Instrumented transports
+# -----------------------------------------------------------------------------
+class _PoolObserver:
+    """요청 1건의 커넥션 점유 구간(in-flight)과 종료 후 풀 상태를 메트릭에 기록"""
+
+    def __init__(self, name: str, pool: Any) -> None:
+        self.name = name
+        self.pool = pool  ## httpcore 풀 (httpx transport 내부 구현 — 없으면 커넥션 게이지 생략)
+
+    def start(self) -> Callable[[], None]:
+        HTTP_CLIENT_IN_FLIGHT.inc(self.name)
+        done = False
+
+        def finish() -> None:
+            nonlocal done
+            if done:
+                return
+            done = True
+            HTTP_CLIENT_IN_FLIGHT.dec(self.name)
+            self.observe_pool()
+
+        return finish
+
+    def observe_pool(self) -> None:
+        connections = getattr(self.pool, "connections", None)
+        if connections is None:
+            return
+        connections = list(connections)
+        HTTP_CLIENT_CONNECTIONS.set(len(connections), self.name, "open")
+        HTTP_CLIENT_CONNECTIONS.set(sum(1 for c in connections if c.is_idle()), self.name, "idle")
+
+
+class _TrackedStream(httpx.SyncByteStream):
+    def __init__(self, inner: httpx.SyncByteStream, finish: Callable[[], None]) -> None:
+        self._inner = inner
+        self._finish = finish
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._inner
+
+    def close(self) -> None:
+        try:
+            self._inner.close()
+        finally:
+            self._finish()
+
+
+class _AsyncTrackedStream(httpx.AsyncByteStream):
+    def __init__(self, inner: httpx.AsyncByteStream, finish: Callable[[], None]) -> None:
+        self._inner = inner
+        self._finish = finish
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._inner:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._inner.aclose()
+        finally:
+            self._finish()
+
+
+class InstrumentedTransport(httpx.BaseTransport):
+    def __init__(self, inner: httpx.HTTPTransport, name: str = "sync") -> None:
+        self._inner = inner
+        self._observer = _PoolObserver(name, getattr(inner, "_pool", None))
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        finish = self._observer.start()
+        try:
+            response = self._inner.handle_request(request)
+        except BaseException:
+            finish()
+            HTTP_CLIENT_REQUESTS.inc(self._observer.name, request.url.host, "error")
+            raise
+        HTTP_CLIENT_REQUESTS.inc(self._observer.name, request.url.host, str(response.status_code))
+        response.stream = _TrackedStream(response.stream, finish)
+        return response
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+class AsyncInstrumentedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncHTTPTransport, name: str = "async") -> None:
+        self._inner = inner
+        self._observer = _PoolObserver(name, getattr(inner, "_pool", None))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        finish = self._observer.start()
+        try:
+            response = await self._inner.handle_async_request(request)
+        except BaseException:
+            ## 취소(deadline 초과 등)도 커넥션 점유 종료로 기록
+            finish()
+            HTTP_CLIENT_REQUESTS.inc(self._observer.name, request.url.host, "error")
+            raise
+        HTTP_CLIENT_REQUESTS.inc(self._observer.name, request.url.host, str(response.status_code))
+        response.stream = _AsyncTrackedStream(response.stream, finish)
+        return response
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+# -----------------------------------------------------------------------------
+# Shared clients
+# -----------------------------------------------------------------------------
+def _client_kwargs() -> Dict[str, Any]:
+    return {"timeout": _timeout(), "follow_redirects": True}
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    http2 = _http2_enabled()
+    logger.info(
+        "Initializing shared sync HTTP pool. max_connections=%d, keepalive=%d, http2=%s",
+        HTTP_MAX_CONNECTIONS,
+        HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        http2,
+    )
+    transport = httpx.HTTPTransport(limits=_limits(), http2=http2)
+    return httpx.Client(transport=InstrumentedTransport(transport, "sync"), **_client_kwargs())
+
+
+@lru_cache(maxsize=1)
+def get_async_http_client() -> httpx.AsyncClient:
+    http2 = _http2_enabled()
+    logger.info(
+        "Initializing shared async HTTP pool. max_connections=%d, keepalive=%d, http2=%s",
+        HTTP_MAX_CONNECTIONS,
+        HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        http2,
+    )
+    transport = httpx.AsyncHTTPTransport(limits=_limits(), http2=http2)
+    return httpx.AsyncClient(transport=AsyncInstrumentedTransport(transport, "async"), **_client_kwargs())
+
+
+async def close_http_clients() -> None:
+    """생성된 공유 클라이언트만 닫음 (다음 사용 시 새로 생성)"""
+    if get_async_http_client.cache_info().currsize:
+        await get_async_http_client().aclose()
+        get_async_http_client.cache_clear()
+    if get_http_client.cache_info().currsize:
+        get_http_client().close()
+        get_http_client.cache_clear()
@@ -0,0 +1,303 @@
+"""
+core/metrics.py
+
+단계별 지연시간(latency) 측정 및 Prometheus 텍스트 포맷 노출용 경량 메트릭 모듈
+
+주요 역할
+- Histogram: 누적 bucket/sum/count를 보관하는 스레드 안전 히스토그램 (label 지원)
+- Counter / Gauge: 누적 카운터 / 현재 값 (label 지원)
+- stage(name): with 블록의 소요 시간을 STAGE_LATENCY{stage=name}에 기록
+  + 요청 단위 타이밍(ContextVar)에도 누적 → Server-Timing 헤더로 노출
+- render_prometheus(): 등록된 모든 메트릭을 text/plain; version=0.0.4 포맷으로 직렬화
+
+단계(stage) 이름
+- history / summarize / cache / embed / retrieve / format / llm / persist
+
+주의
+- prometheus_client 의존성 없이 필요한 최소 기능만 구현
+- 값은 프로세스(worker) 단위. gunicorn 다중 worker면 scrape마다 다른 worker가 응답할 수 있음
+"""
+
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    """Prometheus histogram (cumulative buckets + _sum + _count)"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        ## label values -> (bucket counts(+Inf 포함), sum, count)
+        self._series: Dict[LabelValues, List] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        key = tuple(str(v) for v in labelvalues)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[key] = series
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            items = sorted((k, [list(v[0]), v[1], v[2]]) for k, v in self._series.items())
+
+        for labelvalues, (counts, total, count) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = _format_labels(self.labelnames, labelvalues, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class _Scalar:
+    """label values별 단일 값을 보관하는 Counter / Gauge 공통 구현"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, float] = {}
+
+    def _add(self, amount: float, labelvalues: Sequence[str]) -> None:
+        key = tuple(str(v) for v in labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        with self._lock:
+            return self._values.get(tuple(str(v) for v in labelvalues), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Scalar):
+    kind = "counter"
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self._add(amount, labelvalues)
+
+
+class Gauge(_Scalar):
+    kind = "gauge"
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self._add(amount, labelvalues)
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self._add(-amount, labelvalues)
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[tuple(str(v) for v in labelvalues)] = float(value)
+
+
+Metric = Union[Histogram, Counter, Gauge]
+
+_REGISTRY: List[Metric] = []
+
+
+def register(metric: Metric) -> Metric:
+    _REGISTRY.append(metric)
+    return metric
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------------------------------------------------------
+# Built-in metrics
+# -----------------------------------------------------------------------------
+REQUEST_LATENCY = register(
+    Histogram(
+        "chatbot_http_request_duration_seconds",
+        "HTTP request latency by route template and status code.",
+        ("method", "route", "status"),
+    )
+)
+
+STAGE_LATENCY = register(
+    Histogram(
+        "chatbot_stage_duration_seconds",
+        "Latency of a chat turn stage (history, embed, retrieve, format, llm, persist, ...).",
+        ("stage",),
+    )
+)
+
+## Admission control (core.admission)
+ADMISSION_IN_FLIGHT = register(
+    Gauge(
+        "chatbot_admission_in_flight",
+        "LLM-bound requests currently holding an admission slot.",
+        ("pool",),
+    )
+)
+
+ADMISSION_QUEUE_DEPTH = register(
+    Gauge(
+        "chatbot_admission_queue_depth",
+        "LLM-bound requests waiting for an admission slot.",
+        ("pool",),
+    )
+)
+
+ADMISSION_WAIT = register(
+    Histogram(
+        "chatbot_admission_wait_seconds",
+        "Time spent waiting for an admission slot (admitted requests only).",
+        ("pool",),
+    )
+)
+
+ADMISSION_REJECTED = register(
+    Counter(
+        "chatbot_admission_rejected_total",
+        "LLM-bound requests rejected by admission control (queue_full, queue_timeout).",
+        ("pool", "reason"),
+    )
+)
+
+## Outbound HTTP pools (core.http_clients)
+HTTP_CLIENT_IN_FLIGHT = register(
+    Gauge(
+        "chatbot_http_client_in_flight",
+        "Outbound requests holding a pooled connection (until the response body is closed).",
+        ("client",),
+    )
+)
+
+HTTP_CLIENT_CONNECTIONS = register(
+    Gauge(
+        "chatbot_http_client_connections",
+        "Connections in the outbound HTTP pool by state (open, idle).",
+        ("client", "state"),
+    )
+)
+
+HTTP_CLIENT_REQUESTS = register(
+    Counter(
+        "chatbot_http_client_requests_total",
+        "Outbound HTTP requests by host and status code (error = transport failure).",
+        ("client", "host", "status"),
+    )
+)
+
+## Query embedding cache (service.embeddings_service)
+EMBEDDING_CACHE_LOOKUPS = register(
+    Counter(
+        "chatbot_embedding_cache_lookups_total",
+        "Query embedding cache lookups by result (hit_memory, hit_disk, miss).",
+        ("result",),
+    )
+)
+
+
+# -----------------------------------------------------------------------------
+# Per-request stage timings (Server-Timing)
+# -----------------------------------------------------------------------------
+_timings_ctx: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+
+def start_request_timings() -> Dict[str, float]:
+    """
+    요청 시작 시 middleware에서 호출.
+    dict 객체 자체를 공유하므로 call_next 이후 하위 task에서 기록한 값도 보임
+    """
+    timings: Dict[str, float] = {}
+    _timings_ctx.set(timings)
+    return timings
+
+
+def clear_request_timings() -> None:
+    _timings_ctx.set(None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """with 블록 소요 시간을 단계 히스토그램 + 요청 타이밍(ms, 같은 단계는 합산)에 기록"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.observe(elapsed, name)
+        timings = _timings_ctx.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed * 1000
+
+
+def format_server_timing(timings: Dict[str, float], total_ms: Optional[float] = None) -> str:
+    """Server-Timing 헤더 값: 'history;dur=3.1, llm;dur=812.4, total;dur=830.0'"""
+    parts = [f"{name};dur={ms:.1f}" for name, ms in timings.items()]
+    if total_ms is not None:
+        parts.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(parts)
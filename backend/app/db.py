@@ -7,19 +7,34 @@ SQLAlchemy 엔진/세션(SessionLocal) 생성과 FastAPI 의존성 주입(get_db
 - DATABASE_URL 환경변수 기반으로 DB 엔진 생성 (기본: sqlite:///./test.db)
 - SessionLocal(sessionmaker) 생성
 - FastAPI Depends로 사용할 get_db() 제너레이터 제공 (요청 단위 세션 열고 닫기)
+- 비동기 엔진/세션: get_async_engine(), get_async_sessionmaker(), get_async_db()
+  - Postgres → asyncpg, SQLite → aiosqlite (ASYNC_DATABASE_URL로 직접 지정 가능)
+  - API 라우터는 AsyncSession을 사용해 쿼리마다 스레드풀을 거치지 않음
+  - 동기 엔진/세션은 Alembic, scripts, 배치 작업용으로 유지
 
 주의
 - .env 로딩은 app.core.config에서만 수행
 - 이 모듈은 환경변수를 직접 로드하지 않고, config 값을 import하여 사용
+- 비동기 엔진은 처음 사용할 때 생성 (async 드라이버가 없는 Alembic/스크립트 환경에서도 import 가능)
 """
 
 
 from __future__ import annotations
 
+from functools import lru_cache
+from typing import AsyncIterator
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker
 
-from app.core.config import DATABASE_URL
+from app.core.config import ASYNC_DATABASE_URL, DATABASE_URL
 
 
 ## SQLite 전용 옵션 분기
@@ -42,4 +57,53 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# ======================================
+# Async engine / session
+# ======================================
+_ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """postgresql(+psycopg2):// → postgresql+asyncpg://, sqlite:// → sqlite+aiosqlite://"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    driver = _ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ValueError(f"No async driver configured for database backend: {backend}")
+    return parsed.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    url = ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+
+    if url.startswith("sqlite"):
+        return create_async_engine(url, echo=False)
+
+    return create_async_engine(
+        url,
+        echo=False,
+        pool_pre_ping=True,
+        pool_recycle=300,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    ## expire_on_commit=False: 커밋 후 속성 접근 시 암묵적 lazy load(= async 환경에서 오류) 방지
+    return async_sessionmaker(
+        bind=get_async_engine(),
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -5,35 +5,62 @@ FastAPI 애플리케이션 엔트리 포인트
 
 역할
 - FastAPI 앱 객체 생성
-- 라우터(chat, history, health) 등록 및 API prefix 구성
+- 라우터(chat, history, usage, health, metrics) 등록 및 API prefix 구성
   - /api/chat/...
   - /api/conversations/...
-  - /health
+  - /api/usage
+  - /health, /health/ready
+  - /metrics (Prometheus)
+- 요청 단위 request_id / 지연시간 히스토그램 / Server-Timing 헤더 (middleware)
+- lifespan: 시작 시 백그라운드 warm-up (체인/retriever 생성, DB 연결, probe 질의)
+  → 완료 전까지 /health/ready는 503, 서버는 바로 요청을 받을 수 있음 (WARMUP_ENABLED=false로 끔)
+  종료 시 공유 HTTP 풀(core.http_clients) / Pinecone 세션 정리
 
 운영 참고
 - 배포 환경(uvicorn/gunicorn, EB 등)에서 이 모듈의 app 객체를 로드하여 실행
 """
 
+import asyncio
 import time
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.responses import Response
 
-from app.routers import chat, history, health
+from app.routers import chat, history, health, metrics, usage
 from app.core.request_id import (
     REQUEST_ID_HEADER,
     generate_request_id,
     set_request_id,
 )
 from app.core.logger import get_logger
-from app.core.config import validate_runtime_env
+from app.core.metrics import (
+    REQUEST_LATENCY,
+    clear_request_timings,
+    format_server_timing,
+    start_request_timings,
+)
+from app.core.config import WARMUP_ENABLED, validate_runtime_env
+from app.service.warmup_service import release_pools, warm_up
 
 logger = get_logger("Chatbot-law-prod.middleware.request_id")
 validate_runtime_env()  ## 앱 실행 시점에 환경변수 검증
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ## warm-up은 기다리지 않음 (gunicorn worker 부팅 timeout과 무관하게 진행)
+    task = asyncio.create_task(warm_up()) if WARMUP_ENABLED else None
+    try:
+        yield
+    finally:
+        if task is not None and not task.done():
+            task.cancel()
+        await release_pools()
+
+
 ## app 객체 생성
-app = FastAPI(title="Chatbot Law API")
+app = FastAPI(title="Chatbot Law API", lifespan=lifespan)
 
 ## CORS
 origins = [
@@ -59,24 +86,42 @@ async def request_id_middleware(request: Request, call_next):
     request_id = request.headers.get(REQUEST_ID_HEADER) or generate_request_id()
     ## 저장
     set_request_id(request_id)
+    ## 단계별 타이밍 수집 시작 (core.metrics.stage가 누적 → Server-Timing 헤더)
+    timings = start_request_timings()
+    status = 500
 
     try:
         response: Response = await call_next(request)
+        status = response.status_code
     finally:
         duration_ms = (time.perf_counter() - start) * 1000
+        ## 라벨 cardinality를 막기 위해 실제 path 대신 라우트 템플릿 사용
+        route = request.scope.get("route")
+        REQUEST_LATENCY.observe(
+            duration_ms / 1000,
+            request.method,
+            getattr(route, "path", "unmatched"),
+            str(status),
+        )
         ## logger 포맷에 request_id가 자동 포함됨
         logger.info(
             f'{request.method} {request.url.path} completed in {duration_ms: .2f}ms'
         )
         ## 다음 요청에 섞이지 않게 초기화
         set_request_id(None)
+        clear_request_timings()
 
     ## 응답헤더에 X-Request-ID 포함하여 클라이언트에 전송
     response.headers[REQUEST_ID_HEADER] = request_id
+    ## SSE(StreamingResponse)는 본문 생성 전에 call_next가 반환 → Server-Timing/total은 첫 바이트 이전 단계만 포함
+    ## (history / llm / persist 등 스트림 중 단계는 /metrics의 stage 히스토그램에만 기록)
+    response.headers["Server-Timing"] = format_server_timing(timings, duration_ms)
     return response  
       
 
 ## 라우터 등록 (라우트 테이블에 등록)
 app.include_router(chat.router, prefix="/api")
 app.include_router(history.router, prefix="/api")
-app.include_router(health.router)
\ No newline at end of file
+app.include_router(usage.router, prefix="/api")
+app.include_router(health.router)
+app.include_router(metrics.router)
\ No newline at end of file
@@ -6,13 +6,20 @@ models/chat.py
 구성:
 - Conversation: 하나의 대화 세션(채팅방)을 나타내는 엔티티
 - Message: 대화 내 개별 메시지(user / assistant)
+- Chunk: assistant 답변의 근거(source) 청크 메타데이터 (chunk_id 기준 중복 제거)
+- MessageSource: assistant 메시지 ↔ 근거 청크 참조 (인용 번호 id 포함)
+- ConversationArchive: 아카이브된(삭제된) 대화의 세그먼트 파일 위치 인덱스
+- IdempotencyRecord: Idempotency-Key 헤더별 채팅 턴 응답 (TTL 동안 재전송 요청에 그대로 재생)
 
 설계 특징:
 - Conversation은 session_id(UUID 문자열)를 Primary Key로 사용
 - Message는 seq 필드를 통해 대화 내 순서를 명시적으로 보장
+- seq는 Conversation.next_seq 카운터에서 원자적으로 할당
 - (conversation_id, seq) 유니크 인덱스로 순서 중복 및 경합 방지
 - 최신 대화 조회 성능 향상을 위해 updated_at 인덱스 적용
 - cascade="all, delete-orphan"으로 대화 삭제 시 메시지 자동 정리
+- 오래 방치된 대화는 archive_service가 zstd JSONL 세그먼트로 옮기고 행을 삭제
+  (conversation_archives에 세그먼트/오프셋을 남겨 요청 시 복원)
 
 의도:
 - LLM 호출(call_llm) 시 이전 대화 컨텍스트를 안정적으로 재구성
@@ -28,11 +35,15 @@ models/chat.py
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Literal
+from typing import List, Literal, Optional
 
 from sqlalchemy import (
+    JSON,
+    BigInteger,
     DateTime,
+    Float,
     ForeignKey,
+    ForeignKeyConstraint,
     Index,
     UniqueConstraint,
     Integer,
@@ -68,6 +79,24 @@ class Conversation(Base):
         nullable=False,
     )
 
+    ## 다음 메시지에 할당할 seq (repository.append_message가 UPDATE ... RETURNING으로 원자적 증가)
+    next_seq: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+    )
+
+    ## 토큰 예산을 넘는 오래된 대화의 누적 요약 (v0.6.x)
+    ## summary_upto_seq: 요약에 반영된 마지막 메시지 seq (이후 메시지만 원문으로 재사용)
+    summary: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    summary_upto_seq: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+
     ## 최신순 조회/정렬에 유용
     __table_args__ = (
         Index("ix_conversations_updated_at", "updated_at"),
@@ -101,6 +130,15 @@ class Message(Base):
     ## 대화 내 순서 보장용 (pagination 시 안정적 정렬에 필요)
     seq: Mapped[int] = mapped_column(Integer, nullable=False)
 
+    ## 턴 단위 토큰/비용 (assistant 메시지에만 기록, user 메시지는 NULL)
+    ## cost_usd는 config.MODEL_PRICING 기준 추정치
+    model: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    prompt_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    completion_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    cached_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    embedding_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    cost_usd: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), 
         # default=datetime.utcnow, 
@@ -122,4 +160,90 @@ class Message(Base):
     conversation: Mapped["Conversation"] = relationship(
         back_populates="messages",
     )
-    
\ No newline at end of file
+
+
+class Chunk(Base):
+    __tablename__ = "chunks"
+
+    ## chain_builder의 chunk_id ("source::doc_sha[:12]::chunk_index"), 없으면 메타데이터 해시
+    chunk_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+
+    ## API sources 항목에서 인용 번호(id)를 뺀 나머지 필드 (citation, law_title, snippet, ...)
+    meta: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+class MessageSource(Base):
+    __tablename__ = "message_sources"
+
+    ## messages.id 대신 (conversation_id, seq)로 참조 → 턴 저장 시 INSERT ... RETURNING 왕복 없음
+    conversation_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    ## API sources[n].id (답변 본문 인용 번호 [n]과 동일)
+    ref_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    chunk_id: Mapped[str] = mapped_column(
+        String(255),
+        ForeignKey("chunks.chunk_id"),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["conversation_id", "seq"],
+            ["messages.conversation_id", "messages.seq"],
+            ondelete="CASCADE",
+        ),
+    )
+
+
+class ConversationArchive(Base):
+    __tablename__ = "conversation_archives"
+
+    ## 아카이브 시점에 conversations 행은 삭제되므로 FK 없음
+    conversation_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    ## ARCHIVE_DIR 기준 세그먼트 파일 이름 + 대화 1건의 zstd frame 위치
+    segment: Mapped[str] = mapped_column(String(255), nullable=False)
+    offset: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    length: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    message_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_activity_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+class IdempotencyRecord(Base):
+    __tablename__ = "idempotency_keys"
+
+    ## 키는 세션 범위 (다른 세션에서 같은 키를 써도 충돌하지 않음)
+    session_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    key: Mapped[str] = mapped_column(String(128), primary_key=True)
+
+    ## 요청 본문 해시 — 같은 키를 다른 질문에 재사용하면 거부
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    ## 채팅 API 응답 본문 (session_id, answer, sources, usage)
+    response: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        ## 만료 행 정리용
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
@@ -0,0 +1,331 @@
+"""
+repository/archive.py
+
+오래 방치된 대화의 아카이브 저장소 (zstd JSONL 세그먼트 + conversation_archives 인덱스)
+
+세그먼트 형식
+- ARCHIVE_DIR/conversations-<UTC 시각>-<번호>.jsonl.zst
+- 대화 1건 = 독립된 zstd frame 1개 (frame들을 이어 붙인 파일 → 일반 zstd 도구로도 전체 해제 가능)
+- frame 내용은 JSONL
+  - 첫 줄: {"type": "conversation", "id", "created_at", "updated_at", "next_seq", "summary", "summary_upto_seq"}
+  - 이후: {"type": "message", "seq", "role", "content", "created_at", <usage 컬럼>, ["sources"]}
+    (sources는 히스토리 API와 같은 형식, 근거가 있는 assistant 메시지에만)
+- conversation_archives에 (segment, offset, length)를 남겨 대화 1건만 읽어 복원
+
+핵심 기능
+- SegmentWriter: frame append + 크기 기준 세그먼트 교체, 커밋 전 fsync
+- read_archived_conversation(): 인덱스 위치의 frame 1개를 읽어 (conversation, messages) 반환
+- select_idle_conversations / iter_archive_messages / load_archive_sources / delete_archived:
+  아카이브 배치 작업용 (동기 Session)
+- restore_conversation: 인덱스 조회 → 행 재삽입 → 인덱스 삭제 (동기 Session)
+  (비동기 버전은 repository.archive_async)
+
+주의
+- 세그먼트 파일은 append-only. 복원된 대화의 frame은 파일에 남음 (인덱스 행만 삭제)
+- chunks는 대화 간 공유되는 청크 메타(코퍼스 크기로 상한)이므로 아카이브 시 삭제하지 않음
+"""
+
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import zstandard
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import ARCHIVE_DIR, ARCHIVE_SEGMENT_MAX_BYTES, ARCHIVE_ZSTD_LEVEL
+from app.core.logger import get_logger
+from app.models.chat import Chunk, Conversation, ConversationArchive, Message, MessageSource
+from app.repository.chat import (
+    USAGE_COLUMNS,
+    _insert_message_sources_stmt,
+    _source_rows,
+    insert_chunks,
+)
+from app.repository.history_cache import get_history_cache
+
+
+logger = get_logger('chatbot-law-prod.repository.archive')
+
+CONVERSATION_FIELDS = ("id", "created_at", "updated_at", "next_seq", "summary", "summary_upto_seq")
+MESSAGE_FIELDS = ("seq", "role", "content", "created_at") + USAGE_COLUMNS
+
+
+# -----------------------------------------------------------------------------
+# Segment files
+# -----------------------------------------------------------------------------
+def _to_json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _from_json_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def encode_conversation(
+        conversation: Dict[str, Any],
+        messages: Iterable[Dict[str, Any]],
+        sources: Optional[Dict[int, List[Dict[str, Any]]]] = None,
+) -> bytes:
+    """대화 1건을 JSONL(utf-8)로 직렬화 (첫 줄 conversation, 이후 message; sources: seq → 근거 목록)"""
+    sources = sources or {}
+    lines = [json.dumps(
+        {"type": "conversation", **{k: _to_json_value(conversation[k]) for k in CONVERSATION_FIELDS}},
+        ensure_ascii=False,
+    )]
+    for m in messages:
+        record = {"type": "message", **{k: _to_json_value(m[k]) for k in MESSAGE_FIELDS}}
+        if m["seq"] in sources:
+            record["sources"] = sources[m["seq"]]
+        lines.append(json.dumps(record, ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def decode_conversation(data: bytes) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    conversation: Dict[str, Any] = {}
+    messages: List[Dict[str, Any]] = []
+
+    for line in data.decode("utf-8").splitlines():
+        if not line:
+            continue
+        record = json.loads(line)
+        kind = record.pop("type")
+        record["created_at"] = _from_json_datetime(record.get("created_at"))
+        if kind == "conversation":
+            record["updated_at"] = _from_json_datetime(record.get("updated_at"))
+            conversation = record
+        elif kind == "message":
+            messages.append(record)
+
+    return conversation, messages
+
+
+class SegmentWriter:
+    """
+    대화 단위 zstd frame을 세그먼트 파일에 이어 쓰고 (segment, offset, length)를 반환
+    - 세그먼트가 max_bytes를 넘으면 다음 파일로 교체
+    - sync(): DB 커밋 전에 호출 (인덱스가 가리키는 바이트가 디스크에 있도록)
+    """
+
+    def __init__(
+            self,
+            directory: str = ARCHIVE_DIR,
+            max_bytes: int = ARCHIVE_SEGMENT_MAX_BYTES,
+            level: int = ARCHIVE_ZSTD_LEVEL,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._compressor = zstandard.ZstdCompressor(level=level, write_content_size=True)
+        self._prefix = datetime.now(timezone.utc).strftime("conversations-%Y%m%dT%H%M%SZ")
+        self._index = 0
+        self._file = None
+        self._name: Optional[str] = None
+        self.segments: List[str] = []
+
+    def write(self, payload: bytes) -> Tuple[str, int, int]:
+        frame = self._compressor.compress(payload)
+
+        if self._file is None or self._file.tell() + len(frame) > self.max_bytes:
+            self._open_next()
+
+        offset = self._file.tell()
+        self._file.write(frame)
+        return self._name, offset, len(frame)
+
+    def sync(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "SegmentWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _open_next(self) -> None:
+        self.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._index += 1
+        self._name = f"{self._prefix}-{self._index:04d}.jsonl.zst"
+        ## 같은 이름이 있으면 덮어쓰지 않도록 'xb'
+        self._file = open(self.directory / self._name, "xb")
+        self.segments.append(self._name)
+
+
+def read_archived_conversation(
+        segment: str,
+        offset: int,
+        length: int,
+        directory: Optional[str] = None,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """세그먼트에서 frame 1개만 읽어 (conversation, messages)로 복원 (directory 기본값: ARCHIVE_DIR)"""
+    with open(Path(directory or ARCHIVE_DIR) / segment, "rb") as f:
+        f.seek(offset)
+        frame = f.read(length)
+
+    return decode_conversation(zstandard.ZstdDecompressor().decompress(frame))
+
+
+# -----------------------------------------------------------------------------
+# Statement builders (repository.archive_async와 공유)
+# -----------------------------------------------------------------------------
+def _idle_conversations_stmt(cutoff: datetime, limit: int):
+    ## ix_conversations_updated_at 사용, 배치 간 경합을 피하려고 잠긴 행은 건너뜀 (Postgres)
+    return (
+        select(*(getattr(Conversation, k) for k in CONVERSATION_FIELDS))
+        .where(Conversation.updated_at < cutoff)
+        .order_by(Conversation.updated_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def _archive_messages_stmt(conversation_ids: List[str]):
+    return (
+        select(Message.conversation_id, *(getattr(Message, k) for k in MESSAGE_FIELDS))
+        .where(Message.conversation_id.in_(conversation_ids))
+        .order_by(Message.conversation_id, Message.seq)
+    )
+
+
+def _archive_sources_stmt(conversation_ids: List[str]):
+    return (
+        select(MessageSource.conversation_id, MessageSource.seq, MessageSource.ref_id, Chunk.meta)
+        .join(Chunk, Chunk.chunk_id == MessageSource.chunk_id)
+        .where(MessageSource.conversation_id.in_(conversation_ids))
+        .order_by(MessageSource.conversation_id, MessageSource.seq, MessageSource.ref_id)
+    )
+
+
+def _archive_entry_stmt(conversation_id: str):
+    return select(ConversationArchive).where(ConversationArchive.conversation_id == conversation_id)
+
+
+def _restore_conversation_stmt(conversation: Dict[str, Any]):
+    ## updated_at은 서버 기본값(now) → 복원 직후 다시 아카이브되지 않음
+    values = {k: conversation[k] for k in CONVERSATION_FIELDS if k != "updated_at"}
+    return insert(Conversation).values(**values)
+
+
+def _restore_message_rows(conversation_id: str, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {"conversation_id": conversation_id, **{k: m.get(k) for k in MESSAGE_FIELDS}}
+        for m in messages
+    ]
+
+
+def _restore_source_rows(
+        conversation_id: str,
+        messages: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """아카이브 message 레코드의 sources → (chunks 행, message_sources 행)"""
+    chunks: Dict[str, Dict[str, Any]] = {}
+    refs: List[Dict[str, Any]] = []
+
+    for m in messages:
+        if not m.get("sources"):
+            continue
+        chunk_rows, ref_rows = _source_rows(conversation_id, m["seq"], m["sources"])
+        for row in chunk_rows:
+            chunks.setdefault(row["chunk_id"], row)
+        refs.extend(ref_rows)
+
+    return [chunks[k] for k in sorted(chunks)], refs
+
+
+def _delete_archive_entry_stmt(conversation_id: str):
+    return delete(ConversationArchive).where(ConversationArchive.conversation_id == conversation_id)
+
+
+# -----------------------------------------------------------------------------
+# Archive job (sync Session)
+# -----------------------------------------------------------------------------
+def select_idle_conversations(db: Session, cutoff: datetime, limit: int) -> List[Any]:
+    """updated_at < cutoff 대화를 오래된 순으로 limit개 조회하고 행 잠금 (트랜잭션 시작)"""
+    return db.execute(_idle_conversations_stmt(cutoff, limit)).all()
+
+
+def iter_archive_messages(db: Session, conversation_ids: List[str]) -> Iterator[Dict[str, Any]]:
+    """배치 대상 대화들의 메시지를 (conversation_id, seq) 순으로 스트리밍"""
+    result = db.execute(
+        _archive_messages_stmt(conversation_ids),
+        execution_options={"yield_per": 500},
+    )
+    for row in result.mappings():
+        yield row
+
+
+def load_archive_sources(
+        db: Session,
+        conversation_ids: List[str],
+) -> Dict[str, Dict[int, List[Dict[str, Any]]]]:
+    """배치 대상 대화들의 근거를 conversation_id → {seq → sources 목록}으로 조회"""
+    sources: Dict[str, Dict[int, List[Dict[str, Any]]]] = {}
+    for row in db.execute(_archive_sources_stmt(conversation_ids)):
+        by_seq = sources.setdefault(row.conversation_id, {})
+        by_seq.setdefault(row.seq, []).append({"id": row.ref_id, **(row.meta or {})})
+    return sources
+
+
+def delete_archived(db: Session, entries: List[Dict[str, Any]]) -> None:
+    """
+    인덱스 행 추가 + messages / conversations 삭제 (커밋은 호출자)
+    - entries: conversation_archives 행 값 목록
+    """
+    if not entries:
+        return
+
+    ids = [e["conversation_id"] for e in entries]
+
+    db.execute(insert(ConversationArchive), entries)
+    db.execute(delete(MessageSource).where(MessageSource.conversation_id.in_(ids)))
+    db.execute(delete(Message).where(Message.conversation_id.in_(ids)))
+    db.execute(delete(Conversation).where(Conversation.id.in_(ids)))
+
+    cache = get_history_cache()
+    for cid in ids:
+        cache.invalidate(cid)
+
+
+def restore_conversation(db: Session, conversation_id: str, directory: Optional[str] = None) -> bool:
+    """아카이브된 대화를 테이블로 되살림 (아카이브가 없으면 False, 커밋하지 않음 — 호출자의 트랜잭션에 포함)"""
+    entry = db.execute(_archive_entry_stmt(conversation_id)).scalar_one_or_none()
+    if entry is None:
+        return False
+
+    conversation, messages = read_archived_conversation(entry.segment, entry.offset, entry.length, directory)
+
+    try:
+        ## SAVEPOINT: 충돌 시 복원분만 되돌리고 호출자의 작업은 유지
+        with db.begin_nested():
+            db.execute(_restore_conversation_stmt(conversation))
+            if messages:
+                db.execute(insert(Message.__table__), _restore_message_rows(conversation_id, messages))
+            chunk_rows, ref_rows = _restore_source_rows(conversation_id, messages)
+            insert_chunks(db, chunk_rows)
+            if ref_rows:
+                db.execute(_insert_message_sources_stmt(), ref_rows)
+            db.execute(_delete_archive_entry_stmt(conversation_id))
+    except IntegrityError:
+        ## 동시 요청이 먼저 복원함
+        logger.info(f"[ARCHIVE] conversation={conversation_id} already restored by another request")
+    else:
+        logger.info(f"[ARCHIVE] restored conversation={conversation_id} messages={len(messages)}")
+
+    get_history_cache().invalidate(conversation_id)
+    return True
@@ -0,0 +1,71 @@
+"""
+repository/archive_async.py
+
+repository.archive의 복원(restore) 비동기(AsyncSession) 버전.
+
+- repository.chat_async가 대화를 찾지 못했을 때 호출
+  (히스토리 API 조회, 아카이브된 세션으로 들어온 새 채팅 턴)
+- 세그먼트 파일 읽기 / zstd 해제는 스레드에서 실행 (이벤트 루프 블로킹 방지)
+- 커밋하지 않음 — 호출자의 트랜잭션에 포함 (SAVEPOINT 안에서 실행)
+  → 채팅 턴 저장 경로에서는 append_turn이 복원 + 턴(+ 멱등 응답)을 한 번에 커밋
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logger import get_logger
+from app.models.chat import Message
+from app.repository.archive import (
+    _archive_entry_stmt,
+    _delete_archive_entry_stmt,
+    _restore_conversation_stmt,
+    _restore_message_rows,
+    _restore_source_rows,
+    read_archived_conversation,
+)
+from app.repository.chat import _insert_message_sources_stmt
+from app.repository.history_cache import get_history_cache
+
+
+logger = get_logger('chatbot-law-prod.repository.archive')
+
+
+async def restore_conversation(db: AsyncSession, conversation_id: str, directory: Optional[str] = None) -> bool:
+    """아카이브된 대화를 테이블로 되살림 (아카이브가 없으면 False, 커밋하지 않음)"""
+    entry = (await db.execute(_archive_entry_stmt(conversation_id))).scalar_one_or_none()
+    if entry is None:
+        return False
+
+    conversation, messages = await asyncio.to_thread(
+        read_archived_conversation, entry.segment, entry.offset, entry.length, directory,
+    )
+
+    ## chat_async가 이 모듈을 import하므로 순환 import를 피해 함수 안에서 import
+    from app.repository.chat_async import insert_chunks
+
+    try:
+        ## SAVEPOINT: 충돌 시 복원분만 되돌리고 호출자가 이미 flush한 작업(seq 할당, 멱등 응답 등)은 유지
+        async with db.begin_nested():
+            await db.execute(_restore_conversation_stmt(conversation))
+            if messages:
+                await db.execute(insert(Message.__table__), _restore_message_rows(conversation_id, messages))
+            chunk_rows, ref_rows = _restore_source_rows(conversation_id, messages)
+            await insert_chunks(db, chunk_rows)
+            if ref_rows:
+                await db.execute(_insert_message_sources_stmt(), ref_rows)
+            await db.execute(_delete_archive_entry_stmt(conversation_id))
+    except IntegrityError:
+        ## 동시 요청이 먼저 복원함
+        logger.info(f"[ARCHIVE] conversation={conversation_id} already restored by another request")
+    else:
+        logger.info(f"[ARCHIVE] restored conversation={conversation_id} messages={len(messages)}")
+
+    get_history_cache().invalidate(conversation_id)
+    return True
@@ -5,116 +5,520 @@ repository/chat.py
 
 핵심 기능
 - get_or_create_conversation(session_id): 세션 단위 대화방 조회/생성
-- append_message(conversation_id, role, content): 메시지 저장 + seq 자동 증가 + updated_at 갱신
-- list_messages(conversation_id, limit, before_seq): 최근 메시지 조회(정렬 안정화 포함)
+- ensure_conversation(session_id): INSERT ... ON CONFLICT DO NOTHING upsert (커밋 없음)
+- append_message(conversation_id, role, content, usage): 메시지 저장 + seq 원자적 할당 + updated_at 갱신
+- append_turn(conversation_id, user_content, assistant_content, usage, sources): 채팅 한 턴을 단일 트랜잭션으로 저장
+  (sources는 chunks(중복 제거된 청크 메타) + message_sources(메시지별 인용 번호 → chunk_id)에 저장)
+- list_messages(conversation_id, limit, before_seq, after_seq): 최근 메시지 조회(정렬 안정화 포함)
+- list_message_page(conversation_id, limit, before_seq): 히스토리 API용 keyset 페이지 + sources (limit+1 조회로 has_more 판정)
+- load_history(conversation_id, limit): 누적 요약 + 요약 이후 최근 메시지를 쿼리 1회로 조회
+- get_conversation_summary / update_conversation_summary: 누적 대화 요약 조회/갱신
 
 조회/정렬 규칙
 - DB에서 seq 내림차순으로 최근 limit개를 조회한 뒤,
   애플리케이션에서 seq 오름차순으로 재정렬하여 반환
   (대화 컨텍스트 재구성 시 순서 안정성 확보)
 
-주의/확장 포인트
-- seq는 max(seq)+1 방식이라 동시성 환경에서는 경쟁 조건(race condition)이 발생할 수 있음
-  (필요 시 트랜잭션 잠금, DB 레벨 증가 전략, 또는 재시도 정책으로 보완)
+seq 할당
+- Conversation.next_seq 카운터를 UPDATE ... RETURNING으로 원자적으로 증가시켜 할당
+  (max(seq)+1 계산 + IntegrityError 재시도 방식 대체 → append 1회당 재시도 없음)
+- 같은 대화에 동시 append가 몰려도 DB 행 잠금으로 직렬화되어 seq 중복이 발생하지 않음
+
+히스토리 캐시
+- 동기 쓰기 경로(scripts, 배치)는 같은 프로세스의 history_cache 항목을 무효화만 함
 """
 
 
 from __future__ import annotations
 
+import hashlib
+import json
 from datetime import datetime
-from typing import Literal, Optional, List
+from typing import Any, Dict, Literal, Optional, List, Tuple
 
-from sqlalchemy import select, func
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from app.models.chat import Conversation, Message
+from app.models.chat import Chunk, Conversation, Message, MessageSource
+from app.repository.history_cache import get_history_cache
 from app.core.logger import get_logger
 
 
 logger = get_logger('chatbot-law-prod.repository.chat')
 
 Role = Literal["user", "assistant"]
-MAX_RETRIES = 5
 
 
+# -----------------------------------------------------------------------------
+# Statement builders (repository.chat_async와 공유)
+# -----------------------------------------------------------------------------
+def _new_conversation(session_id: str) -> Conversation:
+    return Conversation(
+        id=session_id, 
+        created_at=datetime.utcnow(), 
+        updated_at=datetime.utcnow(),
+        next_seq=1,
+    )
+
+
+def _dialect_insert(dialect_name: str):
+    """ON CONFLICT를 지원하는 insert 구성자 (Postgres / SQLite 외에는 None)"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+
+def _insert_ignore_conversation_stmt(dialect_name: str, conversation_id: str):
+    """INSERT ... ON CONFLICT DO NOTHING (Postgres / SQLite 외에는 None)"""
+    dialect_insert = _dialect_insert(dialect_name)
+    if dialect_insert is None:
+        return None
+
+    now = datetime.utcnow()
+    return (
+        dialect_insert(Conversation)
+        .values(id=conversation_id, created_at=now, updated_at=now, next_seq=1)
+        .on_conflict_do_nothing(index_elements=[Conversation.id])
+    )
+
+
+def _allocate_seq_stmt(conversation_id: str, count: int):
+    return (
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(
+            next_seq=Conversation.next_seq + count,
+            updated_at=datetime.utcnow(),
+        )
+    )
+
+
+def _next_seq_stmt(conversation_id: str):
+    return select(Conversation.next_seq).where(Conversation.id == conversation_id)
+
+
+USAGE_COLUMNS = (
+    "model",
+    "prompt_tokens",
+    "completion_tokens",
+    "cached_tokens",
+    "embedding_tokens",
+    "cost_usd",
+)
+
+
+def _usage_columns(usage: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """사용량 컬럼 값 (usage가 없으면 모두 None — 행마다 컬럼 구성을 동일하게 유지)"""
+    usage = usage or {}
+    return {k: usage.get(k) for k in USAGE_COLUMNS}
+
+
+def _new_message(
+        conversation_id: str,
+        role: Role,
+        content: str,
+        seq: int,
+        usage: Optional[Dict[str, Any]] = None,
+) -> Message:
+    return Message(
+        conversation_id=conversation_id,
+        role=role,
+        content=content,
+        seq=seq,
+        created_at=datetime.utcnow(),
+        **_usage_columns(usage),
+    )
+
+
+def _insert_turn_stmt():
+    ## ORM bulk insert는 None 컬럼을 빼고 키 구성별로 문장을 나누므로 Table 대상 Core INSERT 사용
+    return insert(Message.__table__)
+
+
+def _turn_rows(
+        conversation_id: str,
+        seq: int,
+        user_content: str,
+        assistant_content: str,
+        usage: Optional[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    now = datetime.utcnow()
+    base = {"conversation_id": conversation_id, "created_at": now}
+    return [
+        {**base, "role": "user", "content": user_content, "seq": seq, **_usage_columns(None)},
+        {**base, "role": "assistant", "content": assistant_content, "seq": seq + 1, **_usage_columns(usage)},
+    ]
+
+
+def _list_messages_stmt(
+        conversation_id: str,
+        limit: int,
+        before_seq: Optional[int],
+        after_seq: Optional[int],
+):
+    ## 대화가 없으면 결과가 비어 있으므로 별도 존재 확인 쿼리는 하지 않음
+    stmt = select(Message).where(Message.conversation_id == conversation_id)
+
+    if before_seq is not None:
+        stmt = stmt.where(Message.seq < before_seq)
+
+    if after_seq is not None:
+        stmt = stmt.where(Message.seq > after_seq)
+
+    ## 최신 limit개를 뽑아 정렬을 안정적으로 하기 위해:
+    ## 1) seq 내림차순으로 limit
+    ## 2) 결과를 다시 오름차순으로 정렬해서 반환
+    return stmt.order_by(Message.seq.desc()).limit(limit)
+
+
+def _source_chunk_key(source: Dict[str, Any]) -> str:
+    """chunks PK: chunk_id, 메타데이터가 부족해 chunk_id가 비어 있으면 메타데이터 해시"""
+    chunk_id = source.get("chunk_id")
+    if chunk_id:
+        return chunk_id
+
+    raw = json.dumps(
+        {k: v for k, v in source.items() if k != "id"},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return "sha1:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _source_rows(
+        conversation_id: str,
+        seq: int,
+        sources: Optional[List[Dict[str, Any]]],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    API sources → (chunks 행, message_sources 행)
+    - 청크 메타데이터는 인용 번호(id)를 뺀 나머지 필드 그대로 (chunk_id 기준 중복 제거)
+    - chunks 행은 키 순으로 정렬 (동시 upsert 간 잠금 순서 고정)
+    """
+    chunks: Dict[str, Dict[str, Any]] = {}
+    refs: List[Dict[str, Any]] = []
+
+    for idx, source in enumerate(sources or [], start=1):
+        key = _source_chunk_key(source)
+        chunks.setdefault(key, {"chunk_id": key, "meta": {k: v for k, v in source.items() if k != "id"}})
+        refs.append({
+            "conversation_id": conversation_id,
+            "seq": seq,
+            "ref_id": source.get("id") or idx,
+            "chunk_id": key,
+        })
+
+    return [chunks[k] for k in sorted(chunks)], refs
+
+
+def _insert_ignore_chunks_stmt(dialect_name: str):
+    """chunks executemany용 INSERT ... ON CONFLICT DO NOTHING (Postgres / SQLite 외에는 None)"""
+    dialect_insert = _dialect_insert(dialect_name)
+    if dialect_insert is None:
+        return None
+    return dialect_insert(Chunk.__table__).on_conflict_do_nothing(index_elements=["chunk_id"])
+
+
+def _existing_chunks_stmt(keys: List[str]):
+    return select(Chunk.chunk_id).where(Chunk.chunk_id.in_(keys))
+
+
+def _insert_message_sources_stmt():
+    return insert(MessageSource.__table__)
+
+
+def _message_page_stmt(conversation_id: str, limit: int, before_seq: Optional[int]):
+    """
+    keyset 페이지 + 근거(sources)를 쿼리 1회로 조회
+    - 페이지: (conversation_id, seq) 유니크 인덱스를 역순으로 limit+1행만 읽음 (+1행은 다음 페이지 판정용)
+    - 페이지 메시지에 message_sources / chunks를 LEFT JOIN (메시지당 sources 수만큼 행이 늘어남)
+    """
+    page = select(
+        Message.id,
+        Message.role,
+        Message.content,
+        Message.seq,
+        Message.created_at,
+    ).where(Message.conversation_id == conversation_id)
+
+    if before_seq is not None:
+        page = page.where(Message.seq < before_seq)
+
+    page = page.order_by(Message.seq.desc()).limit(limit + 1).subquery()
+
+    return (
+        select(page, MessageSource.ref_id, Chunk.meta)
+        .select_from(page)
+        .outerjoin(
+            MessageSource,
+            (MessageSource.conversation_id == conversation_id)
+            & (MessageSource.seq == page.c.seq),
+        )
+        .outerjoin(Chunk, Chunk.chunk_id == MessageSource.chunk_id)
+        .order_by(page.c.seq.desc(), MessageSource.ref_id)
+    )
+
+
+def _split_message_page(rows, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+    """JOIN 결과를 메시지 단위로 묶음 → (seq 오름차순 메시지 dict 목록, has_more)"""
+    messages: List[Dict[str, Any]] = []
+    by_seq: Dict[int, Dict[str, Any]] = {}
+
+    for row in rows:
+        item = by_seq.get(row.seq)
+        if item is None:
+            item = {
+                "id": row.id,
+                "role": row.role,
+                "content": row.content,
+                "seq": row.seq,
+                "created_at": row.created_at,
+                "sources": [],
+            }
+            by_seq[row.seq] = item
+            messages.append(item)
+        if row.ref_id is not None:
+            item["sources"].append({"id": row.ref_id, **(row.meta or {})})
+
+    has_more = len(messages) > limit
+    page = messages[:limit]
+    page.reverse()  ## seq 오름차순으로 반환
+    return page, has_more
+
+
+def _load_history_stmt(conversation_id: str, limit: int):
+    return (
+        select(
+            Conversation.summary,
+            Conversation.next_seq,
+            Message.seq,
+            Message.role,
+            Message.content,
+        )
+        .select_from(Conversation)
+        .outerjoin(
+            Message,
+            (Message.conversation_id == Conversation.id)
+            & (Message.seq > Conversation.summary_upto_seq),
+        )
+        .where(Conversation.id == conversation_id)
+        .order_by(Message.seq.desc())
+        .limit(limit)
+    )
+
+
+def _unsummarized_messages_stmt(conversation_id: str, before_seq: int, limit: int):
+    return (
+        select(Message.seq, Message.role, Message.content)
+        .join(Conversation, Conversation.id == Message.conversation_id)
+        .where(
+            Message.conversation_id == conversation_id,
+            Message.seq > Conversation.summary_upto_seq,
+            Message.seq < before_seq,
+        )
+        .order_by(Message.seq.asc())
+        .limit(limit)
+    )
+
+
+def _split_history_rows(rows) -> Tuple[Optional[str], List[Any]]:
+    if not rows:
+        return None, []
+
+    summary = rows[0].summary
+    messages = [row for row in rows if row.seq is not None]
+    messages.sort(key=lambda m: m.seq)
+
+    return summary, messages
+
+
+def _update_summary_stmt(conversation_id: str, summary: str, upto_seq: int):
+    return (
+        update(Conversation)
+        .where(
+            Conversation.id == conversation_id,
+            Conversation.summary_upto_seq < upto_seq,
+        )
+        .values(summary=summary, summary_upto_seq=upto_seq)
+    )
+
+
+# -----------------------------------------------------------------------------
+# Sync repository (Session)
+# -----------------------------------------------------------------------------
 def get_or_create_conversation(db: Session, session_id:str) -> Conversation:
     """
     session_id(=Conversation.id)로 대화창을 조회하고, 없으면 생성한다.
+    - 동시에 같은 session_id를 생성하려다 PK 충돌이 나면 이미 생성된 행을 다시 조회
     """
     convo = db.get(Conversation, session_id)
 
     if convo:
         return convo
     
-    convo = Conversation(
-        id=session_id, 
-        created_at=datetime.utcnow(), 
-        updated_at=datetime.utcnow(),
-    )
+    convo = _new_conversation(session_id)
 
     db.add(convo)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return db.get(Conversation, session_id)
     db.refresh(convo)
 
     return convo
 
 
-def _next_seq(db: Session, conversation_id: str) -> int:
+def ensure_conversation(db: Session, conversation_id: str) -> None:
     """
-    해당 conversation의 다음 seq 값을 계산한다.
-    (messages 테이블에서 max(seq) + 1)
+    대화창이 없으면 생성한다. (커밋하지 않음 — 호출자의 트랜잭션에 포함)
+    - Postgres / SQLite: INSERT ... ON CONFLICT DO NOTHING 한 문장으로 조회 없이 upsert
+    - 그 외 DB: get_or_create_conversation으로 대체
     """
+    stmt = _insert_ignore_conversation_stmt(db.get_bind().dialect.name, conversation_id)
+
+    if stmt is None:
+        get_or_create_conversation(db, conversation_id)
+        return
+
+    db.execute(stmt)
+
+
+def _restore_or_create(db: Session, conversation_id: str) -> None:
+    """대화가 없을 때: 아카이브에 있으면 복원, 없으면 생성 (chat_async와 동일)"""
+    ## archive → chat 순환 import 방지
+    from app.repository.archive import restore_conversation
 
-    max_seq_stmt = select(func.max(Message.seq)).where(Message.conversation_id == conversation_id)
-    max_seq = db.execute(max_seq_stmt).scalar_one_or_none()
+    if not restore_conversation(db, conversation_id):
+        ensure_conversation(db, conversation_id)
+
+
+def _allocate_seq(db: Session, conversation_id: str, count: int = 1) -> Optional[int]:
+    """
+    conversation.next_seq를 count만큼 원자적으로 증가시키고, 할당된 첫 seq를 반환한다.
+    (대화가 없으면 None)
+
+    - Postgres / SQLite(>=3.35): UPDATE ... RETURNING 한 번으로 증가 + 조회
+    - RETURNING 미지원 DB: 같은 트랜잭션에서 UPDATE 후 SELECT
+      (UPDATE가 행/DB 쓰기 잠금을 잡고 있으므로 커밋 전까지 다른 트랜잭션이 끼어들 수 없음)
+    - updated_at도 같은 UPDATE에서 갱신
+    """
+    stmt = _allocate_seq_stmt(conversation_id, count)
+
+    if db.get_bind().dialect.update_returning:
+        next_seq = db.execute(stmt.returning(Conversation.next_seq)).scalar_one_or_none()
+    else:
+        result = db.execute(stmt)
+        next_seq = None
+        if result.rowcount:
+            next_seq = db.execute(_next_seq_stmt(conversation_id)).scalar_one()
+
+    if next_seq is None:
+        return None
+
+    return next_seq - count
 
-    return (max_seq or 0) + 1
 
 def append_message(
         db: Session,
         conversation_id: str,
         role: Role,
         content: str,
+        usage: Optional[Dict[str, Any]] = None,
     ) -> Message:
     """
     메시지를 DB에 append한다.
-    - seq는 max(seq)+1로 계산
-    - 동시성 환경에서 (conversation_id, seq) 유니크 충돌이 날 수 있어 재시도 로직 포함
-    - conversation.updated_at 갱신
+    - seq는 conversation.next_seq 카운터에서 원자적으로 할당 (재시도 없음)
+    - 대화가 없을 때만 아카이브 복원 또는 생성(ensure_conversation) 후 다시 할당 — 같은 트랜잭션, 커밋 1회
+      (아카이브된 대화는 seq가 1부터 다시 시작하지 않고 보관된 메시지에 이어서 할당)
+    - usage(usage_service.TurnUsage.to_dict())가 주어지면 토큰/비용 컬럼에 함께 저장
+    - conversation.updated_at 갱신 (seq 할당 UPDATE에 포함)
+    """
+    seq = _allocate_seq(db, conversation_id)
+
+    if seq is None:
+        _restore_or_create(db, conversation_id)
+        seq = _allocate_seq(db, conversation_id)
+
+    msg = _new_message(conversation_id, role, content, seq, usage)
+    db.add(msg)
+    db.commit()
+    db.refresh(msg)
+
+    get_history_cache().invalidate(conversation_id)
+
+    return msg
+
+
+def append_turn(
+        db: Session,
+        conversation_id: str,
+        user_content: str,
+        assistant_content: str,
+        usage: Optional[Dict[str, Any]] = None,
+        sources: Optional[List[Dict[str, Any]]] = None,
+    ) -> int:
     """
-    convo = get_or_create_conversation(db, conversation_id)
+    채팅 한 턴(user 질문 + assistant 답변)을 하나의 트랜잭션으로 저장하고, user 메시지 seq를 반환한다.
 
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            seq = _next_seq(db, conversation_id)
-            msg = Message(
-                conversation_id=conversation_id,
-                role=role,
-                content=content,
-                seq=seq,
-                created_at=datetime.utcnow()
-            )
-            db.add(msg)
+    - 기존 대화: UPDATE ... RETURNING(seq 2개 할당) + INSERT(2행, executemany) + COMMIT
+    - 새 대화: 위 UPDATE가 0행이면 아카이브 복원 또는 INSERT ... ON CONFLICT DO NOTHING 후 다시 할당
+    - ORM 객체 대신 Core INSERT executemany 사용 → PK RETURNING / refresh 왕복 없음
+    - usage는 assistant 메시지에만 저장
+    - sources(API 응답의 근거 목록)가 있으면 chunks upsert + message_sources INSERT 추가 (같은 트랜잭션)
+    """
+    seq = _allocate_seq(db, conversation_id, count=2)
 
-            convo.updated_at = datetime.utcnow()
+    if seq is None:
+        _restore_or_create(db, conversation_id)
+        seq = _allocate_seq(db, conversation_id, count=2)
+
+    db.execute(
+        _insert_turn_stmt(),
+        _turn_rows(conversation_id, seq, user_content, assistant_content, usage),
+    )
+    save_sources(db, conversation_id, seq + 1, sources)
+    db.commit()
+
+    get_history_cache().invalidate(conversation_id)
+
+    return seq
+
+
+def save_sources(
+        db: Session,
+        conversation_id: str,
+        seq: int,
+        sources: Optional[List[Dict[str, Any]]],
+) -> None:
+    """assistant 메시지(seq)의 근거 저장 (커밋하지 않음 — 호출자의 트랜잭션에 포함)"""
+    chunk_rows, ref_rows = _source_rows(conversation_id, seq, sources)
+    insert_chunks(db, chunk_rows)
+    if ref_rows:
+        db.execute(_insert_message_sources_stmt(), ref_rows)
 
-            db.commit()
-            db.refresh(msg)
 
-            return msg
-        except IntegrityError as e:
-            ## (conversation_id, seq) 유니크 충돌 가능성
-            db.rollback()
+def insert_chunks(db: Session, chunk_rows: List[Dict[str, Any]]) -> None:
+    """이미 있는 청크는 건너뜀 (Postgres / SQLite: ON CONFLICT DO NOTHING, 그 외: 조회 후 누락분만 INSERT)"""
+    if not chunk_rows:
+        return
 
-            logger.warning("IntegrityError on append_message attempt=%d: %s", attempt, e)
+    stmt = _insert_ignore_chunks_stmt(db.get_bind().dialect.name)
 
-            if attempt == MAX_RETRIES:
-                ## 재시도 초과면 예외를 다시 올려서 상위에서 처리
-                raise
+    if stmt is None:
+        existing = set(db.execute(_existing_chunks_stmt([r["chunk_id"] for r in chunk_rows])).scalars())
+        chunk_rows = [r for r in chunk_rows if r["chunk_id"] not in existing]
+        stmt = insert(Chunk.__table__)
+        if not chunk_rows:
+            return
 
-            ## 다음 루프에서 다시 max(seq)+1 계산 후 재시도
-            continue
+    db.execute(stmt, chunk_rows)
 
 
 def list_messages(
@@ -122,29 +526,85 @@ def list_messages(
         conversation_id: str,
         limit: int = 50,
         before_seq: Optional[int] = None,
+        after_seq: Optional[int] = None,
 ) -> List[Message]:
     """
     대화 히스토리 조회
     - 기본: seq 오름차순으로 최근 limit개 반환
     - before_seq가 있으면: 해당 seq 이전 메시지들 중 최근 limit개
+    - after_seq가 있으면: 해당 seq 이후 메시지만 대상 (요약에 반영된 메시지 제외)
     """
-    ## 존재 확인(없으면 빈 리스트)
-    convo = db.get(Conversation, conversation_id)
+    stmt = _list_messages_stmt(conversation_id, limit, before_seq, after_seq)
 
-    if not convo:
-        return []
+    items = db.execute(stmt).scalars().all()
+    items.sort(key=lambda m: m.seq)
 
-    stmt = select(Message).where(Message.conversation_id == conversation_id)
+    return items
 
-    if before_seq is not None:
-        stmt = stmt.where(Message.seq < before_seq)
 
-    ## 최신 limit개를 뽑아 정렬을 안정적으로 하기 위해:
-    ## 1) seq 내림차순으로 limit
-    ## 2) 결과를 다시 오름차순으로 정렬해서 반환
-    stmt = stmt.order_by(Message.seq.desc()).limit(limit)
+def list_message_page(
+        db: Session,
+        conversation_id: str,
+        limit: int = 50,
+        before_seq: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    히스토리 API용 keyset 페이지 조회. (messages: seq 오름차순, has_more)
+    - ORM 객체 대신 dict(id, role, content, seq, created_at, sources)를 반환 → 응답 모델로 바로 매핑
+    - sources는 message_sources / chunks JOIN으로 함께 조회 (쿼리 1회, 페이지 위치와 무관하게 일정한 비용)
+    """
+    rows = db.execute(_message_page_stmt(conversation_id, limit, before_seq)).all()
+    return _split_message_page(rows, limit)
 
-    items = db.execute(stmt).scalars().all()
-    items.sort(key=lambda m: m.seq)
 
-    return items
\ No newline at end of file
+def load_history(
+        db: Session,
+        conversation_id: str,
+        limit: int = 20,
+) -> Tuple[Optional[str], List[Any]]:
+    """
+    LLM 컨텍스트용 (누적 요약, 요약 이후 최근 메시지 limit개)를 한 번의 쿼리로 조회한다.
+
+    - conversations LEFT JOIN messages(seq > summary_upto_seq) → 요약과 메시지를 함께 조회
+    - 메시지는 ORM 객체가 아닌 Row(seq, role, content)로 반환하고 읽기 트랜잭션을 바로 종료
+      (LLM 호출 동안 커넥션이 idle in transaction 상태로 남지 않게)
+    - 대화가 없으면 (None, [])
+    """
+    rows = db.execute(_load_history_stmt(conversation_id, limit)).all()
+    db.commit()
+
+    return _split_history_rows(rows)
+
+
+def get_conversation_summary(db: Session, conversation_id: str) -> Tuple[Optional[str], int]:
+    """
+    누적 요약과 요약에 반영된 마지막 seq를 반환한다. (대화가 없으면 (None, 0))
+    """
+    row = db.execute(
+        select(Conversation.summary, Conversation.summary_upto_seq)
+        .where(Conversation.id == conversation_id)
+    ).first()
+
+    if row is None:
+        return None, 0
+
+    return row.summary, row.summary_upto_seq or 0
+
+
+def update_conversation_summary(
+        db: Session,
+        conversation_id: str,
+        summary: str,
+        upto_seq: int,
+) -> bool:
+    """
+    누적 요약을 갱신한다.
+    - 동시 요청이 더 최신 요약을 이미 저장했다면(summary_upto_seq >= upto_seq) 덮어쓰지 않음
+    - 갱신 여부를 반환
+    """
+    result = db.execute(_update_summary_stmt(conversation_id, summary, upto_seq))
+    db.commit()
+
+    get_history_cache().invalidate(conversation_id)
+
+    return result.rowcount > 0
@@ -0,0 +1,318 @@
+"""
+repository/chat_async.py
+
+repository.chat의 비동기(AsyncSession) 버전.
+
+- API 라우터 / llm_service에서 사용 (쿼리마다 스레드풀을 거치지 않음)
+- SQL 문장 구성은 repository.chat의 statement builder를 그대로 공유
+  → 동기/비동기 경로가 같은 쿼리를 실행
+- 동기 버전(repository.chat)은 Alembic, scripts, 배치 작업용으로 유지
+
+핵심 기능 (동기 버전과 동일한 이름/의미)
+- get_or_create_conversation / ensure_conversation
+- append_message / append_turn / save_sources
+- list_messages / list_message_page / load_history
+- update_conversation_summary
+
+히스토리 캐시 (repository.history_cache)
+- load_history는 세션별 최근 메시지 캐시를 먼저 조회 (hit이면 DB 쿼리 없음)
+- append_turn은 커밋 후 캐시에 이어 붙임, append_message / 요약 갱신 실패는 캐시 무효화
+
+아카이브 복원 (repository.archive_async)
+- 대화가 없을 때만(= 새 세션이거나 아카이브된 세션) conversation_archives를 PK로 조회
+- append_*: 대화 생성(ensure_conversation) 전에 복원 → seq가 아카이브된 메시지에 이어서 할당
+  (복원은 커밋하지 않음 → 복원 + 턴 저장이 append_*의 커밋 1회로 함께 반영/롤백)
+- load_history / list_message_page: 결과가 비었으면 복원 후 다시 조회하고 커밋
+"""
+
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.chat import Chunk, Conversation, Message
+from app.repository.archive_async import restore_conversation
+from app.repository.history_cache import CachedMessage, get_history_cache
+from app.repository.chat import (
+    Role,
+    _allocate_seq_stmt,
+    _existing_chunks_stmt,
+    _insert_ignore_chunks_stmt,
+    _insert_message_sources_stmt,
+    _insert_ignore_conversation_stmt,
+    _insert_turn_stmt,
+    _list_messages_stmt,
+    _load_history_stmt,
+    _message_page_stmt,
+    _new_conversation,
+    _new_message,
+    _next_seq_stmt,
+    _split_history_rows,
+    _source_rows,
+    _split_message_page,
+    _turn_rows,
+    _unsummarized_messages_stmt,
+    _update_summary_stmt,
+)
+
+
+def _dialect(db: AsyncSession):
+    return db.get_bind().dialect
+
+
+async def get_or_create_conversation(db: AsyncSession, session_id: str) -> Conversation:
+    """
+    session_id(=Conversation.id)로 대화창을 조회하고, 없으면 생성한다.
+    - 동시에 같은 session_id를 생성하려다 PK 충돌이 나면 이미 생성된 행을 다시 조회
+    """
+    convo = await db.get(Conversation, session_id)
+
+    if convo:
+        return convo
+
+    convo = _new_conversation(session_id)
+
+    db.add(convo)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return await db.get(Conversation, session_id)
+
+    return convo
+
+
+async def ensure_conversation(db: AsyncSession, conversation_id: str) -> None:
+    """대화창이 없으면 생성한다. (커밋하지 않음 — 호출자의 트랜잭션에 포함)"""
+    stmt = _insert_ignore_conversation_stmt(_dialect(db).name, conversation_id)
+
+    if stmt is None:
+        await get_or_create_conversation(db, conversation_id)
+        return
+
+    await db.execute(stmt)
+
+
+async def _restore_or_create(db: AsyncSession, conversation_id: str) -> None:
+    """대화가 없을 때: 아카이브에 있으면 복원, 없으면 생성"""
+    if not await restore_conversation(db, conversation_id):
+        await ensure_conversation(db, conversation_id)
+
+
+async def _allocate_seq(db: AsyncSession, conversation_id: str, count: int = 1) -> Optional[int]:
+    """next_seq를 count만큼 원자적으로 증가시키고 할당된 첫 seq 반환 (대화가 없으면 None)"""
+    stmt = _allocate_seq_stmt(conversation_id, count)
+
+    if _dialect(db).update_returning:
+        next_seq = (await db.execute(stmt.returning(Conversation.next_seq))).scalar_one_or_none()
+    else:
+        result = await db.execute(stmt)
+        next_seq = None
+        if result.rowcount:
+            next_seq = (await db.execute(_next_seq_stmt(conversation_id))).scalar_one()
+
+    if next_seq is None:
+        return None
+
+    return next_seq - count
+
+
+async def append_message(
+        db: AsyncSession,
+        conversation_id: str,
+        role: Role,
+        content: str,
+        usage: Optional[Dict[str, Any]] = None,
+    ) -> Message:
+    """메시지를 DB에 append한다. (seq 원자적 할당, 커밋 1회)"""
+    seq = await _allocate_seq(db, conversation_id)
+
+    if seq is None:
+        await _restore_or_create(db, conversation_id)
+        seq = await _allocate_seq(db, conversation_id)
+
+    msg = _new_message(conversation_id, role, content, seq, usage)
+    db.add(msg)
+    await db.commit()
+    await db.refresh(msg)
+
+    ## 단일 메시지 append는 채팅 턴 흐름 밖의 경로 → 캐시를 갱신하지 않고 버림
+    get_history_cache().invalidate(conversation_id)
+
+    return msg
+
+
+async def append_turn(
+        db: AsyncSession,
+        conversation_id: str,
+        user_content: str,
+        assistant_content: str,
+        usage: Optional[Dict[str, Any]] = None,
+        sources: Optional[List[Dict[str, Any]]] = None,
+    ) -> int:
+    """채팅 한 턴(user + assistant + 근거 sources)을 하나의 트랜잭션으로 저장하고 user 메시지 seq 반환"""
+    seq = await _allocate_seq(db, conversation_id, count=2)
+
+    if seq is None:
+        await _restore_or_create(db, conversation_id)
+        seq = await _allocate_seq(db, conversation_id, count=2)
+
+    await db.execute(
+        _insert_turn_stmt(),
+        _turn_rows(conversation_id, seq, user_content, assistant_content, usage),
+    )
+    await save_sources(db, conversation_id, seq + 1, sources)
+    await db.commit()
+
+    get_history_cache().append(
+        conversation_id,
+        [
+            CachedMessage(seq, "user", user_content),
+            CachedMessage(seq + 1, "assistant", assistant_content),
+        ],
+    )
+
+    return seq
+
+
+async def save_sources(
+        db: AsyncSession,
+        conversation_id: str,
+        seq: int,
+        sources: Optional[List[Dict[str, Any]]],
+) -> None:
+    """assistant 메시지(seq)의 근거 저장 (커밋하지 않음 — 호출자의 트랜잭션에 포함)"""
+    chunk_rows, ref_rows = _source_rows(conversation_id, seq, sources)
+    await insert_chunks(db, chunk_rows)
+    if ref_rows:
+        await db.execute(_insert_message_sources_stmt(), ref_rows)
+
+
+async def insert_chunks(db: AsyncSession, chunk_rows: List[Dict[str, Any]]) -> None:
+    """이미 있는 청크는 건너뜀"""
+    if not chunk_rows:
+        return
+
+    stmt = _insert_ignore_chunks_stmt(_dialect(db).name)
+
+    if stmt is None:
+        keys = [r["chunk_id"] for r in chunk_rows]
+        existing = set((await db.execute(_existing_chunks_stmt(keys))).scalars())
+        chunk_rows = [r for r in chunk_rows if r["chunk_id"] not in existing]
+        stmt = insert(Chunk.__table__)
+        if not chunk_rows:
+            return
+
+    await db.execute(stmt, chunk_rows)
+
+
+async def list_messages(
+        db: AsyncSession,
+        conversation_id: str,
+        limit: int = 50,
+        before_seq: Optional[int] = None,
+        after_seq: Optional[int] = None,
+) -> List[Message]:
+    """대화 히스토리 조회 (seq 오름차순, 최근 limit개)"""
+    stmt = _list_messages_stmt(conversation_id, limit, before_seq, after_seq)
+
+    items = list((await db.execute(stmt)).scalars().all())
+    items.sort(key=lambda m: m.seq)
+
+    return items
+
+
+async def list_message_page(
+        db: AsyncSession,
+        conversation_id: str,
+        limit: int = 50,
+        before_seq: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """히스토리 API용 keyset 페이지 + sources 조회 (messages: seq 오름차순 dict, has_more)"""
+    rows = (await db.execute(_message_page_stmt(conversation_id, limit, before_seq))).all()
+
+    if not rows and before_seq is None and await restore_conversation(db, conversation_id):
+        rows = (await db.execute(_message_page_stmt(conversation_id, limit, before_seq))).all()
+        await db.commit()
+
+    return _split_message_page(rows, limit)
+
+
+async def load_history(
+        db: AsyncSession,
+        conversation_id: str,
+        limit: int = 20,
+) -> Tuple[Optional[str], List[Any]]:
+    """
+    (누적 요약, 요약 이후 최근 메시지 limit개) 반환
+    - 캐시 hit이면 DB를 조회하지 않음
+    - miss면 쿼리 1회로 조회하고 읽기 트랜잭션 종료 후 캐시에 저장
+    """
+    cache = get_history_cache()
+
+    cached = cache.get(conversation_id, limit)
+    if cached is not None:
+        return cached
+
+    rows = (await db.execute(_load_history_stmt(conversation_id, limit))).all()
+    await db.commit()
+
+    if not rows and await restore_conversation(db, conversation_id):
+        rows = (await db.execute(_load_history_stmt(conversation_id, limit))).all()
+        await db.commit()
+
+    summary, messages = _split_history_rows(rows)
+
+    if rows:
+        cache.put(
+            conversation_id,
+            summary,
+            messages,
+            next_seq=rows[0].next_seq,
+            ## limit개를 다 채우지 못했으면 요약 이후 메시지를 전부 읽은 것
+            complete=len(messages) < limit,
+        )
+
+    return summary, messages
+
+
+async def load_unsummarized_messages(
+        db: AsyncSession,
+        conversation_id: str,
+        before_seq: int,
+        limit: int = 20,
+) -> List[Any]:
+    """
+    요약에 반영되지 않았고 before_seq보다 오래된 메시지를 오래된 순으로 limit개 반환
+    - load_history 조회 창(limit) 밖으로 밀려난 메시지를 요약으로 접을 때 사용
+    - 캐시를 거치지 않고 조회 후 읽기 트랜잭션 종료
+    """
+    rows = (await db.execute(_unsummarized_messages_stmt(conversation_id, before_seq, limit))).all()
+    await db.commit()
+    return rows
+
+
+async def update_conversation_summary(
+        db: AsyncSession,
+        conversation_id: str,
+        summary: str,
+        upto_seq: int,
+) -> bool:
+    """누적 요약 갱신 (더 최신 요약이 이미 있으면 덮어쓰지 않음), 갱신 여부 반환"""
+    result = await db.execute(_update_summary_stmt(conversation_id, summary, upto_seq))
+    await db.commit()
+
+    updated = result.rowcount > 0
+
+    cache = get_history_cache()
+    if updated:
+        cache.set_summary(conversation_id, summary, upto_seq)
+    else:
+        ## 더 최신 요약이 이미 있음 → 캐시 내용이 DB보다 뒤처졌을 수 있음
+        cache.invalidate(conversation_id)
+
+    return updated
@@ -0,0 +1,195 @@
+"""
+repository/history_cache.py
+
+세션별 최근 메시지 캐시 (프로세스 메모리, read-through / write-through)
+
+- load_history(chat_async)가 먼저 조회하고, miss면 DB 결과를 저장
+- append_turn이 저장한 user/assistant 쌍을 그대로 이어 붙임 → 다음 턴은 히스토리 쿼리 없음
+- 세션당 최근 HISTORY_CACHE_MESSAGES개만 보관 (ring buffer)
+- 세션 단위 LRU, 전체 크기는 HISTORY_CACHE_MAX_BYTES(문자열 크기 근사치)로 제한
+
+정합성
+- 항목마다 DB의 next_seq를 함께 보관하고, 이어 붙일 seq가 next_seq와 다르면
+  (다른 경로/프로세스가 그 사이에 메시지를 썼다는 뜻) 항목을 버림
+- POST /conversations/{id}/messages(append_message), 요약 갱신 실패, 삭제/아카이브는 invalidate
+- 캐시는 worker 프로세스 단위. 여러 worker가 같은 세션을 번갈아 처리하면
+  다른 worker가 쓴 최근 턴이 보이지 않을 수 있음 (현재 운영은 --workers 1)
+"""
+
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.core.config import HISTORY_CACHE_MAX_BYTES, HISTORY_CACHE_MESSAGES
+
+
+class CachedMessage(NamedTuple):
+    seq: int
+    role: str
+    content: str
+
+
+_ENTRY_OVERHEAD = 256
+
+
+def _message_size(message: CachedMessage) -> int:
+    return sys.getsizeof(message.content) + 64
+
+
+@dataclass
+class _Entry:
+    summary: Optional[str]
+    next_seq: int
+    messages: Deque[CachedMessage] = field(default_factory=deque)
+    complete: bool = True   ## 요약 이후 메시지를 모두 보관 중인지 (ring buffer가 밀어냈으면 False)
+    size: int = _ENTRY_OVERHEAD
+
+
+class HistoryCache:
+    def __init__(self, max_bytes: int, max_messages: int) -> None:
+        self.max_bytes = max_bytes
+        self.max_messages = max_messages
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.max_messages > 0
+
+    # ------------------------------------------------------------------
+    # read
+    # ------------------------------------------------------------------
+    def get(self, session_id: str, limit: int) -> Optional[Tuple[Optional[str], List[CachedMessage]]]:
+        """(summary, 최근 limit개 메시지) 또는 None(miss)"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(session_id)
+            ## 보관 개수보다 많이 요구하면 캐시로는 답할 수 없음
+            if entry is None or (limit > len(entry.messages) and not entry.complete):
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(session_id)
+            self.hits += 1
+            messages = list(entry.messages)[-limit:] if limit else []
+            return entry.summary, messages
+
+    # ------------------------------------------------------------------
+    # write
+    # ------------------------------------------------------------------
+    def put(
+            self,
+            session_id: str,
+            summary: Optional[str],
+            messages: Iterable,
+            next_seq: int,
+            complete: bool,
+    ) -> None:
+        """DB에서 읽은 결과로 항목을 채움 (messages: seq 오름차순)"""
+        if not self.enabled:
+            return
+
+        entry = _Entry(summary=summary, next_seq=next_seq, complete=complete)
+        for m in messages:
+            self._push(entry, CachedMessage(m.seq, m.role, m.content))
+
+        with self._lock:
+            self._remove(session_id)
+            self._entries[session_id] = entry
+            self._bytes += entry.size
+            self._evict()
+
+    def append(self, session_id: str, messages: List[CachedMessage]) -> None:
+        """
+        새로 저장한 메시지를 이어 붙임. 항목이 없으면 아무것도 하지 않음
+        (다음 load_history가 DB에서 채움). seq가 이어지지 않으면 항목을 버림.
+        """
+        if not self.enabled or not messages:
+            return
+
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return
+
+            if messages[0].seq != entry.next_seq:
+                self._remove(session_id)
+                return
+
+            before = entry.size
+            for m in messages:
+                self._push(entry, m)
+            entry.next_seq = messages[-1].seq + 1
+
+            self._bytes += entry.size - before
+            self._entries.move_to_end(session_id)
+            self._evict()
+
+    def set_summary(self, session_id: str, summary: str, upto_seq: int) -> None:
+        """요약 갱신 반영: upto_seq 이하 메시지는 요약으로 접혔으므로 제거"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return
+
+            before = entry.size
+            entry.summary = summary
+            while entry.messages and entry.messages[0].seq <= upto_seq:
+                entry.size -= _message_size(entry.messages.popleft())
+            self._bytes += entry.size - before
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            self._remove(session_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "sessions": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    # ------------------------------------------------------------------
+    # internals (lock 보유 상태에서 호출)
+    # ------------------------------------------------------------------
+    def _push(self, entry: _Entry, message: CachedMessage) -> None:
+        entry.messages.append(message)
+        entry.size += _message_size(message)
+        while len(entry.messages) > self.max_messages:
+            entry.size -= _message_size(entry.messages.popleft())
+            entry.complete = False
+
+    def _remove(self, session_id: str) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+
+
+@lru_cache(maxsize=1)
+def get_history_cache() -> HistoryCache:
+    return HistoryCache(
+        max_bytes=HISTORY_CACHE_MAX_BYTES,
+        max_messages=HISTORY_CACHE_MESSAGES,
+    )
@@ -0,0 +1,74 @@
+"""
+repository/idempotency.py
+
+Idempotency-Key별 채팅 턴 응답 저장/조회 Repository (idempotency_keys 테이블)
+
+- get_idempotency_record(session_id, key): 만료되지 않은 저장 응답 조회 (AsyncSession)
+- add_idempotency_record(...): 응답 저장 (커밋하지 않음 → append_turn과 같은 트랜잭션에서 커밋)
+  - PK(session_id, key) 충돌 = 다른 worker가 같은 키의 턴을 먼저 저장함 → 커밋 시 IntegrityError
+- purge_expired_idempotency_records(): 만료 행 일괄 삭제 (동기 Session, 배치 작업용)
+
+시각은 repository.chat과 같이 naive UTC(datetime.utcnow())로 저장/비교
+"""
+
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import IDEMPOTENCY_TTL_SECONDS
+from app.models.chat import IdempotencyRecord
+
+
+async def get_idempotency_record(db: AsyncSession, session_id: str, key: str) -> Optional[IdempotencyRecord]:
+    row = (await db.execute(
+        select(IdempotencyRecord).where(
+            IdempotencyRecord.session_id == session_id,
+            IdempotencyRecord.key == key,
+            IdempotencyRecord.expires_at > datetime.utcnow(),
+        )
+    )).scalar_one_or_none()
+    ## 읽기 트랜잭션 종료 (이후 LLM 호출 동안 커넥션을 잡고 있지 않도록)
+    await db.commit()
+
+    return row
+
+
+async def add_idempotency_record(
+        db: AsyncSession,
+        session_id: str,
+        key: str,
+        fingerprint: str,
+        response: Dict[str, Any],
+        ttl_seconds: int = IDEMPOTENCY_TTL_SECONDS,
+) -> None:
+    """응답 저장 (커밋하지 않음). 같은 키의 만료된 행이 남아 있으면 먼저 지움"""
+    now = datetime.utcnow()
+
+    await db.execute(
+        delete(IdempotencyRecord).where(
+            IdempotencyRecord.session_id == session_id,
+            IdempotencyRecord.key == key,
+            IdempotencyRecord.expires_at <= now,
+        )
+    )
+    db.add(IdempotencyRecord(
+        session_id=session_id,
+        key=key,
+        fingerprint=fingerprint,
+        response=response,
+        created_at=now,
+        expires_at=now + timedelta(seconds=ttl_seconds),
+    ))
+    await db.flush()
+
+
+def purge_expired_idempotency_records(db: Session) -> int:
+    result = db.execute(delete(IdempotencyRecord).where(IdempotencyRecord.expires_at <= datetime.utcnow()))
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,80 @@
+"""
+repository/usage.py
+
+assistant 메시지에 저장된 턴 단위 토큰/비용 집계 Repository.
+
+- aggregate_usage(group_by, since, until, limit)
+  - group_by: day(created_at 날짜) | model | session(conversation_id)
+  - 토큰 컬럼은 SUM, turns는 사용량이 기록된 assistant 메시지 수
+- 사용량 컬럼이 NULL인 메시지(user 메시지, 컬럼 추가 이전 데이터)는 집계에서 제외
+- 비동기 버전은 repository.usage_async (같은 statement builder 사용)
+"""
+
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.chat import Message
+
+
+GroupBy = Literal["day", "model", "session"]
+
+
+def _group_column(group_by: GroupBy):
+    if group_by == "day":
+        ## SQLite / Postgres 모두 date(timestamp) 지원
+        return func.date(Message.created_at)
+    if group_by == "model":
+        return Message.model
+    return Message.conversation_id
+
+
+def _aggregate_usage_stmt(
+        group_by: GroupBy,
+        since: Optional[datetime],
+        until: Optional[datetime],
+        limit: int,
+    ):
+    key = _group_column(group_by).label("key")
+
+    stmt = (
+        select(
+            key,
+            func.count(Message.id).label("turns"),
+            func.coalesce(func.sum(Message.prompt_tokens), 0).label("prompt_tokens"),
+            func.coalesce(func.sum(Message.completion_tokens), 0).label("completion_tokens"),
+            func.coalesce(func.sum(Message.cached_tokens), 0).label("cached_tokens"),
+            func.coalesce(func.sum(Message.embedding_tokens), 0).label("embedding_tokens"),
+            func.coalesce(func.sum(Message.cost_usd), 0.0).label("cost_usd"),
+        )
+        .where(Message.role == "assistant", Message.prompt_tokens.is_not(None))
+        .group_by(key)
+        .order_by(key.desc())
+        .limit(limit)
+    )
+
+    if since is not None:
+        stmt = stmt.where(Message.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(Message.created_at < until)
+
+    return stmt
+
+
+def aggregate_usage(
+        db: Session,
+        group_by: GroupBy = "day",
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+    """
+    group_by 기준으로 토큰/비용 합계를 조회한다. (key 내림차순)
+    """
+    stmt = _aggregate_usage_stmt(group_by, since, until, limit)
+    return [dict(row._mapping) for row in db.execute(stmt)]
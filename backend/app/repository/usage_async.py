@@ -0,0 +1,29 @@
+"""
+repository/usage_async.py
+
+repository.usage의 비동기(AsyncSession) 버전. (usage 라우터에서 사용)
+
+- aggregate_usage(group_by, since, until, limit): 동기 버전과 같은 쿼리/반환 형식
+"""
+
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repository.usage import GroupBy, _aggregate_usage_stmt
+
+
+async def aggregate_usage(
+        db: AsyncSession,
+        group_by: GroupBy = "day",
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+    """group_by 기준 토큰/비용 합계 (key 내림차순)"""
+    result = await db.execute(_aggregate_usage_stmt(group_by, since, until, limit))
+    return [dict(row._mapping) for row in result]
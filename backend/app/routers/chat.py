@@ -5,24 +5,77 @@ routers/chat.py
 
 엔드포인트
 - POST /chat/{session_id}
-  1) 사용자 메시지 DB 저장(repository.append_message)
-  2) LLM 응답 생성(service.ask_llm)
-  3) 어시스턴트 메시지 DB 저장(repository.append_message)
-  4) answer 반환
+  1) LLM 응답 생성(service.ask_llm) — 히스토리 조회 쿼리 1회
+  2) 사용자 질문 + 어시스턴트 답변을 한 트랜잭션으로 저장(repository.append_turn)
+     (근거 sources도 같은 트랜잭션에 저장 → 히스토리 API가 재검색 없이 인용 표시)
+  3) answer + sources + usage(토큰/비용) 반환
+- POST /chat/{session_id}/stream
+  - 동일한 흐름을 Server-Sent Events(text/event-stream)로 스트리밍
+  - event: sources → event: token(반복) → event: done(answer, usage, degraded) (오류 시 event: error)
+  - 스트림 종료 후 질문 + 전체 answer + sources를 append_turn으로 저장 (저장 실패 시 done 대신 event: error)
+  - 답변 생성에 실패한 턴은 저장하지 않음 (질문만 남는 반쪽 턴 방지)
+
+Idempotency-Key 헤더 (선택, service.idempotency_service)
+- 같은 세션 + 같은 키의 요청은 한 번만 처리 (재시도/더블클릭으로 LLM 비용과 seq가 두 번 쓰이지 않음)
+  - 처리 중인 중복 요청은 완료를 기다렸다가 같은 응답을 받음
+  - 이후 중복 요청은 저장된 응답을 재생 (IDEMPOTENCY_TTL_SECONDS 동안, Idempotent-Replayed: true 헤더)
+  - 스트림 재생은 sources → token(전체 답변 1회) → done(replayed=true)
+  - deadline으로 축소된(degraded) 응답은 저장하지 않고 키를 해제 → 같은 키 재시도는 턴을 다시 실행
+- 응답은 턴과 같은 트랜잭션에 저장 (다른 worker가 먼저 저장했으면 그 응답으로 대체)
+- 같은 키를 다른 질문에 재사용하면 422
+
+Admission control (core.admission)
+- LLM 파이프라인(ask_llm / stream_llm)은 LLM_MAX_CONCURRENCY개까지만 동시에 실행
+- 초과 요청은 대기열에서 최대 LLM_MAX_QUEUE_WAIT_SECONDS 대기
+  (대기열 초과 → 429, 대기 시간 초과 → 503, 둘 다 Retry-After 헤더)
+- 멱등 재생 응답은 슬롯을 쓰지 않음
+
+요청 deadline (core.deadline)
+- 요청마다 REQUEST_DEADLINE_SECONDS(또는 더 짧은 X-Request-Timeout-Ms 헤더) 안에 응답
+- 시간은 admission 대기 → 히스토리 → 검색 → 생성 순으로 소진 (admission 대기는 남은 시간의 절반까지)
+- 예산을 넘긴 단계는 504 대신 축소된 답변으로 대체하고 degraded에 단계 이름을 담음
+  - retrieval: 안내 문구만 / generation: 안내 문구 + sources (스트림은 여기까지의 답변 + 안내 토큰)
+  - 축소된 턴도 그대로 저장 (사용자가 본 답변과 히스토리가 일치, 멱등 응답으로는 저장하지 않음)
 
 원칙
 - 라우터는 HTTP/검증/저장/응답만 담당
 - LLM 호출 및 프롬프트 구성은 service 계층에서만 처리
+- async 엔드포인트: DB는 AsyncSession(get_async_db)으로 접근
+  (쿼리/LLM/Retrieval 대기 중에 스레드풀 슬롯을 점유하지 않음)
 """
 
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import json
+from contextlib import nullcontext
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
-from app.repository.chat import append_message
+from app.core.admission import AdmissionTicket, Overloaded, get_llm_admission
+from app.core.config import IDEMPOTENCY_KEY_MAX_LENGTH
+from app.core.deadline import DEADLINE_HEADER, Deadline, use_deadline
+from app.core.logger import get_logger
+from app.core.metrics import stage
+from app.db import get_async_db
+from app.repository.chat_async import append_turn
+from app.repository.idempotency import add_idempotency_record, get_idempotency_record
 from app.schemas.chat_request import ChatRequest
-from app.service.llm_service import ask_llm
+from app.service.idempotency_service import (
+    IDEMPOTENCY_HEADER,
+    REPLAYED_HEADER,
+    IdempotencyClaim,
+    IdempotencyKeyReused,
+    fingerprint,
+    get_idempotency_registry,
+)
+from app.service.llm_service import ask_llm, stream_llm
+
+
+logger = get_logger("chatbot-law-prod.router.chat")
 
 
 router = APIRouter(
@@ -31,51 +84,263 @@ router = APIRouter(
 )
 
 
+async def _acquire_idempotency(
+    db: AsyncSession,
+    session_id: str,
+    key: Optional[str],
+    message: str,
+) -> Tuple[Optional[Dict[str, Any]], Optional[IdempotencyClaim]]:
+    """(재생할 응답, None) | (None, claim) | 키가 없으면 (None, None)"""
+    if key is None:
+        return None, None
+    try:
+        return await get_idempotency_registry().acquire(db, session_id, key, fingerprint(message))
+    except IdempotencyKeyReused:
+        raise HTTPException(status_code=422, detail=f"{IDEMPOTENCY_HEADER} reused with a different request")
+
+
+async def _admit(deadline: Deadline) -> AdmissionTicket:
+    """LLM 슬롯 획득 (과부하면 429/503 + Retry-After), 대기는 deadline 남은 시간의 절반까지"""
+    try:
+        return await get_llm_admission().acquire(max_wait=deadline.budget("generation") / 2)
+    except Overloaded as e:
+        logger.warning("admission rejected. reason=%s retry_after=%s", e.reason, e.retry_after)
+        raise HTTPException(
+            status_code=e.status_code,
+            detail="server is busy, retry later",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+async def _persist_turn(
+    db: AsyncSession,
+    session_id: str,
+    message: str,
+    body: Dict[str, Any],
+    claim: Optional[IdempotencyClaim],
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    user + assistant 메시지(+ 근거, 멱등 응답)를 단일 트랜잭션으로 저장
+    → (클라이언트에 줄 응답, 재생 여부). 같은 키를 다른 worker가 먼저 저장했으면 그 응답
+    (degraded 응답은 멱등 응답으로 저장하지 않음 — 재시도가 24시간 동안 축소된 답변을 재생하지 않게)
+    """
+    store_response = claim is not None and not body.get("degraded")
+    try:
+        with stage("persist"):
+            if store_response:
+                await add_idempotency_record(db, session_id, claim.key, claim.fingerprint, body)
+            await append_turn(
+                db=db,
+                conversation_id=session_id,
+                user_content=message,
+                assistant_content=body["answer"],
+                usage=body["usage"],
+                sources=body["sources"],
+            )
+    except IntegrityError:
+        if not store_response:
+            raise
+        await db.rollback()
+        record = await get_idempotency_record(db, session_id, claim.key)
+        if record is None:
+            raise
+        logger.info("idempotent turn already stored by another worker. session_id=%s", session_id)
+        return record.response, True
+
+    return body, False
+
+
+def _settle_claim(claim: Optional[IdempotencyClaim], body: Dict[str, Any]) -> None:
+    """대기 중인 중복 요청에 응답 전달. degraded면 claim을 풀어 대기 요청이 턴을 다시 실행"""
+    if claim is None:
+        return
+    if body.get("degraded"):
+        claim.abort()
+    else:
+        claim.resolve(body)
+
+
 @router.post("/{session_id}")
-def chat(
+async def chat(
     session_id: str,
     payload: ChatRequest,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=IDEMPOTENCY_KEY_MAX_LENGTH),
+    timeout_ms: Optional[str] = Header(None, alias=DEADLINE_HEADER),
 ):
+    deadline = Deadline.from_header(timeout_ms)
+
     if not payload.message.strip():
         raise HTTPException(status_code=400, detail="message is empty")
 
-    # ------------------------------------------------------------------
-    # 1. user 메시지 저장
-    # ------------------------------------------------------------------
-    append_message(
-        db=db,
-        conversation_id=session_id,
-        role="user",
-        content=payload.message,
-    )
+    replay, claim = await _acquire_idempotency(db, session_id, idempotency_key, payload.message)
+    if replay is not None:
+        response.headers[REPLAYED_HEADER] = "true"
+        return replay
 
-    # ------------------------------------------------------------------
-    # 2. LLM 호출 (RAG)
-    #    ask_llm은 (answer, session_id, sources)를 반환
-    # ------------------------------------------------------------------
-    answer, _, sources = ask_llm(
-        db=db,
-        message=payload.message,
-        session_id=session_id,
-    )
+    with claim or nullcontext():
+        # --------------------------------------------------------------
+        # 1. LLM 호출 (RAG)
+        #    ask_llm은 AskResult(answer, session_id, sources, usage, degraded)를 반환
+        #    (admission 슬롯은 LLM 파이프라인 동안만 점유, 저장 전에 반납)
+        # --------------------------------------------------------------
+        with await _admit(deadline), use_deadline(deadline):
+            result = await ask_llm(
+                db=db,
+                message=payload.message,
+                session_id=session_id,
+            )
+        body = {
+            "session_id": session_id,
+            "answer": result.answer,
+            "sources": result.sources,
+            "usage": result.usage,
+            "degraded": result.degraded,
+        }
 
-    # ------------------------------------------------------------------
-    # 3. assistant 메시지 저장
-    #    ※ DB에는 answer만 저장 (sources는 응답 메타 정보)
-    # ------------------------------------------------------------------
-    append_message(
-        db=db,
-        conversation_id=session_id,
-        role="assistant",
-        content=answer,
-    )
+        # --------------------------------------------------------------
+        # 2. user + assistant 메시지 저장 (단일 트랜잭션)
+        #    ※ DB에는 answer + 턴 사용량(토큰/비용) + 근거(sources) 저장
+        #      (+ Idempotency-Key가 있으면 응답 본문)
+        # --------------------------------------------------------------
+        body, replayed = await _persist_turn(db, session_id, payload.message, body, claim)
+        _settle_claim(claim, body)
 
     # ------------------------------------------------------------------
-    # 4. 응답 반환
+    # 3. 응답 반환
     # ------------------------------------------------------------------
+    if replayed:
+        response.headers[REPLAYED_HEADER] = "true"
+    return body
+
+
+def _sse(event: str, data: Any) -> str:
+    """SSE 프레임 직렬화 (data는 한 줄 JSON)"""
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def _replay_stream(body: Dict[str, Any]):
+    yield _sse("sources", {"session_id": body["session_id"], "sources": body["sources"]})
+    yield _sse("token", {"text": body["answer"]})
+    yield _sse("done", {**_done_payload(body), "replayed": True})
+
+
+def _done_payload(body: Dict[str, Any]) -> Dict[str, Any]:
     return {
-        "session_id": session_id,
-        "answer": answer,
-        "sources": sources,
+        "session_id": body["session_id"],
+        "answer": body["answer"],
+        "usage": body["usage"],
+        "degraded": body.get("degraded"),
     }
+
+
+@router.post("/{session_id}/stream")
+async def chat_stream(
+    session_id: str,
+    payload: ChatRequest,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=IDEMPOTENCY_KEY_MAX_LENGTH),
+    timeout_ms: Optional[str] = Header(None, alias=DEADLINE_HEADER),
+):
+    deadline = Deadline.from_header(timeout_ms)
+
+    if not payload.message.strip():
+        raise HTTPException(status_code=400, detail="message is empty")
+
+    replay, claim = await _acquire_idempotency(db, session_id, idempotency_key, payload.message)
+    if replay is not None:
+        return StreamingResponse(
+            _replay_stream(replay),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", REPLAYED_HEADER: "true"},
+        )
+
+    ## 응답 헤더를 보내기 전에 슬롯을 받아야 429/503을 돌려줄 수 있음
+    try:
+        ticket = await _admit(deadline)
+    except HTTPException:
+        if claim is not None:
+            claim.abort()
+        raise
+
+    async def event_stream():
+        parts = []
+        usage = None
+        sources = None
+        degraded = None
+
+        # --------------------------------------------------------------
+        # 1. sources → token 순서로 전송 (deadline 초과 시 안내 토큰 후 done)
+        # --------------------------------------------------------------
+        try:
+            with use_deadline(deadline):
+                async for event, data in stream_llm(
+                    db=db,
+                    message=payload.message,
+                    session_id=session_id,
+                ):
+                    if event == "sources":
+                        sources = data
+                        yield _sse("sources", {"session_id": session_id, "sources": data})
+                    elif event == "usage":
+                        usage = data
+                    elif event == "degraded":
+                        degraded = data
+                    else:
+                        parts.append(data)
+                        yield _sse("token", {"text": data})
+        except Exception:
+            logger.exception("chat_stream failed. session_id=%s", session_id)
+            yield _sse("error", {"detail": "failed to generate answer"})
+            return
+        finally:
+            ticket.release()
+
+        # --------------------------------------------------------------
+        # 2. 스트림 완료 후 user + assistant 메시지 저장 (단일 트랜잭션)
+        # --------------------------------------------------------------
+        body = {
+            "session_id": session_id,
+            "answer": "".join(parts).strip(),
+            "sources": sources or [],
+            "usage": usage,
+            "degraded": degraded,
+        }
+        try:
+            body, replayed = await _persist_turn(db, session_id, payload.message, body, claim)
+        except Exception:
+            ## 토큰은 이미 전송됨 → 스트림을 끊지 않고 error 이벤트로 종료 (claim은 guarded_stream에서 해제)
+            logger.exception("chat_stream persist failed. session_id=%s", session_id)
+            await db.rollback()
+            yield _sse("error", {"detail": "failed to save the answer"})
+            return
+        _settle_claim(claim, body)
+
+        done = _done_payload(body)
+        if replayed:
+            done["replayed"] = True
+        yield _sse("done", done)
+
+    async def guarded_stream():
+        ## 스트림이 어떤 이유로든(오류, 클라이언트 연결 종료) 끝나면 슬롯 반납, resolve 없이 끝나면 claim 해제
+        with ticket, claim or nullcontext():
+            async for frame in event_stream():
+                yield frame
+
+    def release_all():
+        ticket.release()
+        if claim is not None:
+            claim.abort()
+
+    return StreamingResponse(
+        guarded_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  ## 프록시(nginx 등) 버퍼링 비활성화
+        },
+        ## 스트림이 시작되기 전에 연결이 끊긴 경우에도 슬롯/claim 해제 (이미 해제됐으면 no-op)
+        background=BackgroundTask(release_all),
+    )
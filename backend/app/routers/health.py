@@ -5,26 +5,39 @@ routers/health.py
 
 엔드포인트
 - GET /health
-  - 서비스가 정상 응답 가능한지 단순 확인용
-  - AWS EB / ALB 헬스체크 및 모니터링에 사용
-
-주의
-- 외부 의존성(DB, OpenAI 등)까지 검증할지 여부는 운영 정책에 따라 분리 가능
-  (현재는 lightweight health check)
+  - 프로세스가 응답 가능한지 단순 확인용 (liveness, 외부 의존성 확인 없음, warm-up 전에도 200)
+- GET /health/ready
+  - warm-up 완료 + dependency(chain, database, retrieval)별 probe 결과 (service.warmup_service)
+  - chain / database가 ok면 200, 실패/미완료면 503 → AWS EB / ALB 헬스체크는 이 경로를 사용
+    (.ebextensions/01_healthcheck.config)
+  - retrieval(Pinecone/OpenAI)은 참고용(required=false) — 외부 장애로 fleet 전체가 교체되지 않게
+  - probe 결과는 READINESS_PROBE_TTL_SECONDS 동안 캐시 (헬스체크마다 외부 호출하지 않음)
 """
 
 
 
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.service.warmup_service import get_readiness
 
 router = APIRouter(
     prefix="/health",
     tags=["Health"],
 )
 
+## liveness는 probe/DB를 건드리지 않고 스레드풀도 거치지 않음 (EB 헬스체크는 /health/ready)
 @router.get("")
-def health_check():
+async def health_check():
     return {
         "status": "ok",
         "service": "chatbot-law-prod",
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/ready")
+async def readiness_check():
+    readiness = get_readiness()
+    report = readiness.report(await readiness.check_all())
+    status_code = 200 if report["status"] == "ready" else 503
+    return JSONResponse({**report, "service": "chatbot-law-prod"}, status_code=status_code)
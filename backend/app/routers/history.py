@@ -5,27 +5,34 @@ routers/history.py
 
 엔드포인트
 - GET  /conversations/{session_id}/messages
-  - 특정 대화방 메시지 조회
-  - limit(1~100), before_seq(페이지네이션) 지원
+  - 특정 대화방 메시지 조회 (최신 페이지부터, 페이지 내부는 seq 오름차순)
+  - limit(1~100), cursor(keyset 페이지네이션) 지원
+    - 응답의 next_cursor를 다음 요청의 cursor로 전달하면 더 오래된 페이지 조회
+    - limit+1행을 조회해 has_more를 정확히 판정 (빈 다음 페이지 없음)
+  - before_seq: 기존 클라이언트 호환용 (cursor가 있으면 cursor 우선)
+  - assistant 메시지는 저장된 근거(sources)를 함께 반환 (쿼리 1회, 재검색/LLM 호출 없음)
 - POST /conversations/{session_id}/messages
   - 특정 대화방에 메시지 저장 (role=user/assistant 공용)
 
 구현 특징
-- repository.chat의 list_messages / append_message를 호출하여
-  데이터 접근 계층을 라우터에서 직접 사용
+- repository.chat_async의 list_messages / append_message를 호출하여
+  데이터 접근 계층을 라우터에서 직접 사용 (AsyncSession, 스레드풀 미사용)
 - 응답 모델은 schemas.chat의 Pydantic 모델을 사용
 """
 
 
+import base64
+import binascii
+import json
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
-from app.repository.chat import (
+from app.db import get_async_db
+from app.repository.chat_async import (
     append_message,
-    list_messages,
+    list_message_page,
 )
 from app.schemas.chat import (
     MessageCreate,
@@ -39,42 +46,61 @@ router = APIRouter(
     tags=["History"],
 )
 
+def _encode_cursor(before_seq: int) -> str:
+    raw = json.dumps({"b": before_seq}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        before_seq = json.loads(base64.urlsafe_b64decode(padded))["b"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    if not isinstance(before_seq, int) or before_seq < 1:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    return before_seq
+
+
 @router.get("/{session_id}/messages", response_model=MessageListResponse,)
-def get_messages(
+async def get_messages(
     session_id: str,
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
     before_seq: Optional[int] = Query(None, ge=1),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    특정 대화방(session_id)의 메시지 히스토리 조회
+    특정 대화방(session_id)의 메시지 히스토리 조회 (keyset pagination)
     """
-    items = list_messages(
+    if cursor is not None:
+        before_seq = _decode_cursor(cursor)
+
+    rows, has_more = await list_message_page(
         db=db,
         conversation_id=session_id,
         limit=limit,
         before_seq=before_seq,
     )
 
-    has_more = len(items) == limit
-
     return MessageListResponse(
-        messages=items,
+        messages=[MessageResponse.model_validate(row) for row in rows],
         has_more=has_more,
+        next_cursor=_encode_cursor(rows[0]["seq"]) if has_more else None,
     )
 
 
 @router.post("/{session_id}/messages", response_model=MessageResponse,)
-def post_message(
+async def post_message(
     session_id: str,
     payload: MessageCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     특정 대화방(session_id)에 메시지 저장
     (user / assistant 공용)
     """   
-    msg = append_message(
+    msg = await append_message(
         db=db,
         conversation_id=session_id,
         role=payload.role,
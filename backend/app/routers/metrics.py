@@ -0,0 +1,35 @@
+"""
+routers/metrics.py
+
+Prometheus scrape 엔드포인트 라우터
+
+엔드포인트
+- GET /metrics
+  - core.metrics에 등록된 메트릭(histogram / counter / gauge)을 Prometheus text exposition format으로 반환
+  - chatbot_http_request_duration_seconds{method, route, status}
+  - chatbot_stage_duration_seconds{stage} (history / embed / retrieve / format / llm / persist ...)
+  - chatbot_admission_* {pool} (in_flight, queue_depth, wait_seconds, rejected_total{reason})
+  - chatbot_http_client_* {client} (in_flight, connections{state}, requests_total{host, status})
+
+주의
+- /api prefix 없이 등록 (health와 동일하게 인프라용 엔드포인트)
+"""
+
+
+from fastapi import APIRouter
+from starlette.responses import Response
+
+from app.core.metrics import render_prometheus
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+)
+
+
+@router.get("")
+def metrics():
+    return Response(content=render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,59 @@
+"""
+routers/usage.py
+
+턴 단위 토큰/비용 집계 조회 라우터
+
+엔드포인트
+- GET /usage?group_by=day|model|session&since=&until=&limit=
+  - assistant 메시지에 저장된 사용량(prompt/completion/cached/embedding tokens, cost_usd) 합계
+  - since/until: created_at 기준 [since, until) 범위 (ISO 8601)
+
+주의
+- async 엔드포인트: DB는 AsyncSession(get_async_db)으로 접근 (다른 라우터와 동일)
+- cost_usd는 config.MODEL_PRICING 기준 추정치 (청구서와 다를 수 있음)
+"""
+
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import get_async_db
+from app.repository.usage_async import aggregate_usage
+from app.schemas.usage import GroupBy, UsageBucket, UsageSummaryResponse
+
+
+router = APIRouter(
+    prefix="/usage",
+    tags=["Usage"],
+)
+
+
+@router.get("", response_model=UsageSummaryResponse)
+async def get_usage(
+    group_by: GroupBy = Query("day"),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rows = await aggregate_usage(
+        db=db,
+        group_by=group_by,
+        since=since,
+        until=until,
+        limit=limit,
+    )
+    ## day 그룹은 드라이버에 따라 date/str로 반환되므로 문자열로 통일
+    buckets = [
+        UsageBucket(**{**row, "key": None if row["key"] is None else str(row["key"])})
+        for row in rows
+    ]
+
+    return UsageSummaryResponse(
+        group_by=group_by,
+        buckets=buckets,
+        total_cost_usd=round(sum(b.cost_usd for b in buckets), 8),
+    )
@@ -10,7 +10,7 @@ schemas/chat.py
 구성
 - MessageCreate: 메시지 생성 요청용 스키마
 - MessageResponse: 단일 메시지 응답 스키마
-- MessageListResponse: 메시지 목록 + pagination 정보
+- MessageListResponse: 메시지 목록 + pagination 정보 (has_more, next_cursor)
 
 설계 원칙
 - role은 user / assistant 만 허용하여 도메인 일관성 유지
@@ -20,7 +20,7 @@ schemas/chat.py
 
 
 from datetime import datetime
-from typing import Literal, List
+from typing import Any, Dict, Literal, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -38,6 +38,8 @@ class MessageResponse(BaseModel):
     content: str
     seq: int
     created_at: datetime
+    ## assistant 메시지의 근거 목록 (채팅 API sources와 같은 형식, 없으면 빈 목록)
+    sources: List[Dict[str, Any]] = Field(default_factory=list)
 
     class Config:
         from_attributes = True  ## SQLAlchemy 모델 -> Pydantic 변환 허용
@@ -46,4 +48,6 @@ class MessageResponse(BaseModel):
 class MessageListResponse(BaseModel):
     messages: List[MessageResponse]
     has_more: bool
+    ## 다음(더 오래된) 페이지 조회용 opaque cursor (has_more=False면 None)
+    next_cursor: Optional[str] = None
 
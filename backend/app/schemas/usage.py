@@ -0,0 +1,33 @@
+"""
+schemas/usage.py
+
+토큰/비용 집계 API(routers/usage.py) 응답 스키마.
+
+구성
+- UsageBucket: group_by 기준 집계 한 행
+- UsageSummaryResponse: 집계 목록 + 전체 합계
+"""
+
+
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel
+
+
+GroupBy = Literal["day", "model", "session"]
+
+
+class UsageBucket(BaseModel):
+    key: Optional[str]
+    turns: int
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int
+    embedding_tokens: int
+    cost_usd: float
+
+
+class UsageSummaryResponse(BaseModel):
+    group_by: GroupBy
+    buckets: List[UsageBucket]
+    total_cost_usd: float
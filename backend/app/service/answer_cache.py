@@ -0,0 +1,258 @@
+"""
+service/answer_cache.py
+
+히스토리 없는(첫 턴) 질문에 대한 의미 기반(semantic) 답변 캐시.
+
+동작
+- 질문을 정규화(normalize_question)한 뒤
+  1) 정규화 문자열이 완전히 같으면 임베딩 없이 즉시 hit
+  2) 아니면 질문 임베딩과 저장된 임베딩의 cosine similarity >= threshold 이면 hit
+     (조문 인용 질의 "…법 제10조"는 1)만 사용 — 조문 번호만 다른 질문도 임베딩이 거의 같음)
+- LRU(최대 엔트리 수) + TTL 기반 만료
+- data/index_manifest.json의 doc sha / pipeline_version이 바뀌면 전체 무효화
+  (인덱스가 바뀌면 같은 질문이라도 근거 문서가 달라질 수 있음)
+
+주의
+- 대화 기록이 있는 턴은 답변이 문맥에 의존하므로 캐시하지 않음 (호출부에서 판단)
+- 프로세스 로컬 캐시 (gunicorn worker 간 공유되지 않음)
+"""
+
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import (
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_TTL_SECONDS,
+    INDEX_MANIFEST_PATH,
+)
+from app.core.logger import get_logger
+from scripts.indexing.metadata_backfill import ARTICLE_RE
+
+logger = get_logger("chatbot-law-prod.answer_cache")
+
+
+_PUNCT_RE = re.compile(r"[\s?!.,~·…\"'`()\[\]{}]+")
+
+
+def normalize_question(text: str) -> str:
+    """
+    캐시 키용 질문 정규화.
+    - 유니코드 NFKC 정규화 + 소문자화
+    - 공백/문장부호 차이를 무시 ("절차?" == "절차 ")
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return _PUNCT_RE.sub(" ", text).strip()
+
+
+def cites_article(text: str) -> bool:
+    """조문 번호("제n조")가 있는 질문 → 의미 기반 매칭 대상에서 제외"""
+    return ARTICLE_RE.search(text or "") is not None
+
+
+def load_index_version(manifest_path: str) -> str:
+    """
+    manifest의 (source, doc sha, pipeline_version) 조합으로 인덱스 버전 문자열을 만든다.
+    manifest가 없거나 읽을 수 없으면 빈 문자열.
+    """
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return ""
+
+    parts = []
+    for source in sorted(manifest):
+        info = manifest.get(source) or {}
+        doc_sha = info.get("doc_sha") or info.get("sha256") or ""
+        parts.append(f"{source}:{doc_sha}:{info.get('pipeline_version') or ''}")
+
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    v = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(v))
+    return v / norm if norm > 0 else v
+
+
+@dataclass
+class _Entry:
+    vector: Optional[np.ndarray]
+    answer: str
+    sources: List[Dict[str, Any]]
+    created_at: float
+
+
+class AnswerCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        ttl_seconds: int,
+        threshold: float,
+        manifest_path: str,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.manifest_path = manifest_path
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._manifest_mtime: Optional[float] = None
+        self._version = ""
+
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # index version
+    # ------------------------------------------------------------------
+    def _check_version(self) -> None:
+        """manifest가 바뀌었으면 버전을 다시 계산하고, 버전이 다르면 전체 무효화 (lock 보유 상태에서 호출)"""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime
+        except OSError:
+            mtime = None
+
+        if mtime == self._manifest_mtime:
+            return
+
+        self._manifest_mtime = mtime
+        version = load_index_version(self.manifest_path)
+        if version != self._version:
+            if self._entries:
+                logger.info(
+                    "Index version changed (%s -> %s). Invalidating %d cached answers.",
+                    self._version or "-",
+                    version or "-",
+                    len(self._entries),
+                )
+            self._entries.clear()
+            self._version = version
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry.created_at > self.ttl_seconds
+
+    # ------------------------------------------------------------------
+    # public API
+    # ------------------------------------------------------------------
+    def lookup(
+        self,
+        question: str,
+        vector: Optional[Sequence[float]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        캐시 조회.
+        - vector가 없으면 정규화 문자열 완전 일치만 확인
+        - vector가 있으면 cosine similarity 기반 조회까지 수행 (조문 인용 질문은 제외)
+        hit면 {"answer", "sources"} 복사본, miss면 None
+        """
+        key = normalize_question(question)
+        now = time.time()
+
+        with self._lock:
+            self._check_version()
+
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                del self._entries[key]
+                entry = None
+
+            if entry is None and vector is not None and not cites_article(question):
+                key, entry = self._most_similar(_unit(vector), now)
+
+            if entry is None:
+                if vector is not None:
+                    self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return {"answer": entry.answer, "sources": copy.deepcopy(entry.sources)}
+
+    def _most_similar(self, query: np.ndarray, now: float):
+        candidates = [
+            (k, e) for k, e in self._entries.items()
+            if e.vector is not None and not self._expired(e, now)
+        ]
+        if not candidates:
+            return None, None
+
+        matrix = np.stack([e.vector for _, e in candidates])
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+
+        if float(scores[best]) < self.threshold:
+            return None, None
+        return candidates[best]
+
+    def store(
+        self,
+        question: str,
+        vector: Optional[Sequence[float]],
+        result: Dict[str, Any],
+    ) -> None:
+        """답변/출처가 모두 있는 결과만 저장 (실패/빈 응답은 캐시하지 않음)"""
+        answer = (result.get("answer") or "").strip()
+        sources = result.get("sources") or []
+        if not answer or not sources:
+            return
+
+        key = normalize_question(question)
+        ## 조문 인용 질문은 벡터 없이 저장 → 정규화 문자열이 같은 질문만 hit
+        if cites_article(question):
+            vector = None
+        entry = _Entry(
+            vector=_unit(vector) if vector is not None else None,
+            answer=answer,
+            sources=copy.deepcopy(sources),
+            created_at=time.time(),
+        )
+
+        with self._lock:
+            self._check_version()
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@lru_cache(maxsize=1)
+def get_answer_cache() -> AnswerCache:
+    logger.info(
+        "Initializing answer cache. max_entries=%d, ttl=%ds, threshold=%.3f",
+        ANSWER_CACHE_MAX_ENTRIES,
+        ANSWER_CACHE_TTL_SECONDS,
+        ANSWER_CACHE_THRESHOLD,
+    )
+    return AnswerCache(
+        max_entries=ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+        threshold=ANSWER_CACHE_THRESHOLD,
+        manifest_path=INDEX_MANIFEST_PATH,
+    )
@@ -0,0 +1,181 @@
+"""
+service/archive_service.py
+
+오래 방치된 대화를 zstd JSONL 세그먼트로 옮기고 DB 행을 삭제하는 배치 작업
+
+동작 (배치 1회 = 트랜잭션 1회)
+1. updated_at < now - ARCHIVE_IDLE_DAYS 대화를 오래된 순으로 ARCHIVE_BATCH_SIZE개 조회 + 행 잠금
+2. 대상 대화들의 근거(sources)를 조회하고, 메시지를 (conversation_id, seq) 순으로 스트리밍하며
+   대화별 frame으로 세그먼트에 기록
+3. 세그먼트 fsync → conversation_archives 인덱스 추가 → message_sources / messages / conversations 삭제 → 커밋
+4. 대상이 없을 때까지 반복 (max_batches로 1회 실행량 제한 가능)
+5. (main) 만료된 idempotency_keys 행 정리
+
+복원
+- 히스토리 API 조회 / 아카이브된 세션의 새 채팅 턴에서 repository.chat_async가 자동 복원
+  (repository.archive_async.restore_conversation)
+
+실행 (backend 디렉토리에서, cron 등으로 주기 실행)
+    python -m app.service.archive_service --idle-days 180 --batch-size 200
+    python -m app.service.archive_service --dry-run
+
+주의
+- 커밋 전에 세그먼트를 fsync하므로, 커밋 실패 시 세그먼트에 참조되지 않는 frame이 남을 수 있음 (무해)
+- Postgres에서는 잠금(FOR UPDATE SKIP LOCKED)으로 배치 중 들어온 채팅 턴과 직렬화됨
+  → 해당 턴은 커밋 후 대화를 찾지 못해 아카이브에서 복원한 뒤 이어서 저장
+"""
+
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import ARCHIVE_BATCH_SIZE, ARCHIVE_DIR, ARCHIVE_IDLE_DAYS
+from app.core.logger import get_logger
+from app.models.chat import Conversation
+from app.repository.idempotency import purge_expired_idempotency_records
+from app.repository.archive import (
+    SegmentWriter,
+    delete_archived,
+    encode_conversation,
+    iter_archive_messages,
+    load_archive_sources,
+    select_idle_conversations,
+)
+
+
+logger = get_logger('chatbot-law-prod.service.archive')
+
+
+@dataclass
+class ArchiveStats:
+    conversations: int = 0
+    messages: int = 0
+    bytes_written: int = 0
+    batches: int = 0
+    segments: List[str] = field(default_factory=list)
+
+
+def _with_empty(grouped, pending):
+    yield from grouped
+    for cid in list(pending):
+        yield cid, ()
+
+
+def _idle_cutoff(idle_days: int, now: Optional[datetime] = None) -> datetime:
+    """
+    updated_at 비교 기준 시각 — repository.chat과 같은 naive UTC(datetime.utcnow())
+    (aware 값이 들어오면 UTC로 바꾼 뒤 tzinfo 제거: SQLite에서 naive/aware 혼용 비교 방지)
+    """
+    now = now or datetime.utcnow()
+    if now.tzinfo is not None:
+        now = now.astimezone(timezone.utc).replace(tzinfo=None)
+    return now - timedelta(days=idle_days)
+
+
+def archive_idle_conversations(
+        db: Session,
+        idle_days: int = ARCHIVE_IDLE_DAYS,
+        batch_size: int = ARCHIVE_BATCH_SIZE,
+        directory: str = ARCHIVE_DIR,
+        max_batches: Optional[int] = None,
+        now: Optional[datetime] = None,
+) -> ArchiveStats:
+    cutoff = _idle_cutoff(idle_days, now)
+    stats = ArchiveStats()
+
+    with SegmentWriter(directory) as writer:
+        while max_batches is None or stats.batches < max_batches:
+            conversations = select_idle_conversations(db, cutoff, batch_size)
+            if not conversations:
+                db.rollback()
+                break
+
+            by_id = {c.id: c._asdict() for c in conversations}
+            entries = []
+            archived_messages = 0
+
+            ## 메시지를 대화 단위로 끊어 읽으며 바로 frame으로 기록 (메시지 없는 대화는 마지막에)
+            sources = load_archive_sources(db, list(by_id))
+            rows = iter_archive_messages(db, list(by_id))
+            grouped = groupby(rows, key=lambda r: r["conversation_id"])
+            pending = dict(by_id)
+
+            for cid, messages in _with_empty(grouped, pending):
+                convo = pending.pop(cid)
+                messages = list(messages)
+                segment, offset, length = writer.write(encode_conversation(convo, messages, sources.get(cid)))
+                entries.append({
+                    "conversation_id": cid,
+                    "segment": segment,
+                    "offset": offset,
+                    "length": length,
+                    "message_count": len(messages),
+                    "last_activity_at": convo["updated_at"],
+                })
+                archived_messages += len(messages)
+                stats.bytes_written += length
+
+            writer.sync()
+            delete_archived(db, entries)
+            db.commit()
+
+            stats.batches += 1
+            stats.conversations += len(entries)
+            stats.messages += archived_messages
+            ## 배치가 세그먼트 경계(ARCHIVE_SEGMENT_MAX_BYTES)를 넘으면 여러 세그먼트에 걸침
+            batch_segments = sorted({e["segment"] for e in entries})
+            logger.info(
+                f"[ARCHIVE] batch={stats.batches} conversations={len(entries)} "
+                f"messages={archived_messages} segments={','.join(batch_segments)}"
+            )
+
+        stats.segments = list(writer.segments)
+
+    return stats
+
+
+def count_idle_conversations(db: Session, idle_days: int = ARCHIVE_IDLE_DAYS) -> int:
+    cutoff = _idle_cutoff(idle_days)
+    return db.execute(
+        select(func.count()).select_from(Conversation).where(Conversation.updated_at < cutoff)
+    ).scalar_one()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(prog="python -m app.service.archive_service", description="Archive idle conversations")
+    p.add_argument("--idle-days", type=int, default=ARCHIVE_IDLE_DAYS)
+    p.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    p.add_argument("--max-batches", type=int, default=None)
+    p.add_argument("--dir", dest="directory", default=ARCHIVE_DIR)
+    p.add_argument("--dry-run", action="store_true", help="count candidates only")
+    args = p.parse_args(argv)
+
+    from app.db import SessionLocal
+
+    with SessionLocal() as db:
+        if args.dry_run:
+            print(f"idle conversations: {count_idle_conversations(db, args.idle_days)}")
+            return
+
+        stats = archive_idle_conversations(
+            db,
+            idle_days=args.idle_days,
+            batch_size=args.batch_size,
+            directory=args.directory,
+            max_batches=args.max_batches,
+        )
+        purged = purge_expired_idempotency_records(db)
+
+    print({**asdict(stats), "idempotency_keys_purged": purged})
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,24 @@
 from __future__ import annotations
 
+import asyncio
 import json
 from pathlib import Path
-from typing import List, Any, Dict, Tuple
+from typing import AsyncIterator, List, Any, Dict, Optional, Tuple
 
 from langchain_openai import ChatOpenAI
 from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 
-from app.core.config import OPENAI_MODEL
+from app.core.config import ANSWER_CACHE_ENABLED, CONDENSE_FOLLOWUPS, OPENAI_MODEL
+from app.core.deadline import DeadlineExceeded, current_deadline, within
+from app.core.http_clients import get_async_http_client, get_http_client
 from app.core.logger import get_logger
+from app.core.metrics import stage
+from app.service.answer_cache import AnswerCache, get_answer_cache
+from app.service.embeddings_service import get_embeddings
 from app.service.retriever_service import get_retriever
+from app.service.usage_service import record_llm_usage
 
 logger = get_logger("chatbot-law-prod.chain_builder")
 
@@ -161,21 +168,320 @@ def _format_docs_with_citation_numbers(
     return context_text, sources
 
 
+# -----------------------------------------------------------------------------
+# Follow-up condensation (optional)
+# -----------------------------------------------------------------------------
+CONDENSE_PROMPT = (
+    "다음 대화 기록을 참고하여, 마지막 사용자 질문을 대화 기록 없이도 이해되는 "
+    "하나의 독립된 검색 질의로 다시 쓰십시오. 질의 문장만 출력하십시오.\n\n"
+    "[대화 기록]\n{history}\n\n[사용자 질문]\n{question}"
+)
+
+
+# -----------------------------------------------------------------------------
+# Deadline notices (core.deadline 예산 초과 시 답변 대신/뒤에 붙는 안내)
+# -----------------------------------------------------------------------------
+DEGRADED_NOTICES = {
+    "retrieval": "요청 처리 시간이 초과되어 관련 문서를 찾지 못했습니다. 잠시 후 다시 질문해 주세요.",
+    "generation": "답변 생성 시간이 초과되었습니다. 아래 참고 문서를 확인하시거나 잠시 후 다시 질문해 주세요.",
+}
+TRUNCATED_NOTICE = "\n\n(답변 생성 시간이 초과되어 답변이 중간에 끝났습니다. 아래 참고 문서를 함께 확인해 주세요.)"
+
+
+def _degraded_result(stage: str, sources: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"answer": DEGRADED_NOTICES[stage], "sources": sources, "degraded": stage}
+
+
+# -----------------------------------------------------------------------------
+# RAG Chain (stateless, sync + async)
+# -----------------------------------------------------------------------------
+class RagChain:
+    """
+    Retrieval + LLM Answer 체인.
+
+    - invoke(): 동기 경로 (스크립트/디버깅용)
+    - ainvoke(): 비동기 경로 (retriever.ainvoke / llm.ainvoke 사용)
+      → API 요청 처리 중 이벤트 루프/스레드풀 슬롯을 점유하지 않음
+    - astream(): ("sources", list) 이벤트 1회 후 ("token", str) 이벤트를 순차 yield
+      → SSE 스트리밍 응답용 (첫 바이트까지의 시간 단축)
+    - __call__은 invoke와 동일하게 동작 (기존 호출부 호환)
+
+    검색 질의
+    - 검색(임베딩)에는 inputs["question"]만 사용하고, 대화 기록은 프롬프트에만 넣음
+    - condense_followups=True이고 대화 기록이 있으면, 후속 질문을 독립 질의로 재작성한 뒤 검색
+
+    단계별 소요 시간(cache / condense / retrieve / format / llm)은 core.metrics.stage로 기록한다.
+
+    LLM 응답의 usage_metadata는 usage_service.record_llm_usage로 현재 턴 사용량에 누적한다.
+
+    answer_cache가 주어지면, inputs["cacheable"]이 True인 턴(대화 기록 없음)에 한해
+    inputs["question"] 기준으로 답변 캐시를 먼저 조회하고, miss면 결과를 저장한다.
+
+    요청 deadline(core.deadline)이 설정돼 있으면 ainvoke/astream은 단계별 예산 안에서만 기다린다.
+    - cache 조회 / 질의 재작성 초과 → 건너뜀 (캐시 miss / 원래 질문으로 검색)
+    - 검색 초과 → 안내 문구만 반환 (degraded="retrieval")
+    - 생성 초과 → 안내 문구 + sources (ainvoke), 여기까지의 답변 + 안내 토큰 (astream)
+      (degraded="generation", astream은 ("degraded", stage) 이벤트)
+    - degraded 결과는 답변 캐시에 저장하지 않음
+    """
+
+    def __init__(
+        self,
+        *,
+        prompt,
+        llm,
+        retriever,
+        parser,
+        answer_cache: Optional[AnswerCache] = None,
+        embeddings=None,
+        condense_followups: bool = False,
+    ) -> None:
+        self.prompt = prompt
+        self.llm = llm
+        self.retriever = retriever
+        self.parser = parser
+        self.answer_cache = answer_cache
+        self.embeddings = embeddings
+        self.condense_followups = condense_followups
+
+    @staticmethod
+    def _question(inputs: Dict[str, Any]) -> str:
+        return (inputs.get("question") or "").strip()
+
+    def _build_prompt(self, inputs: Dict[str, Any], docs: List[Document]):
+        logger.info("Retrieved %d documents", len(docs))
+
+        with stage("format"):
+            # 2) Build context + sources
+            context, sources = _format_docs_with_citation_numbers(docs)
+
+            # 3) LLM answer with forced citation format
+            msg = self.prompt.invoke(
+                {
+                    "history": (inputs.get("history") or "").strip() or "(없음)",
+                    "question": self._question(inputs),
+                    "context": context,
+                }
+            )
+        return msg, sources
+
+    # ------------------------------------------------------------------
+    # retrieval query
+    # ------------------------------------------------------------------
+    def _should_condense(self, inputs: Dict[str, Any]) -> bool:
+        return self.condense_followups and bool((inputs.get("history") or "").strip())
+
+    def _condense_prompt(self, inputs: Dict[str, Any]) -> str:
+        return CONDENSE_PROMPT.format(history=inputs["history"], question=self._question(inputs))
+
+    def _retrieval_query(self, inputs: Dict[str, Any]) -> str:
+        question = self._question(inputs)
+        if not self._should_condense(inputs):
+            return question
+        with stage("condense"):
+            response = self.llm.invoke(self._condense_prompt(inputs))
+        record_llm_usage(response)
+        rewritten = self.parser.invoke(response).strip()
+        return rewritten or question
+
+    async def _aretrieval_query(self, inputs: Dict[str, Any]) -> str:
+        question = self._question(inputs)
+        if not self._should_condense(inputs):
+            return question
+        try:
+            with stage("condense"):
+                response = await within(self.llm.ainvoke(self._condense_prompt(inputs)), "retrieval")
+        except DeadlineExceeded:
+            logger.warning("Follow-up condensation skipped (deadline). Using the raw question.")
+            return question
+        record_llm_usage(response)
+        rewritten = self.parser.invoke(response).strip()
+        logger.info("Condensed follow-up query: %s", rewritten)
+        return rewritten or question
+
+    # ------------------------------------------------------------------
+    # answer cache helpers
+    # ------------------------------------------------------------------
+    def _cache_question(self, inputs: Dict[str, Any]) -> Optional[str]:
+        """캐시 대상 턴이면 질문 문자열, 아니면 None"""
+        if self.answer_cache is None or self.embeddings is None:
+            return None
+        if not inputs.get("cacheable"):
+            return None
+        return self._question(inputs) or None
+
+    def _cache_lookup(self, question: str):
+        hit = self.answer_cache.lookup(question)
+        if hit is not None:
+            return hit, None
+
+        ## 검색 질의와 같은 텍스트를 임베딩 → retriever의 임베딩은 임베딩 캐시 hit (OpenAI 호출 1회)
+        vector = self.embeddings.embed_query(question)
+        return self.answer_cache.lookup(question, vector), vector
+
+    async def _acache_lookup(self, question: str):
+        hit = self.answer_cache.lookup(question)
+        if hit is not None:
+            return hit, None
+
+        try:
+            ## 검색 질의와 같은 텍스트를 임베딩 → retriever의 임베딩은 임베딩 캐시 hit (OpenAI 호출 1회)
+            vector = await within(self.embeddings.aembed_query(question), "retrieval")
+        except DeadlineExceeded:
+            ## 임베딩이 늦으면 캐시 조회/저장 없이 진행 (vector=None이면 저장도 건너뜀)
+            logger.warning("Answer cache lookup skipped (deadline).")
+            return None, None
+        return self.answer_cache.lookup(question, vector), vector
+
+    async def _aretrieve(self, inputs: Dict[str, Any]) -> List[Document]:
+        query = await self._aretrieval_query(inputs)
+        with stage("retrieve"):
+            return await within(self.retriever.ainvoke(query), "retrieval")
+
+    # ------------------------------------------------------------------
+    # invoke / ainvoke / astream
+    # ------------------------------------------------------------------
+    def invoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        cache_q = self._cache_question(inputs)
+        if cache_q:
+            with stage("cache"):
+                hit, vector = self._cache_lookup(cache_q)
+            if hit is not None:
+                logger.info("Answer cache hit.")
+                return hit
+
+        # 1) Retrieve (질문만 사용)
+        query = self._retrieval_query(inputs)
+        with stage("retrieve"):
+            docs = self.retriever.invoke(query)
+        msg, sources = self._build_prompt(inputs, docs)
+        with stage("llm"):
+            response = self.llm.invoke(msg)
+        record_llm_usage(response)
+        answer = self.parser.invoke(response).strip()
+
+        result = {"answer": answer, "sources": sources}
+        if cache_q:
+            self.answer_cache.store(cache_q, vector, result)
+        return result
+
+    async def ainvoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        cache_q = self._cache_question(inputs)
+        if cache_q:
+            with stage("cache"):
+                hit, vector = await self._acache_lookup(cache_q)
+            if hit is not None:
+                logger.info("Answer cache hit.")
+                return hit
+
+        # 1) Retrieve (non-blocking, 질문만 사용)
+        try:
+            docs = await self._aretrieve(inputs)
+        except DeadlineExceeded:
+            logger.warning("Retrieval exceeded the request deadline.")
+            return _degraded_result("retrieval", [])
+        msg, sources = self._build_prompt(inputs, docs)
+        try:
+            with stage("llm"):
+                response = await within(self.llm.ainvoke(msg), "generation")
+        except DeadlineExceeded:
+            logger.warning("Generation exceeded the request deadline. Returning sources only.")
+            return _degraded_result("generation", sources)
+        record_llm_usage(response)
+        answer = self.parser.invoke(response).strip()
+
+        result = {"answer": answer, "sources": sources}
+        if cache_q and vector is not None:
+            self.answer_cache.store(cache_q, vector, result)
+        return result
+
+    async def astream(self, inputs: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+        cache_q = self._cache_question(inputs)
+        if cache_q:
+            with stage("cache"):
+                hit, vector = await self._acache_lookup(cache_q)
+            if hit is not None:
+                logger.info("Answer cache hit (stream).")
+                yield "sources", hit["sources"]
+                yield "token", hit["answer"]
+                return
+
+        # 1) Retrieve (non-blocking, 질문만 사용)
+        try:
+            docs = await self._aretrieve(inputs)
+        except DeadlineExceeded:
+            logger.warning("Retrieval exceeded the request deadline (stream).")
+            yield "sources", []
+            yield "token", DEGRADED_NOTICES["retrieval"]
+            yield "degraded", "retrieval"
+            return
+        msg, sources = self._build_prompt(inputs, docs)
+
+        # 2) sources를 먼저 내보내 클라이언트가 인용 목록을 미리 렌더링할 수 있게 함
+        yield "sources", sources
+
+        # 3) LLM 토큰 스트리밍 (⟦n⟧ 앵커 포함 원문 그대로)
+        parts: List[str] = []
+        truncated = False
+        deadline = current_deadline()
+        ## 대기(__anext__)에만 timeout 적용 — yield 중(클라이언트 전송)에 취소가 걸리지 않게
+        until = deadline.until("generation") if deadline is not None else None
+        ## usage_metadata는 마지막 chunk에만 실림 (stream_usage=True)
+        ## llm 단계는 첫 토큰~마지막 토큰까지 (클라이언트 전송 대기 포함)
+        with stage("llm"):
+            chunks = self.llm.astream(msg).__aiter__()
+            while True:
+                try:
+                    async with asyncio.timeout_at(until):
+                        chunk = await chunks.__anext__()
+                except StopAsyncIteration:
+                    break
+                except TimeoutError:
+                    truncated = True
+                    break
+                record_llm_usage(chunk)
+                token = self.parser.invoke(chunk)
+                if token:
+                    parts.append(token)
+                    yield "token", token
+
+        if truncated:
+            logger.warning("Generation exceeded the request deadline (stream). tokens=%d", len(parts))
+            yield "token", TRUNCATED_NOTICE if parts else DEGRADED_NOTICES["generation"]
+            yield "degraded", "generation"
+            return
+
+        if cache_q and vector is not None:
+            self.answer_cache.store(
+                cache_q,
+                vector,
+                {"answer": "".join(parts).strip(), "sources": sources},
+            )
+
+    __call__ = invoke
+
+
 # -----------------------------------------------------------------------------
 # RAG Chain Builder (stateless)
 # -----------------------------------------------------------------------------
-def build_rag_chain():
+def build_rag_chain(*, llm=None, retriever=None, embeddings=None) -> RagChain:
     """
     Pinecone Retrieval + LLM Answer 체인을 생성합니다.
 
+    - llm / retriever / embeddings를 주입하면 기본 구성(ChatOpenAI, get_retriever, get_embeddings) 대신 사용
+      (scripts/loadtest의 오프라인 fake 구성 등)
+
     - 체인은 stateless
     - 히스토리는 외부(llm_service)에서 문자열로 구성하여 전달
     - input:
         {
-          "input": "<history + user question>"
+          "question": "<user question>",      # 검색 질의 + 답변 캐시 키
+          "history": "<summary + history>",   # (선택) 프롬프트에만 사용
+          "cacheable": bool,                   # (선택) 대화 기록 없는 턴만 True
         }
-    - 반환값: Runnable
-    - invoke({"input": "..."} ) -> {"answer": str, "sources": list}    
+    - 반환값: RagChain
+    - invoke({...}) / await ainvoke({...})
+      -> {"answer": str, "sources": list}  (deadline 초과 시 "degraded": stage 추가)
     """
     keyword_dictionary = load_keyword_dictionary()
     system_prompt = _build_system_prompt(keyword_dictionary)
@@ -187,8 +493,10 @@ def build_rag_chain():
                 "human",
                 "아래는 참고 문서입니다.\n"
                 "{context}\n\n"
-                "아래는 대화 기록 및 사용자 질문입니다.\n"
-                "{input}\n\n"
+                "아래는 이전 대화 기록입니다.\n"
+                "{history}\n\n"
+                "아래는 사용자 질문입니다.\n"
+                "{question}\n\n"
                 "작성 규칙:\n"
                 "1) 답변은 번호 목록으로 구성\n"
                 "2) 사실 위주로 서술하고 불필요한 추측은 하지 말 것\n"
@@ -200,24 +508,27 @@ def build_rag_chain():
         ]
     )
 
-    llm = ChatOpenAI(model=OPENAI_MODEL, temperature=0.3)
-    retriever = get_retriever()
+    if llm is None:
+        llm = ChatOpenAI(
+            model=OPENAI_MODEL,
+            temperature=0.3,
+            stream_usage=True,
+            ## 임베딩과 같은 keep-alive 풀 공유 (core.http_clients)
+            http_client=get_http_client(),
+            http_async_client=get_async_http_client(),
+        )
+    if retriever is None:
+        retriever = get_retriever()
+    if embeddings is None:
+        embeddings = get_embeddings()
     parser = StrOutputParser()
 
-    def _invoke(inputs: Dict[str, Any]) -> Dict[str, Any]:
-        query = inputs["input"]
-
-        # 1) Retrieve
-        docs = retriever.invoke(query)
-        logger.info("Retrieved %d documents from Pinecone", len(docs))
-
-        # 2) Build context + sources
-        context, sources = _format_docs_with_citation_numbers(docs)
-
-        # 3) LLM answer with forced citation format
-        msg = prompt.invoke({"input": query, "context": context})
-        answer = parser.invoke(llm.invoke(msg)).strip()
-
-        return {"answer": answer, "sources": sources}
-
-    return _invoke
+    return RagChain(
+        prompt=prompt,
+        llm=llm,
+        retriever=retriever,
+        parser=parser,
+        answer_cache=get_answer_cache() if ANSWER_CACHE_ENABLED else None,
+        embeddings=embeddings,
+        condense_followups=CONDENSE_FOLLOWUPS,
+    )
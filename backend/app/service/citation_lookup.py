@@ -0,0 +1,208 @@
+"""
+service/citation_lookup.py
+
+"전세사기피해자법 제10조"처럼 조문을 직접 지목하는 질의의 fast path.
+
+동작
+- 질의에서 법령명(data/law_map.json의 law_short / law_title)과
+  제n조 / 제n항(metadata_backfill.ARTICLE_RE / CLAUSE_RE)을 추출
+- 1) 로컬 article → chunk 색인(ArticleIndex)에 정확한 조문 chunk가 있으면
+     벡터 검색 없이 해당 chunk만 반환
+- 2) 없으면 law_short / article_no 메타데이터 필터를 벡터 검색에 push down (Pinecone)
+- 3) 그래도 결과가 없으면 일반 검색으로 fallback
+
+효과
+- 조문 인용형 질문에 더 적고 정확한 chunk → 프롬프트 축소, 임베딩/벡터 검색 생략
+"""
+
+
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from app.core.logger import get_logger
+from scripts.indexing.metadata_backfill import ARTICLE_RE, CLAUSE_RE
+
+logger = get_logger("chatbot-law-prod.citation_lookup")
+
+
+def _compact(text: str) -> str:
+    return "".join((text or "").split())
+
+
+@dataclass(frozen=True)
+class CitationQuery:
+    article_no: int
+    law_short: Optional[str] = None
+    clause_no: Optional[int] = None
+
+    def to_filter(self) -> Dict[str, Any]:
+        """Pinecone metadata filter"""
+        flt: Dict[str, Any] = {"article_no": {"$eq": self.article_no}}
+        if self.law_short:
+            flt["law_short"] = {"$eq": self.law_short}
+        return flt
+
+
+class LawNameResolver:
+    """law_map.json의 법령명(약칭/정식명칭)으로 질의 속 법령을 식별"""
+
+    def __init__(self, law_map: Dict[str, Any]) -> None:
+        names: List[Tuple[str, str]] = []
+        for info in law_map.values():
+            law_short = info.get("law_short") or info.get("law_title")
+            if not law_short:
+                continue
+            for name in (info.get("law_short"), info.get("law_title")):
+                if name:
+                    names.append((_compact(name), law_short))
+
+        ## 긴 이름 우선 ("…법 시행령"이 "…법"보다 먼저 매칭되도록)
+        self.names = sorted(set(names), key=lambda x: len(x[0]), reverse=True)
+
+    @classmethod
+    def load(cls, path: str) -> "LawNameResolver":
+        p = Path(path)
+        if not p.exists():
+            logger.warning("law_map.json not found: %s", p)
+            return cls({})
+        return cls(json.loads(p.read_text(encoding="utf-8")))
+
+    def resolve_law(self, query: str) -> Optional[str]:
+        compact = _compact(query)
+        for name, law_short in self.names:
+            if name in compact:
+                return law_short
+        return None
+
+    def parse(self, query: str) -> Optional[CitationQuery]:
+        """조문 번호가 있는 질의만 CitationQuery로 변환 (없으면 None)"""
+        m = ARTICLE_RE.search(query or "")
+        if not m:
+            return None
+
+        clause = CLAUSE_RE.search(query[m.end():])
+        return CitationQuery(
+            article_no=int(m.group(1)),
+            law_short=self.resolve_law(query),
+            clause_no=int(clause.group(1)) if clause else None,
+        )
+
+
+class ArticleIndex:
+    """
+    (law_short, article_no) → chunk 목록 색인.
+
+    정밀도 순위
+    - 0: chunk 본문에 조문 제목 헤더가 있음 ("제10조(지원대상)")
+    - 1: chunk 메타데이터 article_no(first_match)가 일치
+    조문을 단순 언급(참조)만 하는 chunk는 색인하지 않음
+    """
+
+    def __init__(self, records: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        self.records: List[Tuple[str, Dict[str, Any]]] = list(records)
+        self._index: Dict[Tuple[Optional[str], int], Dict[int, int]] = defaultdict(dict)
+
+        for row, (_, meta) in enumerate(self.records):
+            law_short = meta.get("law_short")
+            tiers: Dict[int, int] = {}
+
+            for m in ARTICLE_RE.finditer(meta.get("text") or ""):
+                if m.group(2):
+                    tiers[int(m.group(1))] = 0
+            if meta.get("article_no") is not None:
+                tiers.setdefault(int(meta["article_no"]), 1)
+
+            for article_no, tier in tiers.items():
+                for key in ((law_short, article_no), (None, article_no)):
+                    prev = self._index[key].get(row)
+                    self._index[key][row] = tier if prev is None else min(prev, tier)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def lookup(self, cq: CitationQuery, k: int) -> List[Document]:
+        hits = self._index.get((cq.law_short, cq.article_no)) or {}
+
+        def rank(row: int):
+            meta = self.records[row][1]
+            clause_miss = cq.clause_no is not None and meta.get("clause_no") != cq.clause_no
+            return (hits[row], clause_miss, meta.get("chunk_index") or 0)
+
+        return [self._to_document(row) for row in sorted(hits, key=rank)[:k]]
+
+    def _to_document(self, row: int) -> Document:
+        """Pinecone 결과와 동일한 형태 (text → page_content)"""
+        doc_id, meta = self.records[row]
+        metadata = dict(meta)
+        text = metadata.pop("text", "") or ""
+        return Document(id=doc_id, page_content=text, metadata=metadata)
+
+
+class CitationRetriever(BaseRetriever):
+    """조문 인용형 질의 fast path + 일반 검색 fallback"""
+
+    inner: BaseRetriever
+    resolver: LawNameResolver
+    article_index: Optional[ArticleIndex] = None
+    vectorstore: Optional[Any] = None  # metadata filter push down용 (Pinecone)
+    search_kwargs: Dict[str, Any] = {}
+    k: int = 5
+
+    def _direct(self, cq: CitationQuery) -> List[Document]:
+        if self.article_index is None:
+            return []
+        docs = self.article_index.lookup(cq, self.k)
+        if docs:
+            logger.info(
+                "Citation fast path: law=%s article=%s -> %d chunks (vector search skipped)",
+                cq.law_short or "-",
+                cq.article_no,
+                len(docs),
+            )
+        return docs
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        cq = self.resolver.parse(query)
+        if cq is not None:
+            docs = self._direct(cq)
+            if docs:
+                return docs
+            if self.vectorstore is not None:
+                docs = self.vectorstore.similarity_search(
+                    query, k=self.k, filter=cq.to_filter(), **self.search_kwargs
+                )
+                if docs:
+                    return docs
+
+        return self.inner.invoke(query, config={"callbacks": run_manager.get_child()})
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        cq = self.resolver.parse(query)
+        if cq is not None:
+            docs = self._direct(cq)
+            if docs:
+                return docs
+            if self.vectorstore is not None:
+                docs = await self.vectorstore.asimilarity_search(
+                    query, k=self.k, filter=cq.to_filter(), **self.search_kwargs
+                )
+                if docs:
+                    return docs
+
+        return await self.inner.ainvoke(query, config={"callbacks": run_manager.get_child()})
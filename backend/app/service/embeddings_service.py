@@ -1,23 +1,278 @@
+"""
+service/embeddings_service.py
+
+OpenAI Embeddings 생성 및 질의(query) 임베딩 캐시.
+
+캐시 구조 (CachedQueryEmbeddings)
+- key: sha256(model + 정규화된 질의 텍스트)
+- 1차: 프로세스 내 LRU (EMBEDDING_CACHE_MAX_ENTRIES)
+- 2차: (선택) SQLite 파일 (EMBEDDING_CACHE_PATH)
+  - 재시작 후에도 유지되고, 같은 파일을 쓰는 gunicorn worker 간 공유
+- embed_documents(인덱싱/배치)는 캐시하지 않고 그대로 위임
+- hit/miss 카운터는 /metrics(chatbot_embedding_cache_lookups_total)와 get_embedding_cache_stats()로 조회
+- aembed_query의 SQLite 조회/저장은 asyncio.to_thread로 실행 (잠금 대기(timeout=5s)가 이벤트 루프를 막지 않게)
+- cache miss(실제 API 호출)만 턴 사용량(usage_service)에 임베딩 토큰으로 기록
+"""
+
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
 from functools import lru_cache
+from typing import Dict, List, Optional
 
+import numpy as np
+from langchain_core.embeddings import Embeddings
 from langchain_openai import OpenAIEmbeddings
 
-from app.core.config import OPENAI_EMBEDDING_MODEL
+from app.core.config import (
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    EMBEDDING_CACHE_PATH,
+    OPENAI_EMBEDDING_MODEL,
+)
+from app.core.http_clients import get_async_http_client, get_http_client
 from app.core.logger import get_logger
+from app.core.metrics import EMBEDDING_CACHE_LOOKUPS, stage
+from app.service.usage_service import record_embedding_usage
 
 logger = get_logger("chatbot-law-prod.embeddings")
 
 
+def normalize_query_text(text: str) -> str:
+    """임베딩 캐시 키용 정규화 (NFC + 공백 정리만, 의미가 바뀌는 변환은 하지 않음)"""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def embedding_cache_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
+
+
+class _SqliteVectorStore:
+    """key → float32 vector BLOB 저장소 (WAL 모드, 프로세스 간 공유 가능)"""
+
+    def __init__(self, path: str) -> None:
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM query_embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float32).tolist()
+
+    def put(self, key: str, model: str, vector: List[float]) -> None:
+        blob = np.asarray(vector, dtype=np.float32).tobytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_embeddings (key, model, vector, created_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, model, blob, time.time()),
+            )
+            self._conn.commit()
+
+
+## 조회 결과(/metrics label) → 인스턴스 카운터 속성
+_STAT_ATTRS = {"hit_memory": "hits_memory", "hit_disk": "hits_disk", "miss": "misses"}
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    embed_query / aembed_query 결과를 캐시하는 Embeddings 래퍼.
+    (PineconeVectorStore 등 LangChain 컴포넌트에 그대로 주입 가능)
+    """
+
+    def __init__(
+        self,
+        inner: Embeddings,
+        *,
+        model: str,
+        max_entries: int,
+        sqlite_path: Optional[str] = None,
+    ) -> None:
+        self.inner = inner
+        self.model = model
+        self.max_entries = max_entries
+
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = _SqliteVectorStore(sqlite_path) if sqlite_path else None
+
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # cache tiers
+    # ------------------------------------------------------------------
+    def _remember(self, key: str, vector: List[float]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _count(self, result: str) -> None:
+        """조회 결과(hit_memory / hit_disk / miss)를 인스턴스 카운터와 /metrics에 반영"""
+        attr = _STAT_ATTRS[result]
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+        EMBEDDING_CACHE_LOOKUPS.inc(result)
+
+    def _memory_get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+        return vector
+
+    def _disk_get(self, key: str) -> Optional[List[float]]:
+        try:
+            return self._disk.get(key)
+        except sqlite3.Error as e:
+            logger.warning("Embedding disk cache read failed: %s", e)
+            return None
+
+    def _disk_put(self, key: str, vector: List[float]) -> None:
+        try:
+            self._disk.put(key, self.model, vector)
+        except sqlite3.Error as e:
+            logger.warning("Embedding disk cache write failed: %s", e)
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        vector = self._memory_get(key)
+        if vector is not None:
+            self._count("hit_memory")
+            return vector
+
+        if self._disk is not None:
+            vector = self._disk_get(key)
+            if vector is not None:
+                self._count("hit_disk")
+                self._remember(key, vector)
+                return vector
+
+        self._count("miss")
+        return None
+
+    async def _alookup(self, key: str) -> Optional[List[float]]:
+        vector = self._memory_get(key)
+        if vector is not None:
+            self._count("hit_memory")
+            return vector
+
+        if self._disk is not None:
+            ## SQLite 잠금 대기(최대 timeout)가 다른 요청을 막지 않도록 스레드에서 조회
+            vector = await asyncio.to_thread(self._disk_get, key)
+            if vector is not None:
+                self._count("hit_disk")
+                self._remember(key, vector)
+                return vector
+
+        self._count("miss")
+        return None
+
+    def _store(self, key: str, vector: List[float]) -> None:
+        self._remember(key, vector)
+        if self._disk is not None:
+            self._disk_put(key, vector)
+
+    async def _astore(self, key: str, vector: List[float]) -> None:
+        self._remember(key, vector)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk_put, key, vector)
+
+    # ------------------------------------------------------------------
+    # Embeddings interface
+    # ------------------------------------------------------------------
+    def embed_query(self, text: str) -> List[float]:
+        text = normalize_query_text(text)
+        key = embedding_cache_key(self.model, text)
+
+        vector = self._lookup(key)
+        if vector is None:
+            with stage("embed"):
+                vector = self.inner.embed_query(text)
+            record_embedding_usage(text)
+            self._store(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        text = normalize_query_text(text)
+        key = embedding_cache_key(self.model, text)
+
+        vector = await self._alookup(key)
+        if vector is None:
+            with stage("embed"):
+                vector = await self.inner.aembed_query(text)
+            record_embedding_usage(text)
+            await self._astore(key, vector)
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.inner.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.inner.aembed_documents(texts)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "size": len(self._memory),
+            }
+
+
 @lru_cache(maxsize=1)
-def get_embeddings() -> OpenAIEmbeddings:
+def get_embeddings() -> CachedQueryEmbeddings:
     """
     OpenAI Embeddings 객체를 생성하여 캐싱 후 반환합니다.
 
     - indexing 파이프라인과 동일한 모델을 사용해야 함
     - 서비스 전반에서 단일 embeddings 인스턴스를 공유
+    - HTTP 커넥션 풀은 ChatOpenAI와 공유 (core.http_clients)
+    - 질의 임베딩은 CachedQueryEmbeddings로 캐시 (memory LRU + 선택적 SQLite)
     """
     logger.info(
-        "Initializing OpenAIEmbeddings (cached). model=%s",
+        "Initializing OpenAIEmbeddings (cached). model=%s, cache_entries=%d, cache_path=%s",
         OPENAI_EMBEDDING_MODEL,
+        EMBEDDING_CACHE_MAX_ENTRIES,
+        EMBEDDING_CACHE_PATH or "-",
+    )
+    return CachedQueryEmbeddings(
+        OpenAIEmbeddings(
+            model=OPENAI_EMBEDDING_MODEL,
+            http_client=get_http_client(),
+            http_async_client=get_async_http_client(),
+        ),
+        model=OPENAI_EMBEDDING_MODEL,
+        max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+        sqlite_path=EMBEDDING_CACHE_PATH or None,
     )
-    return OpenAIEmbeddings(model=OPENAI_EMBEDDING_MODEL)
+
+
+def get_embedding_cache_stats() -> Dict[str, int]:
+    """질의 임베딩 캐시 hit/miss 카운터 (embeddings 미초기화 시 빈 dict)"""
+    if get_embeddings.cache_info().currsize == 0:
+        return {}
+    return get_embeddings().stats()
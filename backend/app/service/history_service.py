@@ -0,0 +1,140 @@
+"""
+service/history_service.py
+
+LLM 프롬프트에 넣을 대화 기록을 토큰 예산(HISTORY_TOKEN_BUDGET) 안에서 조립한다.
+
+동작
+- 누적 요약(Conversation.summary) + 요약 이후 메시지 원문을 사용
+- 원문은 최신 메시지부터 예산 안에 들어가는 만큼만 유지
+- 예산을 넘는 오래된 메시지는 기존 요약과 합쳐 새 요약으로 접음(fold)
+  - 접을 때는 예산의 절반까지 비워 두어, 다음 몇 턴 동안은 요약 호출이 필요 없게 함
+- 재사용하는 assistant 답변에서는 ⟦n⟧ 앵커를 제거
+  (당시 REF 번호는 이번 턴의 참고 문서 번호와 무관하고 토큰만 차지함)
+
+→ 세션 길이와 무관하게 히스토리 프롬프트 토큰이 대략 일정하게 유지됨
+"""
+
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+from app.core.config import (
+    HISTORY_SUMMARY_MAX_TOKENS,
+    HISTORY_TOKEN_BUDGET,
+    OPENAI_MODEL,
+)
+from app.core.logger import get_logger
+from app.service.usage_service import record_llm_usage
+
+logger = get_logger("chatbot-law-prod.history")
+
+ANCHOR_RE = re.compile(r"⟦\d+⟧")
+
+## fold 시 남길 원문 비율 (예산 대비)
+KEEP_RATIO_ON_FOLD = 0.5
+
+
+def strip_anchors(text: str) -> str:
+    return ANCHOR_RE.sub("", text or "").strip()
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """tiktoken 인코딩 (다운로드/로드 실패 시 None → 근사치 사용)"""
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(OPENAI_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("tiktoken unavailable, using approximate token counts: %s", e)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is None:
+        ## 한국어는 대략 글자당 1토큰 이하 → 글자 수를 보수적 상한으로 사용
+        return len(text or "")
+    return len(encoding.encode(text or ""))
+
+
+def format_message(role: str, content: str) -> str:
+    return f"{role}: {strip_anchors(content)}"
+
+
+@dataclass
+class HistoryWindow:
+    summary: Optional[str]
+    lines: List[str]
+    to_fold: List = field(default_factory=list)  # 요약으로 접어야 할 메시지 (seq 오름차순)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines).strip()
+
+
+def select_history(
+    messages: Sequence,
+    summary: Optional[str],
+    budget: int = HISTORY_TOKEN_BUDGET,
+) -> HistoryWindow:
+    """
+    messages(seq 오름차순)에서 예산 안에 들어가는 최신 메시지만 원문으로 남긴다.
+    예산을 넘으면 예산의 KEEP_RATIO_ON_FOLD 까지만 남기고 나머지는 to_fold로 반환.
+    """
+    available = max(budget - count_tokens(summary or ""), 0)
+    lines = [format_message(m.role, m.content) for m in messages]
+    costs = [count_tokens(line) + 1 for line in lines]
+
+    if sum(costs) <= available:
+        return HistoryWindow(summary=summary, lines=lines)
+
+    keep_budget = int(available * KEEP_RATIO_ON_FOLD)
+    kept = 0
+    used = 0
+    for cost in reversed(costs):
+        if used + cost > keep_budget:
+            break
+        used += cost
+        kept += 1
+
+    split = len(messages) - kept
+    return HistoryWindow(
+        summary=summary,
+        lines=lines[split:],
+        to_fold=list(messages[:split]),
+    )
+
+
+SUMMARY_PROMPT = (
+    "당신은 법률 상담 대화의 요약 담당자입니다.\n"
+    "아래 [기존 요약]과 [추가 대화]를 합쳐, 이후 상담에 필요한 사실관계·사용자 상황·"
+    "이미 안내한 절차/기관/조문만 간결한 한국어 bullet로 요약하십시오.\n"
+    "인사말, 중복 설명, 인용 앵커는 제외하십시오. "
+    f"전체 {HISTORY_SUMMARY_MAX_TOKENS} 토큰 이내로 작성하십시오.\n\n"
+    "[기존 요약]\n{previous}\n\n[추가 대화]\n{dialogue}"
+)
+
+
+async def summarize_history(llm, previous: Optional[str], messages: Sequence) -> str:
+    """기존 요약 + 접을 메시지를 새 누적 요약으로 만든다."""
+    dialogue = "\n".join(format_message(m.role, m.content) for m in messages)
+    prompt = SUMMARY_PROMPT.format(previous=previous or "(없음)", dialogue=dialogue)
+
+    response = await llm.bind(max_tokens=HISTORY_SUMMARY_MAX_TOKENS).ainvoke(prompt)
+    record_llm_usage(response)
+    summary = strip_anchors(getattr(response, "content", response) or "")
+
+    logger.info(
+        "History folded into summary. messages=%d, summary_tokens=%d",
+        len(messages),
+        count_tokens(summary),
+    )
+    return summary
@@ -0,0 +1,136 @@
+"""
+service/idempotency_service.py
+
+Idempotency-Key 헤더 처리 (채팅 턴 중복 실행 방지)
+
+흐름
+- acquire(): 키에 대해
+  1) 같은 프로세스에서 처리 중인 요청이 있으면 → 완료까지 기다렸다가 그 응답을 재생
+  2) idempotency_keys에 저장된(만료 전) 응답이 있으면 → 재생
+  3) 둘 다 없으면 → 이 요청이 claim을 잡고 실제로 처리 (재생 응답 None)
+- 처리한 요청은 append_turn과 같은 트랜잭션에 응답을 저장하고(repository.idempotency),
+  claim.resolve(response)로 대기 중인 중복 요청을 깨움
+- 처리가 실패/중단되면 claim이 풀리고, 대기하던 요청은 처음부터 다시 시도 (먼저 claim한 요청이 처리)
+
+주의
+- 처리 중(in-flight) 대기는 worker 프로세스 단위. 다른 worker에 동시에 들어온 중복 요청은
+  각자 처리하지만, 저장 시 PK 충돌로 한쪽만 커밋되고 나머지는 저장된 응답을 재생 (seq 중복 없음)
+- 같은 키를 다른 요청 본문에 재사용하면 IdempotencyKeyReused
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logger import get_logger
+from app.repository.idempotency import get_idempotency_record
+
+
+logger = get_logger("chatbot-law-prod.service.idempotency")
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+Slot = Tuple[str, str]
+
+
+class IdempotencyKeyReused(Exception):
+    """같은 Idempotency-Key로 다른 요청 본문이 들어옴"""
+
+
+class _Aborted(Exception):
+    """claim을 잡은 요청이 응답 없이 끝남 (대기 요청은 재시도)"""
+
+
+def fingerprint(message: str) -> str:
+    return hashlib.sha256(message.encode("utf-8")).hexdigest()
+
+
+class IdempotencyClaim:
+    """
+    키 처리 권한. with 블록을 resolve() 없이 벗어나면(예외, 클라이언트 연결 종료 등)
+    claim을 풀어 대기 중인 중복 요청이 다시 시도하게 함
+    """
+
+    def __init__(self, registry: "IdempotencyRegistry", slot: Slot, fingerprint: str) -> None:
+        self.key = slot[1]
+        self.fingerprint = fingerprint
+        self._registry = registry
+        self._slot = slot
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def resolve(self, response: Dict[str, Any]) -> None:
+        if not self.future.done():
+            self.future.set_result(response)
+        self._registry._release(self._slot, self)
+
+    def abort(self) -> None:
+        if not self.future.done():
+            self.future.set_exception(_Aborted())
+            self.future.exception()  ## 대기자가 없어도 "exception never retrieved" 경고가 나지 않도록
+        self._registry._release(self._slot, self)
+
+    def __enter__(self) -> "IdempotencyClaim":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.abort()
+
+
+class IdempotencyRegistry:
+    """처리 중인 (session_id, key) → claim (이벤트 루프 단일 스레드에서만 접근)"""
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Slot, IdempotencyClaim] = {}
+
+    async def acquire(
+            self,
+            db: AsyncSession,
+            session_id: str,
+            key: str,
+            request_fingerprint: str,
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[IdempotencyClaim]]:
+        """(재생할 응답, None) 또는 (None, 처리 claim)"""
+        slot = (session_id, key)
+
+        while True:
+            claim = self._inflight.get(slot)
+            if claim is not None:
+                if claim.fingerprint != request_fingerprint:
+                    raise IdempotencyKeyReused(key)
+                try:
+                    return await asyncio.shield(claim.future), None
+                except _Aborted:
+                    continue
+
+            record = await get_idempotency_record(db, session_id, key)
+            if record is not None:
+                if record.fingerprint != request_fingerprint:
+                    raise IdempotencyKeyReused(key)
+                return record.response, None
+
+            ## DB 조회(await) 사이에 다른 요청이 claim했으면 처음부터
+            if slot in self._inflight:
+                continue
+
+            claim = IdempotencyClaim(self, slot, request_fingerprint)
+            self._inflight[slot] = claim
+            return None, claim
+
+    def _release(self, slot: Slot, claim: IdempotencyClaim) -> None:
+        if self._inflight.get(slot) is claim:
+            del self._inflight[slot]
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+@lru_cache(maxsize=1)
+def get_idempotency_registry() -> IdempotencyRegistry:
+    return IdempotencyRegistry()
@@ -0,0 +1,155 @@
+"""
+service/lexical_index.py
+
+Lexical(BM25) 검색 + dense 검색 결과의 Reciprocal Rank Fusion(RRF).
+
+- 인덱싱 파이프라인이 만든 lexical.json(scripts/indexing/lexical.py)을 1회 로드
+  - 토큰화는 파이프라인과 동일한 char_ngrams 사용
+- HybridRetriever: dense retriever(Pinecone/local) 결과와 BM25 결과를 RRF로 병합
+  - "최우선변제", "제10조"처럼 정확한 용어가 중요한 질의의 recall 보완
+  - 더 작은 RAG_TOP_K로도 필요한 chunk를 확보 → 프롬프트 토큰 절감
+"""
+
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Sequence, Tuple
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from app.core.logger import get_logger
+from scripts.indexing.lexical import char_ngrams
+
+logger = get_logger("chatbot-law-prod.lexical_index")
+
+
+class LexicalIndex:
+    def __init__(self, payload: Dict[str, Any], *, k1: float = 1.5, b: float = 0.75) -> None:
+        self.ngram = int(payload.get("ngram", 2))
+        self.docs: List[Dict[str, Any]] = payload.get("docs", [])
+        self.avgdl = float(payload.get("avgdl") or 0.0) or 1.0
+        self.k1 = k1
+        self.b = b
+
+        n_docs = len(self.docs)
+        self.idf = {
+            term: math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            for term, df in (payload.get("df") or {}).items()
+        }
+
+        ## term → [(row, tf)] 역색인
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for row, doc in enumerate(self.docs):
+            for term, tf in (doc.get("tf") or {}).items():
+                self.postings[term].append((row, int(tf)))
+
+    @classmethod
+    def load(cls, path: str) -> "LexicalIndex":
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(payload)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """BM25 상위 k개 (row index, score)"""
+        scores: Dict[int, float] = defaultdict(float)
+
+        for term in set(char_ngrams(query, self.ngram)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for row, tf in self.postings.get(term, ()):
+                dl = self.docs[row].get("len") or 0
+                denom = tf + self.k1 * (1 - self.b + self.b * dl / self.avgdl)
+                scores[row] += idf * tf * (self.k1 + 1) / denom
+
+        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        return ranked[:k]
+
+    def to_document(self, row: int) -> Document:
+        """Pinecone 결과와 동일한 형태 (text → page_content)"""
+        doc = self.docs[row]
+        metadata = dict(doc.get("metadata") or {})
+        text = metadata.pop("text", "") or ""
+        return Document(id=doc.get("id"), page_content=text, metadata=metadata)
+
+
+def document_key(doc: Document) -> Hashable:
+    """
+    RRF 병합용 문서 식별자.
+    Vector ID 규칙 (scripts/indexing/pipeline.py 규칙과 동일)
+      f"{source}::{doc_sha[:12]}::{chunk_index}"
+    """
+    meta = doc.metadata or {}
+    source = meta.get("source")
+    doc_sha = meta.get("doc_sha")
+    chunk_index = meta.get("chunk_index")
+
+    if source and doc_sha and chunk_index is not None:
+        return f"{source}::{doc_sha[:12]}::{int(chunk_index)}"
+    if doc.id:
+        return doc.id
+    return hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Document]],
+    *,
+    k: int,
+    rrf_k: int = 60,
+) -> List[Document]:
+    """
+    RRF: score(d) = Σ 1 / (rrf_k + rank_i(d))  (rank는 1부터)
+    동일 문서는 처음 등장한 Document 객체를 사용
+    """
+    scores: Dict[Hashable, float] = defaultdict(float)
+    first_seen: Dict[Hashable, Document] = {}
+
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = document_key(doc)
+            scores[key] += 1.0 / (rrf_k + rank)
+            first_seen.setdefault(key, doc)
+
+    ordered = sorted(scores, key=lambda key: scores[key], reverse=True)
+    return [first_seen[key] for key in ordered[:k]]
+
+
+class HybridRetriever(BaseRetriever):
+    """dense retriever + BM25 lexical index → RRF 병합"""
+
+    dense: BaseRetriever
+    lexical: LexicalIndex
+    k: int = 5
+    lexical_k: int = 10
+    rrf_k: int = 60
+
+    def _lexical_docs(self, query: str) -> List[Document]:
+        return [self.lexical.to_document(row) for row, _ in self.lexical.search(query, self.lexical_k)]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        dense_docs = self.dense.invoke(query, config={"callbacks": run_manager.get_child()})
+        return reciprocal_rank_fusion(
+            [dense_docs, self._lexical_docs(query)], k=self.k, rrf_k=self.rrf_k
+        )
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        dense_docs = await self.dense.ainvoke(query, config={"callbacks": run_manager.get_child()})
+        return reciprocal_rank_fusion(
+            [dense_docs, self._lexical_docs(query)], k=self.k, rrf_k=self.rrf_k
+        )
@@ -1,55 +1,189 @@
 import uuid
 from functools import lru_cache
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
 
-from requests import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
+from app.core.deadline import DeadlineExceeded, within
 from app.core.logger import get_logger
-from app.repository.chat import list_messages
-from app.service.chain_builder import build_rag_chain
+from app.core.metrics import stage
+from app.repository.chat_async import (
+    load_history,
+    load_unsummarized_messages,
+    update_conversation_summary,
+)
+from app.service.history_service import select_history, summarize_history
+from app.service.usage_service import track_usage
 
 logger = get_logger("chatbot-law-prod.llm")
 
+HISTORY_LIMIT = 20
+
+
+class AskResult(NamedTuple):
+    answer: str
+    session_id: str
+    sources: List[Dict[str, Any]]
+    usage: Dict[str, Any]  ## usage_service.TurnUsage.to_dict()
+    degraded: Optional[str] = None  ## deadline 초과로 축소된 단계 (retrieval / generation)
+
 
 @lru_cache(maxsize=1)
 def get_chain():
+    ## langchain_openai / langchain_pinecone는 무거움 → app.main import 시점이 아니라 첫 체인 생성 때 로드
+    from app.service.chain_builder import build_rag_chain
+
     logger.info("Initializing RAG chain (cached).")
     return build_rag_chain()
 
 
-def ask_llm(db: Session, message: str, session_id: Optional[str] = None):
+async def _fold_unsummarized_before(
+    db: AsyncSession,
+    session_id: str,
+    chain,
+    window,
+    before_seq: int,
+) -> bool:
+    """
+    before_seq 이전의 미요약 메시지를 HISTORY_LIMIT개씩 누적 요약에 접는다. (window.summary 갱신)
+    - 묶음마다 요약을 저장 → deadline/LLM 실패로 중단돼도 이미 접은 부분은 다음 턴에 다시 접지 않음
+    - 동시 요청이 더 최신 요약을 저장했으면(갱신 실패) False → 이번 턴은 더 접지 않음
+    """
+    while True:
+        older = await load_unsummarized_messages(db, session_id, before_seq, HISTORY_LIMIT)
+        if not older:
+            return True
+
+        summary = await within(summarize_history(chain.llm, window.summary, older), "history")
+        if not await update_conversation_summary(db, session_id, summary, older[-1].seq):
+            return False
+        window.summary = summary
+
+        if len(older) < HISTORY_LIMIT:
+            return True
+
+
+async def _build_chain_inputs(
+    db: AsyncSession,
+    message: str,
+    session_id: str,
+    chain,
+) -> Dict[str, Any]:
+    """
+    누적 요약 + 토큰 예산 내 최근 히스토리 + 사용자 질문으로 체인 입력을 구성한다.
+    (DB 조회/저장은 AsyncSession으로 실행 — 스레드풀을 거치지 않음)
+
+    - question과 history를 분리해 전달 → 검색(임베딩)은 질문만 사용
+    - 예산을 넘는 오래된 메시지는 요약으로 접고 Conversation.summary에 저장
+      (조회 창 밖의 미요약 메시지까지 오래된 순으로 접음 → summary_upto_seq가 메시지를 건너뛰지 않음)
+    - 이번 질문 외에 이전 대화가 없는 턴만 cacheable=True (답변 캐시 대상)
+    - 요청 deadline의 history 예산을 넘기면 히스토리 없이 / 요약 없이 진행 (core.deadline)
+    """
+    ## 이번 질문은 아직 저장 전(라우터가 답변과 함께 append_turn) → 히스토리에 포함되지 않음
+    try:
+        with stage("history"):
+            summary, history = await within(load_history(db, session_id, HISTORY_LIMIT), "history")
+    except DeadlineExceeded:
+        ## 취소된 쿼리의 트랜잭션 정리 후 이번 턴은 대화 기록 없이 답변 (캐시 대상에서도 제외)
+        logger.warning("History load exceeded the request deadline. session_id=%s", session_id)
+        await db.rollback()
+        return {"question": message, "history": "", "cacheable": False}
+
+    window = select_history(history, summary)
+
+    if window.to_fold:
+        try:
+            with stage("summarize"):
+                ## 조회 창(HISTORY_LIMIT)이 꽉 찼으면 그보다 오래된 미요약 메시지가 남아 있을 수 있음
+                ## → 먼저 오래된 순으로 HISTORY_LIMIT개씩 접어 summary_upto_seq가 읽지 않은 메시지를 건너뛰지 않게 함
+                folded = len(history) < HISTORY_LIMIT or await _fold_unsummarized_before(
+                    db, session_id, chain, window, history[0].seq
+                )
+                if folded:
+                    window.summary = await within(
+                        summarize_history(chain.llm, window.summary, window.to_fold), "history"
+                    )
+                    await update_conversation_summary(db, session_id, window.summary, window.to_fold[-1].seq)
+        except Exception as e:
+            ## 요약 실패는 답변 실패로 이어지지 않게: 이번 턴은 기존 요약 + 예산 내 원문만 사용
+            logger.warning("History summarization failed. session_id=%s, error=%s", session_id, e)
+
+    blocks = []
+    if window.summary:
+        blocks.append(f"[이전 대화 요약]\n{window.summary}")
+    if window.text:
+        blocks.append(f"[대화 기록]\n{window.text}")
+
+    return {
+        "question": message,
+        "history": "\n\n".join(blocks),
+        "cacheable": not history and not summary,
+    }
+
+
+async def ask_llm(db: AsyncSession, message: str, session_id: Optional[str] = None):
     """
+    비동기 RAG 응답 생성.
+
+    - DB 조회(load_history)는 AsyncSession으로 실행하여 이벤트 루프를 막지 않음
+    - 히스토리는 토큰 예산 내 원문 + 누적 요약으로 구성 (history_service)
+    - Retrieval / LLM 호출은 chain.ainvoke로 비동기 처리
+    - 요약/재작성/답변 LLM 호출과 임베딩 토큰을 턴 단위로 집계 (usage_service)
+    - 요청 deadline(core.deadline)을 넘기면 예외 대신 축소된 답변 (degraded에 단계 이름)
+
     Returns:
-        (answer: str, session_id: str, sources: list[dict])
+        AskResult(answer, session_id, sources, usage, degraded)
     """
     if not session_id:
         session_id = str(uuid.uuid4())
         logger.info("Generated new session_id=%s", session_id)
 
-    HISTORY_LIMIT = 20
-    history = list_messages(db, session_id, limit=HISTORY_LIMIT)
-    history_text = "\n".join([f"{m.role}: {m.content}" for m in history]).strip()
+    ## 최초 1회 체인 생성(클라이언트/프롬프트 초기화)도 이벤트 루프 밖에서 수행
+    chain = await run_in_threadpool(get_chain)
 
-    if history and history[-1].role == "user" and history[-1].content.strip() == message.strip():
-        input_text = f"[대화 기록]\n{history_text}"
-    else:
-        input_text = (
-            f"[대화 기록]\n{history_text}\n\n[사용자 질문]\n{message}"
-            if history_text
-            else message
-        )
+    with track_usage() as usage:
+        inputs = await _build_chain_inputs(db, message, session_id, chain)
+        result = await chain.ainvoke(inputs)
 
-    chain = get_chain()
-
-    result = chain({"input": input_text})  # invoke와 동일하게 동작
     answer = (result.get("answer") or "").strip()
     sources = result.get("sources") or []
+    degraded = result.get("degraded")
 
     logger.info(
-        "ask_llm completed. session_id=%s, answer_len=%d, sources=%d",
+        "ask_llm completed. session_id=%s, answer_len=%d, sources=%d, "
+        "prompt_tokens=%d, completion_tokens=%d, cost_usd=%.6f",
         session_id,
         len(answer),
         len(sources),
+        usage.prompt_tokens,
+        usage.completion_tokens,
+        usage.cost_usd,
     )
 
-    return answer, session_id, sources
+    if degraded:
+        logger.warning("ask_llm degraded by deadline. session_id=%s, stage=%s", session_id, degraded)
+
+    return AskResult(answer, session_id, sources, usage.to_dict(), degraded)
+
+
+async def stream_llm(
+    db: AsyncSession,
+    message: str,
+    session_id: str,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    스트리밍 RAG 응답 생성.
+
+    Yields:
+        ("sources", list[dict]) 1회 → ("token", str) 반복 → ("usage", dict) 1회
+        (deadline 초과 시 "usage" 전에 ("degraded", stage) 1회)
+    """
+    chain = await run_in_threadpool(get_chain)
+
+    with track_usage() as usage:
+        inputs = await _build_chain_inputs(db, message, session_id, chain)
+        async for event, data in chain.astream(inputs):
+            yield event, data
+
+    yield "usage", usage.to_dict()
@@ -0,0 +1,112 @@
+"""
+service/local_index.py
+
+RETRIEVER_BACKEND=local 용 in-process 벡터 검색.
+
+- 인덱싱 파이프라인이 생성한 스냅샷(scripts/indexing/snapshot.py)을 로드
+  - vectors.npy: float32 (N, D), 행 단위 L2 정규화 → mmap으로 열기
+  - chunks.json: 행별 id / metadata(text 포함)
+- 검색: 질의 임베딩과 전체 행렬의 dot product (simsimd, 없으면 numpy)
+  → 코퍼스가 작아(수십~수천 chunk) 원격 벡터 DB 왕복 없이 sub-ms 검색
+- Pinecone 없이 local/dev/CI 환경에서도 동작
+"""
+
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+from app.core.logger import get_logger
+
+try:
+    import simsimd
+except ImportError:  # pragma: no cover - simsimd는 requirements에 포함
+    simsimd = None
+
+logger = get_logger("chatbot-law-prod.local_index")
+
+VECTORS_FILE = "vectors.npy"
+CHUNKS_FILE = "chunks.json"
+
+
+class LocalVectorIndex:
+    def __init__(self, vectors: np.ndarray, chunks: List[Dict[str, Any]], model: str = "") -> None:
+        if len(chunks) != vectors.shape[0]:
+            raise ValueError(
+                f"snapshot mismatch: {vectors.shape[0]} vectors vs {len(chunks)} chunks"
+            )
+        self.vectors = vectors
+        self.chunks = chunks
+        self.model = model
+
+    @classmethod
+    def load(cls, snapshot_dir: str) -> "LocalVectorIndex":
+        d = Path(snapshot_dir)
+        vectors = np.load(d / VECTORS_FILE, mmap_mode="r")
+        payload = json.loads((d / CHUNKS_FILE).read_text(encoding="utf-8"))
+        return cls(vectors, payload.get("chunks", []), model=payload.get("model", ""))
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def search(self, query_vector: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        """질의 벡터와 가장 가까운 상위 k개 (row index, score) — score는 cosine similarity"""
+        if not self.chunks or k <= 0:
+            return []
+
+        q = np.asarray(query_vector, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if norm > 0:
+            q = q / norm
+
+        if simsimd is not None:
+            scores = np.asarray(simsimd.cdist(q[None, :], self.vectors, metric="dot"))[0]
+        else:
+            scores = self.vectors @ q
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def to_document(self, row: int) -> Document:
+        """
+        Pinecone(langchain_pinecone)과 동일한 형태로 변환:
+        text는 page_content로 옮기고 metadata에서는 제외
+        """
+        chunk = self.chunks[row]
+        metadata = dict(chunk.get("metadata") or {})
+        text = metadata.pop("text", "") or ""
+        return Document(id=chunk.get("id"), page_content=text, metadata=metadata)
+
+
+class LocalVectorRetriever(BaseRetriever):
+    """LocalVectorIndex + (캐시된) 질의 임베딩 기반 LangChain Retriever"""
+
+    index: LocalVectorIndex
+    embeddings: Embeddings
+    k: int = 5
+
+    def _search(self, vector: Sequence[float]) -> List[Document]:
+        return [self.index.to_document(row) for row, _ in self.index.search(vector, self.k)]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self._search(self.embeddings.embed_query(query))
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self._search(await self.embeddings.aembed_query(query))
@@ -1,45 +1,191 @@
 from functools import lru_cache
-
-from langchain_pinecone import PineconeVectorStore
+from pathlib import Path
 
 from app.core.config import (
+    CITATION_FAST_PATH,
+    HYBRID_CANDIDATE_K,
+    HYBRID_RETRIEVAL,
+    LAW_MAP_PATH,
+    LEXICAL_INDEX_PATH,
+    LOCAL_INDEX_DIR,
+    OPENAI_EMBEDDING_MODEL,
     PINECONE_API_KEY,
     PINECONE_INDEX_NAME,
     PINECONE_NAMESPACE,
+    PINECONE_POOL_MAXSIZE,
+    PINECONE_POOL_THREADS,
     RAG_TOP_K,
+    RETRIEVER_BACKEND,
+    RRF_K,
 )
 from app.core.logger import get_logger
+from app.service.citation_lookup import ArticleIndex, CitationRetriever, LawNameResolver
 from app.service.embeddings_service import get_embeddings
+from app.service.lexical_index import HybridRetriever, LexicalIndex
+from app.service.local_index import LocalVectorIndex, LocalVectorRetriever
 
 logger = get_logger("chatbot-law-prod.retriever")
 
 
+def _build_local_retriever(k: int):
+    """로컬 벡터 스냅샷(mmap) 기반 Retriever"""
+    index = LocalVectorIndex.load(LOCAL_INDEX_DIR)
+    if index.model and index.model != OPENAI_EMBEDDING_MODEL:
+        logger.warning(
+            "Local snapshot model mismatch: snapshot=%s, runtime=%s",
+            index.model,
+            OPENAI_EMBEDDING_MODEL,
+        )
+
+    logger.info(
+        "Initializing local retriever (cached). dir=%s, chunks=%d, top_k=%s",
+        LOCAL_INDEX_DIR,
+        len(index),
+        k,
+    )
+    return LocalVectorRetriever(index=index, embeddings=get_embeddings(), k=k)
+
+
 @lru_cache(maxsize=1)
-def get_retriever():
+def get_pinecone_vectorstore():
     """
-    Pinecone 기반 Retriever를 생성하여 캐싱 후 반환합니다.
+    튜닝된 커넥션 풀로 Pinecone VectorStore 생성 (프로세스당 1개)
 
-    - VectorDB는 외부 상태를 가지므로, 매 요청마다 재생성할 필요 없음
-    - top_k 등 검색 파라미터는 config에서 관리
+    - 동기 Index(urllib3): PINECONE_POOL_MAXSIZE / PINECONE_POOL_THREADS
+    - 비동기 Index(aiohttp): open_vectorstore_session()으로 세션을 열어 두면 질의마다 재사용
+      (열지 않으면 langchain_pinecone이 질의마다 세션을 새로 만들고 닫음 → 매 턴 TLS handshake)
     """
-    logger.info(
-        "Initializing Pinecone retriever (cached). index=%s, top_k=%s",
-        PINECONE_INDEX_NAME,
-        RAG_TOP_K,
-    )
+    ## langchain_pinecone(+ pinecone 플러그인)은 import 비용/메모리가 큼 → Pinecone 백엔드일 때만 로드
+    from langchain_pinecone import PineconeVectorStore
+    from pinecone import Pinecone
 
-    embeddings = get_embeddings()
+    client = Pinecone(
+        api_key=PINECONE_API_KEY,
+        pool_threads=PINECONE_POOL_THREADS,
+        source_tag="langchain",
+    )
+    index = client.Index(name=PINECONE_INDEX_NAME, connection_pool_maxsize=PINECONE_POOL_MAXSIZE)
 
-    vectorstore = PineconeVectorStore(
-        index_name=PINECONE_INDEX_NAME,
-        embedding=embeddings,
-        pinecone_api_key=PINECONE_API_KEY,
+    return PineconeVectorStore(
+        index=index,
+        embedding=get_embeddings(),
         namespace=PINECONE_NAMESPACE,
     )
 
+
+async def open_vectorstore_session() -> None:
+    """비동기 Pinecone 세션을 현재 이벤트 루프에서 열어 둔다 (app.main lifespan warm-up에서 호출)"""
+    if RETRIEVER_BACKEND == "local" or get_pinecone_vectorstore.cache_info().currsize == 0:
+        return
+    await get_pinecone_vectorstore().__aenter__()
+
+
+async def close_vectorstore_session() -> None:
+    if get_pinecone_vectorstore.cache_info().currsize == 0:
+        return
+    await get_pinecone_vectorstore().aclose()
+
+
+def _build_pinecone_retriever(k: int):
+    logger.info(
+        "Initializing Pinecone retriever (cached). index=%s, top_k=%s, pool_maxsize=%d",
+        PINECONE_INDEX_NAME,
+        k,
+        PINECONE_POOL_MAXSIZE,
+    )
+
+    vectorstore = get_pinecone_vectorstore()
+
     return vectorstore.as_retriever(
         search_kwargs={
-            "k": int(RAG_TOP_K),
+            "k": k,
             "namespace": PINECONE_NAMESPACE,
         }
     )
+
+
+def _load_lexical_index():
+    """lexical 인덱스 로드 (없거나 깨졌으면 None → dense 단독 검색)"""
+    if not Path(LEXICAL_INDEX_PATH).exists():
+        logger.warning("Lexical index not found: %s (dense retrieval only)", LEXICAL_INDEX_PATH)
+        return None
+    try:
+        return LexicalIndex.load(LEXICAL_INDEX_PATH)
+    except Exception as e:
+        logger.exception("Failed to load lexical index: %s", e)
+        return None
+
+
+def _with_citation_fast_path(retriever, dense, lexical, k: int):
+    """
+    조문 인용형 질의 fast path로 감싼다.
+    - article 색인: lexical 인덱스(또는 로컬 스냅샷)의 chunk 메타/본문으로 구성
+    - Pinecone 백엔드면 law_short/article_no 메타데이터 필터 push down도 사용
+    """
+    records = None
+    if lexical is not None:
+        records = [(d.get("id"), d.get("metadata") or {}) for d in lexical.docs]
+    elif isinstance(dense, LocalVectorRetriever):
+        records = [(c.get("id"), c.get("metadata") or {}) for c in dense.index.chunks]
+
+    article_index = ArticleIndex(records) if records else None
+    vectorstore = getattr(dense, "vectorstore", None) if RETRIEVER_BACKEND != "local" else None
+
+    logger.info(
+        "Citation fast path enabled. article_index=%s, filter_pushdown=%s",
+        len(article_index) if article_index is not None else "-",
+        vectorstore is not None,
+    )
+    return CitationRetriever(
+        inner=retriever,
+        resolver=LawNameResolver.load(LAW_MAP_PATH),
+        article_index=article_index,
+        vectorstore=vectorstore,
+        search_kwargs={"namespace": PINECONE_NAMESPACE} if vectorstore is not None else {},
+        k=k,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_retriever():
+    """
+    검색 Retriever를 생성하여 캐싱 후 반환합니다.
+
+    - RETRIEVER_BACKEND=pinecone (기본): Pinecone 기반
+    - RETRIEVER_BACKEND=local: 로컬 벡터 스냅샷 기반 (원격 호출 없음)
+    - HYBRID_RETRIEVAL=true: dense 후보(HYBRID_CANDIDATE_K)와 BM25 후보를 RRF로 병합해 top_k 반환
+    - CITATION_FAST_PATH=true: "…법 제n조" 질의는 조문 chunk를 직접 조회 (벡터 검색 생략/축소)
+    - VectorDB는 외부 상태를 가지므로, 매 요청마다 재생성할 필요 없음
+    - top_k 등 검색 파라미터는 config에서 관리
+    """
+    top_k = int(RAG_TOP_K)
+    lexical = _load_lexical_index() if (HYBRID_RETRIEVAL or CITATION_FAST_PATH) else None
+    use_hybrid = HYBRID_RETRIEVAL and lexical is not None
+    dense_k = max(top_k, HYBRID_CANDIDATE_K) if use_hybrid else top_k
+
+    if RETRIEVER_BACKEND == "local":
+        dense = _build_local_retriever(dense_k)
+    else:
+        dense = _build_pinecone_retriever(dense_k)
+
+    retriever = dense
+    if use_hybrid:
+        logger.info(
+            "Hybrid retrieval enabled. lexical_docs=%d, candidates=%d, top_k=%d, rrf_k=%d",
+            len(lexical),
+            dense_k,
+            top_k,
+            RRF_K,
+        )
+        retriever = HybridRetriever(
+            dense=dense,
+            lexical=lexical,
+            k=top_k,
+            lexical_k=max(top_k, HYBRID_CANDIDATE_K),
+            rrf_k=RRF_K,
+        )
+
+    if CITATION_FAST_PATH:
+        retriever = _with_citation_fast_path(retriever, dense, lexical, top_k)
+
+    return retriever
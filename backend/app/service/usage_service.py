@@ -0,0 +1,97 @@
+"""
+service/usage_service.py
+
+채팅 턴 단위 토큰/비용 집계.
+
+- TurnUsage: 한 턴 동안 발생한 LLM(prompt/completion/cached) 및 임베딩 토큰 누적
+- ContextVar로 현재 턴의 TurnUsage를 보관
+  → chain_builder / history_service / embeddings_service가 호출 시점에 기록
+  (요청 처리 코루틴과 그 안의 executor 호출에서 같은 객체를 공유)
+- 비용은 config.MODEL_PRICING(USD / 1M tokens) 기준 추정치
+"""
+
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+
+from app.core.config import MODEL_PRICING, OPENAI_EMBEDDING_MODEL, OPENAI_MODEL
+
+
+@dataclass
+class TurnUsage:
+    model: str = OPENAI_MODEL
+    embedding_model: str = OPENAI_EMBEDDING_MODEL
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    embedding_tokens: int = 0
+
+    def add_llm(self, usage_metadata: Optional[Dict[str, Any]]) -> None:
+        """LangChain AIMessage.usage_metadata 누적"""
+        if not usage_metadata:
+            return
+        self.prompt_tokens += int(usage_metadata.get("input_tokens") or 0)
+        self.completion_tokens += int(usage_metadata.get("output_tokens") or 0)
+        details = usage_metadata.get("input_token_details") or {}
+        self.cached_tokens += int(details.get("cache_read") or 0)
+
+    def add_embedding(self, tokens: int) -> None:
+        self.embedding_tokens += int(tokens)
+
+    @property
+    def cost_usd(self) -> float:
+        llm = MODEL_PRICING.get(self.model) or {}
+        emb = MODEL_PRICING.get(self.embedding_model) or {}
+
+        uncached = max(self.prompt_tokens - self.cached_tokens, 0)
+        cost = (
+            uncached * llm.get("input", 0.0)
+            + self.cached_tokens * llm.get("cached_input", llm.get("input", 0.0))
+            + self.completion_tokens * llm.get("output", 0.0)
+            + self.embedding_tokens * emb.get("input", 0.0)
+        )
+        return round(cost / 1_000_000, 8)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "embedding_tokens": self.embedding_tokens,
+            "cost_usd": self.cost_usd,
+        }
+
+
+_usage_ctx: ContextVar[Optional[TurnUsage]] = ContextVar("turn_usage", default=None)
+
+
+@contextmanager
+def track_usage() -> Iterator[TurnUsage]:
+    """with 블록 동안 발생한 토큰 사용량을 새 TurnUsage에 누적"""
+    usage = TurnUsage()
+    token = _usage_ctx.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage_ctx.reset(token)
+
+
+def record_llm_usage(message: Any) -> None:
+    usage = _usage_ctx.get()
+    if usage is not None:
+        usage.add_llm(getattr(message, "usage_metadata", None))
+
+
+def record_embedding_usage(text: str) -> None:
+    """임베딩 API는 LangChain에서 usage를 돌려주지 않으므로 tiktoken으로 계산"""
+    usage = _usage_ctx.get()
+    if usage is not None:
+        ## history_service → usage_service 순환 import 방지
+        from app.service.history_service import count_tokens
+
+        usage.add_embedding(count_tokens(text))
@@ -0,0 +1,228 @@
+"""
+service/warmup_service.py
+
+시작 시 백그라운드 warm-up + dependency별 readiness probe
+
+warm-up (app.main lifespan에서 백그라운드 task로 1회 실행)
+- RAG 체인 생성: keyword dictionary, ChatOpenAI, retriever(Pinecone/로컬 스냅샷) 초기화
+  (langchain_openai / langchain_pinecone import도 app.main import 시점이 아니라 여기서 발생)
+- tiktoken 인코딩 로드 (history_service)
+- Pinecone 비동기 세션 열기 (retriever_service, 이 이벤트 루프에서 질의마다 재사용)
+- DB 커넥션 풀 연결 + probe 질의(WARMUP_QUERY) 임베딩/검색 → 첫 채팅 요청이 초기화 비용을 내지 않음
+
+readiness (GET /health/ready)
+- chain: warm-up으로 체인이 생성됐는지 (probe가 체인을 직접 만들지 않음)
+- database: 비동기 엔진으로 SELECT 1
+- retrieval: WARMUP_QUERY 검색 (질의 임베딩은 임베딩 캐시 hit → 반복 probe는 벡터 검색만)
+  - 참고용(informational): 결과는 payload에 포함하지만 ready 판정에는 쓰지 않음
+    (Pinecone/OpenAI 일시 장애로 LB가 모든 인스턴스를 unhealthy로 보고 교체하지 않게)
+- probe 결과는 READINESS_PROBE_TTL_SECONDS 동안 재사용 (LB 헬스체크마다 외부 호출하지 않음)
+- 같은 dependency의 probe는 동시에 1개만 실행, READINESS_PROBE_TIMEOUT_SECONDS 초과는 실패
+
+주의
+- warm-up 실패는 로그만 남기고 앱은 계속 동작 (readiness가 not ready로 보고)
+- 값은 프로세스(worker) 단위
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import (
+    READINESS_PROBE_TIMEOUT_SECONDS,
+    READINESS_PROBE_TTL_SECONDS,
+    WARMUP_QUERY,
+)
+from app.core.logger import get_logger
+
+logger = get_logger("chatbot-law-prod.warmup")
+
+
+Probe = Callable[[], Awaitable[None]]
+
+
+@dataclass
+class ProbeResult:
+    ok: bool
+    latency_ms: float
+    checked_at: float  ## time.monotonic()
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "ok": self.ok,
+            "latency_ms": round(self.latency_ms, 1),
+            "error": self.error,
+        }
+
+
+class Readiness:
+    """dependency 이름 → probe. 결과는 ttl 동안 캐시 (informational probe는 ready 판정에서 제외)"""
+
+    def __init__(
+        self,
+        probes: Dict[str, Probe],
+        ttl: float = READINESS_PROBE_TTL_SECONDS,
+        timeout: float = READINESS_PROBE_TIMEOUT_SECONDS,
+        informational: Iterable[str] = (),
+    ) -> None:
+        self.probes = probes
+        self.informational = frozenset(informational)
+        self.ttl = ttl
+        self.timeout = timeout
+        self._results: Dict[str, ProbeResult] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _fresh(self, name: str) -> Optional[ProbeResult]:
+        result = self._results.get(name)
+        if result is not None and time.monotonic() - result.checked_at < self.ttl:
+            return result
+        return None
+
+    async def check(self, name: str, force: bool = False) -> ProbeResult:
+        if not force and (cached := self._fresh(name)) is not None:
+            return cached
+
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            ## 기다리는 동안 다른 요청이 probe를 끝냈으면 그 결과 사용
+            if not force and (cached := self._fresh(name)) is not None:
+                return cached
+
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self.probes[name](), timeout=self.timeout)
+                error = None
+            except asyncio.TimeoutError:
+                error = f"timed out after {self.timeout:g}s"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+
+            result = ProbeResult(
+                ok=error is None,
+                latency_ms=(time.perf_counter() - start) * 1000,
+                checked_at=time.monotonic(),
+                error=error,
+            )
+            if error is not None:
+                logger.warning("Readiness probe failed. dependency=%s, error=%s", name, error)
+            self._results[name] = result
+            return result
+
+    async def check_all(self, force: bool = False) -> Dict[str, ProbeResult]:
+        names = list(self.probes)
+        results = await asyncio.gather(*(self.check(n, force) for n in names))
+        return dict(zip(names, results))
+
+    def report(self, results: Dict[str, ProbeResult]) -> Dict[str, object]:
+        ready = all(r.ok for name, r in results.items() if name not in self.informational)
+        return {
+            "status": "ready" if ready else "not_ready",
+            "dependencies": {
+                name: {**r.to_dict(), "required": name not in self.informational}
+                for name, r in results.items()
+            },
+        }
+
+
+# -----------------------------------------------------------------------------
+# Default probes
+# -----------------------------------------------------------------------------
+def _built_chain():
+    """이미 생성된 체인 (아직이면 None — probe가 체인 생성 비용을 대신 내지 않게)"""
+    from app.service import llm_service
+
+    cache_info = getattr(llm_service.get_chain, "cache_info", None)
+    if cache_info is not None and cache_info().currsize == 0:
+        return None
+    return llm_service.get_chain()
+
+
+async def _probe_chain() -> None:
+    if _built_chain() is None:
+        raise RuntimeError("RAG chain not built yet (warm-up in progress)")
+
+
+async def _probe_database() -> None:
+    from app.db import get_async_engine
+
+    async with get_async_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _probe_retrieval() -> None:
+    chain = _built_chain()
+    if chain is None:
+        raise RuntimeError("retriever not built yet (warm-up in progress)")
+    await chain.retriever.ainvoke(WARMUP_QUERY)
+
+
+@lru_cache(maxsize=1)
+def get_readiness() -> Readiness:
+    return Readiness(
+        {
+            "chain": _probe_chain,
+            "database": _probe_database,
+            "retrieval": _probe_retrieval,
+        },
+        ## 외부 API(Pinecone/OpenAI) 의존 probe는 상태 확인용으로만 노출
+        informational=("retrieval",),
+    )
+
+
+# -----------------------------------------------------------------------------
+# Warm-up
+# -----------------------------------------------------------------------------
+async def warm_up(readiness: Optional[Readiness] = None) -> Dict[str, ProbeResult]:
+    """체인/인코딩 초기화(스레드풀) 후 모든 probe를 강제로 1회 실행"""
+    from app.service import llm_service
+    from app.service.history_service import _get_encoding
+
+    readiness = readiness or get_readiness()
+    start = time.perf_counter()
+
+    for name, init in (("chain", llm_service.get_chain), ("tiktoken", _get_encoding)):
+        try:
+            await run_in_threadpool(init)
+        except Exception as e:
+            logger.exception("Warm-up step failed. step=%s, error=%s", name, e)
+
+    try:
+        from app.service.retriever_service import open_vectorstore_session
+
+        await open_vectorstore_session()
+    except Exception as e:
+        logger.exception("Warm-up step failed. step=vectorstore_session, error=%s", e)
+
+    ## database probe가 커넥션 풀을 열고, retrieval probe가 임베딩/검색 클라이언트 연결을 맺음
+    results = await readiness.check_all(force=True)
+
+    logger.info(
+        "Warm-up finished in %.0fms. %s",
+        (time.perf_counter() - start) * 1000,
+        ", ".join(f"{n}={'ok' if r.ok else 'fail'}" for n, r in results.items()),
+    )
+    return results
+
+
+async def release_pools() -> None:
+    """종료 시 공유 HTTP 풀 / Pinecone 세션 정리 (app.main lifespan)"""
+    from app.core.http_clients import close_http_clients
+
+    ## retriever가 한 번도 로드되지 않았으면 정리할 것도 없음 (종료 시점에 무거운 import 방지)
+    retriever_service = sys.modules.get("app.service.retriever_service")
+    if retriever_service is not None:
+        try:
+            await retriever_service.close_vectorstore_session()
+        except Exception as e:
+            logger.warning("Failed to close Pinecone session: %s", e)
+    await close_http_clients()
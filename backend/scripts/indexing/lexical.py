@@ -0,0 +1,76 @@
+"""
+Lexical(BM25) 인덱스 생성 — 한국어 문자 n-gram 기반
+
+- 법률 질의는 "최우선변제", "제10조" 같은 정확한 용어가 중요한데
+  dense 임베딩은 이런 차이를 흐리기 쉬움 → lexical 검색과 RRF로 결합
+- 형태소 분석기 없이 문자 n-gram(기본 bigram)으로 토큰화
+- 토큰화 함수(char_ngrams)는 서버(app/service/lexical_index.py)와 공유
+
+산출물 (JSON)
+- {"version", "ngram", "count", "avgdl", "df": {term: n}, "docs": [{"id", "metadata", "tf", "len"}]}
+  (metadata에는 text 포함)
+"""
+
+import json
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List
+
+LEXICAL_INDEX_VERSION = 1
+
+_WORD_RE = re.compile(r"[0-9a-z가-힣]+")
+
+
+def char_ngrams(text: str, n: int = 2) -> List[str]:
+    """
+    단어(한글/영문/숫자 연속) 단위로 문자 n-gram을 만든다.
+    n보다 짧은 단어는 단어 자체를 토큰으로 사용.
+    예) "제10조 최우선변제" → ["제1", "10", "0조", "최우", "우선", "선변", "변제"]
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    tokens: List[str] = []
+    for word in _WORD_RE.findall(text):
+        if len(word) <= n:
+            tokens.append(word)
+            continue
+        tokens.extend(word[i:i + n] for i in range(len(word) - n + 1))
+    return tokens
+
+
+def build_lexical_index(rows: List[Dict[str, Any]], n: int = 2) -> Dict[str, Any]:
+    """
+    rows: 스냅샷 row 목록 ({"id", "metadata"(text 포함)})
+    """
+    docs: List[Dict[str, Any]] = []
+    df: Counter = Counter()
+
+    for r in rows:
+        metadata = r.get("metadata") or {}
+        tf = Counter(char_ngrams(metadata.get("text") or "", n))
+        df.update(tf.keys())
+        docs.append({
+            "id": r["id"],
+            "metadata": metadata,
+            "tf": dict(tf),
+            "len": sum(tf.values()),
+        })
+
+    total = sum(d["len"] for d in docs)
+    return {
+        "version": LEXICAL_INDEX_VERSION,
+        "ngram": n,
+        "count": len(docs),
+        "avgdl": (total / len(docs)) if docs else 0.0,
+        "df": dict(df),
+        "docs": docs,
+    }
+
+
+def save_lexical_index(path: str, index: Dict[str, Any]) -> None:
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(p.name + ".tmp")
+    tmp.write_text(json.dumps(index, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(p)
@@ -4,8 +4,6 @@ import re
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 
-from pinecone import Pinecone
-
 # =========================================================
 # Config
 # =========================================================
@@ -268,6 +266,9 @@ def sanitize_pinecone_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
 # Main backfill logic
 # =========================================================
 def main() -> None:
+    ## 파싱 유틸(ARTICLE_RE 등)은 서버에서도 import하므로 pinecone은 실행 시점에만 로드
+    from pinecone import Pinecone
+
     s = BackfillSettings()
     if not s.pinecone_index_name:
         raise ValueError("PINECONE_INDEX_NAME is required (env).")
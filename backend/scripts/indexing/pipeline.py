@@ -1,7 +1,7 @@
 import hashlib
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from .settings import load_settings
 from .logger import get_logger
@@ -11,6 +11,9 @@ from .cleaner import light_clean
 from .chunker import chunk_text
 from .embedder import Embedder
 from .pinecone_store import PineconeStore
+from .metadata_backfill import build_citation, load_json, parse_law_refs
+from .snapshot import load_snapshot_rows, save_snapshot
+from .lexical import build_lexical_index, save_lexical_index
 
 log = get_logger("indexing.pipeline")
 
@@ -33,6 +36,27 @@ def build_vector_id(source: str, doc_sha: str, chunk_index: int) -> str:
     """
     return f"{source}::{doc_sha[:12]}::{chunk_index}"
 
+def build_snapshot_metadata(metadata: Dict[str, Any], chunk: str, law_map: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    로컬 스냅샷용 메타데이터: Pinecone 메타데이터 + text + 법령/조문 메타
+    (Pinecone은 metadata_backfill로 사후 보강하지만, 로컬 스냅샷은 생성 시점에 보강)
+    """
+    law_info = law_map.get(metadata["source"]) or {}
+    law_title = law_info.get("law_title") or metadata["source"]
+    law_short = law_info.get("law_short") or law_title
+    refs = parse_law_refs(chunk)
+
+    enriched = dict(metadata)
+    enriched.update({
+        "text": chunk,
+        "law_title": law_title,
+        "law_short": law_short,
+        "citation": build_citation(law_short, refs),
+        "pipeline_version": "indexing-v1",
+        **refs,
+    })
+    return enriched
+
 def process_one_doc(
     *,
     doc_path: Path,
@@ -40,17 +64,25 @@ def process_one_doc(
     embedder: Embedder,
     settings,
     manifest: Dict[str, Any],
+    snapshot_rows: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+    law_map: Optional[Dict[str, Any]] = None,
 ) -> None:
     filename = doc_path.name
     doc_sha = file_sha256(doc_path)
 
+    # 스냅샷에 아직 없는 문서는 Pinecone 쓰기 없이 스냅샷용으로만 다시 임베딩
+    snapshot_only = False
     prev = manifest.get(filename)
     if prev and prev.get("sha256") == doc_sha:
-        log.info(f"SKIP unchanged: {filename}")
-        return
+        cached = (snapshot_rows or {}).get(filename) or []
+        if snapshot_rows is None or (cached and cached[0]["metadata"].get("doc_sha") == doc_sha):
+            log.info(f"SKIP unchanged: {filename}")
+            return
+        log.info(f"SNAPSHOT ONLY (unchanged in Pinecone): {filename}")
+        snapshot_only = True
 
     # 변경된 문서면 기존 벡터 삭제(중복/잔존 방지)
-    if prev:
+    if prev and not snapshot_only:
         if settings.dry_run:
             log.info(f"DRY_RUN=true -> skip delete_by_source: {filename}")
         else:
@@ -73,6 +105,7 @@ def process_one_doc(
 
     # Pinecone upsert batch
     vectors: List[Dict[str, Any]] = []
+    doc_rows: List[Dict[str, Any]] = []
     for i, (chunk, vec) in enumerate(zip(chunks, embeddings)):
         metadata = {
             "source": filename,           # delete/filter 핵심 키
@@ -84,8 +117,19 @@ def process_one_doc(
         if settings.store_text_in_metadata:
             metadata["text"] = chunk
 
+        vector_id = build_vector_id(filename, doc_sha, i)
+        if snapshot_rows is not None:
+            doc_rows.append({
+                "id": vector_id,
+                "values": vec,
+                "metadata": build_snapshot_metadata(metadata, chunk, law_map or {}),
+            })
+
+        if snapshot_only:
+            continue
+
         vectors.append({
-            "id": build_vector_id(filename, doc_sha, i),
+            "id": vector_id,
             "values": vec,
             "metadata": metadata,
         })
@@ -103,6 +147,12 @@ def process_one_doc(
         else:
             store.upsert(vectors)
 
+    if snapshot_rows is not None:
+        snapshot_rows[filename] = doc_rows
+
+    if snapshot_only:
+        return
+
     # manifest 갱신
     manifest[filename] = {
         "sha256": doc_sha,
@@ -129,6 +179,16 @@ def main() -> None:
     doc_paths = sorted(raw_dir.glob("*.docx"))
     log.info(f"FOUND DOCX: {len(doc_paths)} in {raw_dir}")
 
+    # 로컬 벡터 스냅샷: 기존 스냅샷을 source 단위로 재사용하고 변경분만 교체
+    snapshot_rows = None
+    law_map: Dict[str, Any] = {}
+    if settings.write_local_snapshot:
+        snapshot_rows = load_snapshot_rows(settings.local_index_dir)
+        if Path(settings.law_map_path).exists():
+            law_map = load_json(settings.law_map_path)
+        else:
+            log.warning(f"LAW MAP not found: {settings.law_map_path} (snapshot without law metadata)")
+
     if settings.dry_run:
         log.info("DRY_RUN=true -> will NOT write to Pinecone (no delete/upsert).")
 
@@ -140,6 +200,8 @@ def main() -> None:
                 embedder=embedder,
                 settings=settings,
                 manifest=manifest,
+                snapshot_rows=snapshot_rows,
+                law_map=law_map,
             )
         except Exception as e:
             # 운영에서는 한 파일 실패로 전체 중단하지 않게(원하면 fail-fast로 바꿀 수 있음)
@@ -151,4 +213,15 @@ def main() -> None:
         save_manifest(settings.manifest_path, manifest)
         log.info(f"MANIFEST SAVED: {settings.manifest_path}")
 
+        if snapshot_rows is not None:
+            # raw_docs에서 사라진 문서는 스냅샷에서도 제외
+            current = {p.name for p in doc_paths}
+            rows = [r for src in sorted(snapshot_rows) if src in current for r in snapshot_rows[src]]
+            save_snapshot(settings.local_index_dir, rows, model=settings.openai_embedding_model)
+            log.info(f"LOCAL SNAPSHOT SAVED: {settings.local_index_dir} (chunks={len(rows)})")
+
+            lexical = build_lexical_index(rows, n=settings.lexical_ngram)
+            save_lexical_index(settings.lexical_index_path, lexical)
+            log.info(f"LEXICAL INDEX SAVED: {settings.lexical_index_path} (terms={len(lexical['df'])})")
+
     log.info("✅ Indexing pipeline completed.")
@@ -20,6 +20,7 @@ class Settings:
     # Paths
     raw_docs_dir: str = os.getenv("RAW_DOCS_DIR", "data/raw_docs")
     manifest_path: str = os.getenv("INDEX_MANIFEST_PATH", "data/index_manifest.json")
+    law_map_path: str = os.getenv("LAW_MAP_PATH", "data/law_map.json")
 
     # OpenAI embeddings
     openai_embedding_model: str = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
@@ -38,6 +39,14 @@ class Settings:
     # Store text inside metadata (RAG retrieval 편의)
     store_text_in_metadata: bool = os.getenv("STORE_TEXT_IN_METADATA", "true").lower() == "true"
 
+    # Local vector snapshot (RETRIEVER_BACKEND=local): vectors.npy + chunks.json
+    local_index_dir: str = os.getenv("LOCAL_INDEX_DIR", "data/local_index")
+    write_local_snapshot: bool = os.getenv("WRITE_LOCAL_SNAPSHOT", "true").lower() == "true"
+
+    # Lexical(BM25, 문자 n-gram) 인덱스 — 로컬 스냅샷과 함께 생성
+    lexical_index_path: str = os.getenv("LEXICAL_INDEX_PATH", "data/local_index/lexical.json")
+    lexical_ngram: int = int(os.getenv("LEXICAL_NGRAM", "2"))
+
     # Safety
     fail_on_missing_env: bool = os.getenv("FAIL_ON_MISSING_ENV", "true").lower() == "true"
 
@@ -0,0 +1,71 @@
+"""
+로컬 벡터 스냅샷 (RETRIEVER_BACKEND=local 용)
+
+구성 (snapshot_dir 아래)
+- vectors.npy : float32 (N, D) 행렬, 각 행은 L2 정규화(dot product == cosine)
+- chunks.json : {"model", "dim", "count", "created_at", "chunks": [{"id", "metadata"}, ...]}
+  (chunks[i]가 vectors[i]에 대응, metadata에는 text 및 law/citation 메타 포함)
+
+서버는 vectors.npy를 mmap으로 열어 사용한다 (app/service/local_index.py).
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+VECTORS_FILE = "vectors.npy"
+CHUNKS_FILE = "chunks.json"
+
+
+def load_snapshot_rows(snapshot_dir: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    기존 스냅샷을 source별 row 목록으로 로드한다. (없으면 빈 dict)
+    row: {"id", "values", "metadata"}
+    """
+    d = Path(snapshot_dir)
+    if not (d / VECTORS_FILE).exists() or not (d / CHUNKS_FILE).exists():
+        return {}
+
+    vectors = np.load(d / VECTORS_FILE)
+    chunks = json.loads((d / CHUNKS_FILE).read_text(encoding="utf-8")).get("chunks", [])
+
+    rows: Dict[str, List[Dict[str, Any]]] = {}
+    for chunk, vec in zip(chunks, vectors):
+        source = (chunk.get("metadata") or {}).get("source") or ""
+        rows.setdefault(source, []).append(
+            {"id": chunk["id"], "values": vec.tolist(), "metadata": chunk.get("metadata") or {}}
+        )
+    return rows
+
+
+def save_snapshot(snapshot_dir: str, rows: List[Dict[str, Any]], model: str) -> None:
+    d = Path(snapshot_dir)
+    d.mkdir(parents=True, exist_ok=True)
+
+    if rows:
+        matrix = np.asarray([r["values"] for r in rows], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1.0, norms)
+    else:
+        matrix = np.zeros((0, 0), dtype=np.float32)
+
+    ## 임시 파일에 쓴 뒤 교체 (서버가 읽는 도중 깨진 파일을 보지 않도록)
+    tmp_vectors = d / (VECTORS_FILE + ".tmp")
+    with tmp_vectors.open("wb") as f:
+        np.save(f, matrix)
+
+    payload = {
+        "model": model,
+        "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        "count": len(rows),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "chunks": [{"id": r["id"], "metadata": r["metadata"]} for r in rows],
+    }
+    tmp_chunks = d / (CHUNKS_FILE + ".tmp")
+    tmp_chunks.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+
+    tmp_vectors.replace(d / VECTORS_FILE)
+    tmp_chunks.replace(d / CHUNKS_FILE)
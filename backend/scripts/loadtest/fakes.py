@@ -0,0 +1,153 @@
+"""
+scripts/loadtest/fakes.py
+
+오프라인 부하 테스트용 fake 구성요소 (네트워크 호출 없음)
+
+- FakeEmbeddings: 결정적(deterministic) 임베딩 + 설정 가능한 지연
+- FakeRetriever: 고정 문서 목록을 돌려주는 retriever + 설정 가능한 지연
+- FakeChatModel: 고정 답변(⟦n⟧ 앵커 포함) + usage_metadata
+  - invoke/ainvoke: latency 만큼 대기 후 전체 답변
+  - astream: latency를 토큰 수로 나눠 토큰 단위로 대기하며 스트리밍
+
+지연은 time.sleep / asyncio.sleep으로 흉내 내므로
+워커 모델, DB 계층, middleware 변경 전후의 처리량 비교에 사용한다.
+"""
+
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.retrievers import BaseRetriever
+
+
+FAKE_ANSWER = (
+    "1. 전세사기피해자는 피해자 결정을 신청할 수 있습니다. ⟦1⟧\n"
+    "2. 신청은 관할 시·도에 서면으로 합니다. ⟦2⟧\n"
+    "근거가 부족한 내용은 포함하지 않았습니다."
+)
+
+
+def build_fake_documents(n: int) -> List[Document]:
+    return [
+        Document(
+            page_content=f"제{i + 1}조(목적) 이 법은 전세사기피해자를 지원하기 위한 사항을 규정한다. " * 8,
+            metadata={
+                "source": f"loadtest_{i + 1}.docx",
+                "doc_sha": f"{i + 1:064x}",
+                "chunk_index": i,
+                "law_name": "전세사기피해자 지원 및 주거안정에 관한 특별법",
+                "article_no": str(i + 1),
+            },
+        )
+        for i in range(n)
+    ]
+
+
+class FakeEmbeddings(DeterministicFakeEmbedding):
+    latency: float = 0.0
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return super().embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await asyncio.sleep(self.latency)
+        return super().embed_query(text)
+
+
+class FakeRetriever(BaseRetriever):
+    documents: List[Document]
+    latency: float = 0.0
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        time.sleep(self.latency)
+        return list(self.documents)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        await asyncio.sleep(self.latency)
+        return list(self.documents)
+
+
+class FakeChatModel(BaseChatModel):
+    answer: str = FAKE_ANSWER
+    latency: float = 0.0  ## 응답 전체 소요 시간(초)
+
+    @property
+    def _llm_type(self) -> str:
+        return "loadtest-fake"
+
+    def _tokens(self) -> List[str]:
+        return self.answer.split(" ")
+
+    def _usage(self, messages: List[BaseMessage]) -> dict:
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 2
+        completion_tokens = len(self._tokens())
+        return {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        message = AIMessage(content=self.answer, usage_metadata=self._usage(messages))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        return self._result(messages)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._result(messages)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        tokens = self._tokens()
+        for i, token in enumerate(tokens):
+            time.sleep(self.latency / len(tokens))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token if i == 0 else " " + token))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(messages)))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        tokens = self._tokens()
+        for i, token in enumerate(tokens):
+            await asyncio.sleep(self.latency / len(tokens))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token if i == 0 else " " + token))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(messages)))
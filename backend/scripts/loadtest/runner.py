@@ -0,0 +1,317 @@
+"""
+scripts/loadtest/runner.py
+
+채팅 API 오프라인 부하 테스트 / 벤치마크
+
+- 실제 FastAPI app(app.main)을 httpx.AsyncClient + ASGITransport로 직접 호출
+  (middleware, 라우터, 서비스, DB 계층은 실제 코드 그대로)
+- 외부 의존성만 fake로 교체 (fakes.py)
+  - LLM / Retriever / Embeddings → 지연(latency) 설정 가능한 fake
+  - DB → get_db / get_async_db dependency override (기본: 임시 SQLite 파일, --database-url로 변경 가능)
+- 시나리오별 p50/p95/p99 지연, 처리량(RPS), 에러율 리포트
+
+실행 (backend 디렉토리에서)
+    python -m scripts.loadtest --requests 200 --concurrency 16 --llm-latency 0.8
+    python -m scripts.loadtest --scenarios chat,stream,history --json out.json
+
+주의
+- 네트워크 없이 동작해야 하므로 OPENAI_API_KEY가 없으면 더미 값을 사용
+- 모든 요청이 하나의 이벤트 루프에서 처리되므로, 워커 수(gunicorn -w) 비교는
+  실제 서버를 띄운 뒤 별도 도구로 측정해야 함
+"""
+
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from .fakes import FakeChatModel, FakeEmbeddings, FakeRetriever, build_fake_documents
+
+
+@dataclass
+class LoadTestConfig:
+    requests: int = 200           ## 시나리오별 측정 요청 수
+    concurrency: int = 16
+    sessions: int = 20            ## 요청을 나눠 담을 대화 세션 수 (히스토리 누적)
+    warmup: int = 10              ## 측정에서 제외할 사전 요청 수
+    scenarios: Tuple[str, ...] = ("chat", "history")
+    llm_latency: float = 0.8
+    retriever_latency: float = 0.05
+    embedding_latency: float = 0.02
+    documents: int = 5
+    answer_cache: bool = False
+    database_url: Optional[str] = None
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies_ms)
+
+    @property
+    def rps(self) -> float:
+        return self.count / self.elapsed_s if self.elapsed_s else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """nearest-rank 백분위수 (ms)"""
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        rank = max(math.ceil(p / 100 * len(ordered)), 1)
+        return ordered[min(rank, len(ordered)) - 1]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "scenario": self.name,
+            "requests": self.count,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "rps": round(self.rps, 2),
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "max_ms": round(max(self.latencies_ms, default=0.0), 2),
+        }
+
+
+# -----------------------------------------------------------------------------
+# Scenarios: (index, session_id) -> (method, url, httpx request kwargs)
+# -----------------------------------------------------------------------------
+RequestSpec = Tuple[str, str, Dict[str, Any]]
+
+
+def _chat(i: int, sid: str) -> RequestSpec:
+    return "POST", f"/api/chat/{sid}", {"json": {"message": f"전세사기 피해자 결정 신청 방법 {i}"}}
+
+
+def _stream(i: int, sid: str) -> RequestSpec:
+    return "POST", f"/api/chat/{sid}/stream", {"json": {"message": f"전세사기 피해자 지원 내용 {i}"}}
+
+
+def _history(i: int, sid: str) -> RequestSpec:
+    return "GET", f"/api/conversations/{sid}/messages", {"params": {"limit": 50}}
+
+
+SCENARIOS: Dict[str, Callable[[int, str], RequestSpec]] = {
+    "chat": _chat,
+    "stream": _stream,
+    "history": _history,
+}
+
+
+# -----------------------------------------------------------------------------
+# App wiring
+# -----------------------------------------------------------------------------
+@asynccontextmanager
+async def offline_app(config: LoadTestConfig) -> AsyncIterator[Any]:
+    """
+    fake LLM/retriever/embeddings + 전용 DB로 구성한 app.main.app을 제공하고,
+    종료 시 dependency override / 체인 교체를 원복한다.
+    """
+    os.environ.setdefault("OPENAI_API_KEY", "loadtest-offline")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db import get_async_db, get_db, to_async_url
+    from app.main import app
+    from app.models import chat as _chat_models  # noqa: F401  (테이블 등록)
+    from app.models.base import Base
+    from app.repository.history_cache import get_history_cache
+    from app.service import llm_service
+    from app.service.chain_builder import build_rag_chain
+
+    tmpdir = None
+    url = config.database_url
+    if not url:
+        tmpdir = tempfile.TemporaryDirectory(prefix="loadtest-")
+        url = f"sqlite:///{Path(tmpdir.name) / 'loadtest.db'}"
+
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, future=True, connect_args=connect_args)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+    async_engine = create_async_engine(to_async_url(url))
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    def _get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def _get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    chain = build_rag_chain(
+        llm=FakeChatModel(latency=config.llm_latency),
+        retriever=FakeRetriever(
+            documents=build_fake_documents(config.documents),
+            latency=config.retriever_latency,
+        ),
+        embeddings=FakeEmbeddings(size=256, latency=config.embedding_latency),
+    )
+    if not config.answer_cache:
+        chain.answer_cache = None
+
+    ## 실행마다 새 DB를 쓰므로 이전 실행의 히스토리 캐시를 비움
+    get_history_cache().clear()
+
+    original_get_chain = llm_service.get_chain
+    llm_service.get_chain = lambda: chain
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_async_db] = _get_async_db
+    try:
+        yield app
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_async_db, None)
+        llm_service.get_chain = original_get_chain
+        await async_engine.dispose()
+        engine.dispose()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+
+# -----------------------------------------------------------------------------
+# Runner
+# -----------------------------------------------------------------------------
+async def _send(client, spec: RequestSpec) -> bool:
+    """성공 여부 반환 (4xx/5xx, 예외, SSE error 이벤트는 실패)"""
+    method, url, kwargs = spec
+    try:
+        response = await client.request(method, url, **kwargs)
+    except Exception:
+        return False
+    if response.status_code >= 400:
+        return False
+    return "event: error" not in response.text if url.endswith("/stream") else True
+
+
+async def run_scenario(client, name: str, config: LoadTestConfig) -> ScenarioResult:
+    make_request = SCENARIOS[name]
+    ## 시나리오 간 세션 공유 → chat/stream이 쌓은 히스토리를 history 시나리오가 조회
+    sessions = [f"loadtest-{i}" for i in range(config.sessions)]
+
+    for i in range(config.warmup):
+        await _send(client, make_request(i, sessions[i % len(sessions)]))
+
+    result = ScenarioResult(name=name)
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(config.requests):
+        queue.put_nowait(i)
+
+    async def worker() -> None:
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            ok = await _send(client, make_request(i, sessions[i % len(sessions)]))
+            result.latencies_ms.append((time.perf_counter() - start) * 1000)
+            if not ok:
+                result.errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(config.concurrency)))
+    result.elapsed_s = time.perf_counter() - start
+    return result
+
+
+async def run_benchmark(config: LoadTestConfig) -> List[ScenarioResult]:
+    import httpx
+
+    unknown = [s for s in config.scenarios if s not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"unknown scenarios: {unknown} (available: {sorted(SCENARIOS)})")
+
+    results = []
+    async with offline_app(config) as app:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=120) as client:
+            for name in config.scenarios:
+                results.append(await run_scenario(client, name, config))
+    return results
+
+
+def format_report(results: List[ScenarioResult]) -> str:
+    header = f"{'scenario':<10}{'reqs':>7}{'errors':>8}{'err%':>7}{'rps':>9}{'p50ms':>10}{'p95ms':>10}{'p99ms':>10}{'maxms':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        s = r.summary()
+        lines.append(
+            f"{s['scenario']:<10}{s['requests']:>7}{s['errors']:>8}{s['error_rate'] * 100:>6.1f}%"
+            f"{s['rps']:>9.1f}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['max_ms']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> Tuple[LoadTestConfig, Optional[str]]:
+    d = LoadTestConfig()
+    p = argparse.ArgumentParser(prog="python -m scripts.loadtest", description="Offline chat API load test")
+    p.add_argument("--requests", type=int, default=d.requests)
+    p.add_argument("--concurrency", type=int, default=d.concurrency)
+    p.add_argument("--sessions", type=int, default=d.sessions)
+    p.add_argument("--warmup", type=int, default=d.warmup)
+    p.add_argument("--scenarios", default=",".join(d.scenarios), help=f"comma separated: {','.join(SCENARIOS)}")
+    p.add_argument("--llm-latency", type=float, default=d.llm_latency)
+    p.add_argument("--retriever-latency", type=float, default=d.retriever_latency)
+    p.add_argument("--embedding-latency", type=float, default=d.embedding_latency)
+    p.add_argument("--documents", type=int, default=d.documents)
+    p.add_argument("--answer-cache", action="store_true")
+    p.add_argument("--database-url", default=None, help="default: temporary SQLite file")
+    p.add_argument("--json", dest="json_path", default=None, help="write results as JSON")
+    args = p.parse_args(argv)
+
+    config = LoadTestConfig(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        sessions=args.sessions,
+        warmup=args.warmup,
+        scenarios=tuple(s.strip() for s in args.scenarios.split(",") if s.strip()),
+        llm_latency=args.llm_latency,
+        retriever_latency=args.retriever_latency,
+        embedding_latency=args.embedding_latency,
+        documents=args.documents,
+        answer_cache=args.answer_cache,
+        database_url=args.database_url,
+    )
+    return config, args.json_path
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    config, json_path = _parse_args(argv)
+    results = asyncio.run(run_benchmark(config))
+
+    print(format_report(results))
+
+    if json_path:
+        payload = {
+            "config": asdict(config),
+            "results": [r.summary() for r in results],
+        }
+        Path(json_path).write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
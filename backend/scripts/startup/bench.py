@@ -0,0 +1,215 @@
+"""
+scripts/startup/bench.py
+
+app.main 콜드 스타트 벤치마크 (import 시간 / RSS) + 예산(budget.json) 비교
+
+- 새 인터프리터(-X importtime)에서 app.main을 import하고 측정
+  - import 소요 시간(wall) + 패키지별 self 시간 합계 (-X importtime 출력 집계)
+  - import 직후 RSS, 무거운 의존성(deferred_modules)이 로드됐는지
+  - 첫 채팅 요청 후 RSS (scripts.loadtest의 offline fake 구성, 네트워크 없음)
+    → 첫 요청에서 지연 import되는 LangChain/OpenAI 스택까지 포함한 worker 1개 메모리
+- --check: budget.json을 넘거나 deferred_modules가 import 시점에 로드되면 exit 1
+
+실행 (backend 디렉토리에서)
+    python -m scripts.startup
+    python -m scripts.startup --runs 5 --top 15 --json startup.json --check
+
+주의
+- 첫 실행은 .pyc 생성/디스크 캐시 때문에 느림 → 여러 번(--runs) 측정해 중앙값 사용
+- 예산은 CI/개발 머신 기준 여유를 둔 값. 실제 머신에서 측정한 값으로 budget.json을 갱신해 사용
+"""
+
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+BUDGET_PATH = Path(__file__).resolve().parent / "budget.json"
+TARGET_MODULE = "app.main"
+
+
+# -----------------------------------------------------------------------------
+# Child process (측정 대상 인터프리터)
+# -----------------------------------------------------------------------------
+def _rss_mb() -> float:
+    import psutil
+
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def _child(deferred: List[str]) -> Dict[str, Any]:
+    import asyncio
+    import time
+
+    os.environ.setdefault("OPENAI_API_KEY", "startup-bench-offline")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["WARMUP_ENABLED"] = "false"
+
+    ## psutil은 측정 전에 로드 (측정값에 포함되지 않게)
+    _rss_mb()
+
+    start = time.perf_counter()
+    ## importlib.import_module은 -X importtime 트리에 target 행을 남기지 않음 → __import__ 사용
+    __import__(TARGET_MODULE)
+    import_ms = (time.perf_counter() - start) * 1000
+    rss_after_import = _rss_mb()
+    loaded = sorted(m for m in deferred if m in sys.modules)
+
+    async def first_request() -> int:
+        import httpx
+
+        from scripts.loadtest.runner import LoadTestConfig, offline_app
+
+        config = LoadTestConfig(llm_latency=0.0, retriever_latency=0.0, embedding_latency=0.0)
+        async with offline_app(config) as app:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                response = await client.post("/api/chat/startup-bench", json={"message": "전세사기 피해 신청"})
+                return response.status_code
+
+    status = asyncio.run(first_request())
+
+    return {
+        "import_ms": import_ms,
+        "rss_after_import_mb": rss_after_import,
+        "rss_after_first_request_mb": _rss_mb(),
+        "first_request_status": status,
+        "deferred_loaded_at_import": loaded,
+    }
+
+
+# -----------------------------------------------------------------------------
+# -X importtime 집계
+# -----------------------------------------------------------------------------
+def parse_importtime(stderr: str, target: str = TARGET_MODULE) -> Dict[str, float]:
+    """
+    target import 하위 트리의 self 시간(ms)을 최상위 패키지별로 합산
+    (출력은 자식 → 부모 순서, 이름 앞 공백 2칸 = 깊이 1)
+    """
+    rows: List[Tuple[int, str, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_col, _, name = line[len("import time:"):].split("|", 2)
+        self_us = int(self_col)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((depth, name.strip(), self_us))
+
+    end = next((i for i, (depth, name, _) in enumerate(rows) if depth == 0 and name == target), None)
+    if end is None:
+        return {}
+
+    begin = end
+    while begin > 0 and rows[begin - 1][0] > 0:
+        begin -= 1
+
+    totals: Dict[str, float] = defaultdict(float)
+    for _, name, self_us in rows[begin:end + 1]:
+        totals[name.split(".")[0]] += self_us / 1000
+    return dict(sorted(totals.items(), key=lambda kv: kv[1], reverse=True))
+
+
+def _run_child(deferred: List[str]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    env = {**os.environ, "PYTHONPATH": str(BACKEND_DIR)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "scripts.startup.bench", "--child", json.dumps(deferred)],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"startup benchmark child failed:\n{proc.stderr[-4000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1]), parse_importtime(proc.stderr)
+
+
+# -----------------------------------------------------------------------------
+# Report / budget
+# -----------------------------------------------------------------------------
+METRICS = ("import_ms", "rss_after_import_mb", "rss_after_first_request_mb")
+
+
+def load_budget(path: Path = BUDGET_PATH) -> Dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def run_benchmark(runs: int = 3, budget: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    budget = budget or load_budget()
+    deferred = list(budget.get("deferred_modules", []))
+
+    samples = [_run_child(deferred) for _ in range(max(runs, 1))]
+    results = [s[0] for s in samples]
+
+    summary = {m: statistics.median(r[m] for r in results) for m in METRICS}
+    summary["deferred_loaded_at_import"] = sorted({m for r in results for m in r["deferred_loaded_at_import"]})
+    summary["first_request_status"] = results[-1]["first_request_status"]
+
+    ## 패키지별 breakdown은 마지막 실행 기준 (캐시가 가장 따뜻한 상태)
+    return {"summary": summary, "packages_ms": samples[-1][1], "runs": results}
+
+
+def check_budget(summary: Dict[str, Any], budget: Dict[str, Any]) -> List[str]:
+    """예산 위반 목록 (비어 있으면 통과)"""
+    violations = [
+        f"{m}={summary[m]:.1f} > budget {budget[m]}"
+        for m in METRICS
+        if m in budget and summary[m] > budget[m]
+    ]
+    if summary["deferred_loaded_at_import"]:
+        violations.append(f"loaded at import: {', '.join(summary['deferred_loaded_at_import'])}")
+    if summary["first_request_status"] != 200:
+        violations.append(f"first request status={summary['first_request_status']}")
+    return violations
+
+
+def format_report(result: Dict[str, Any], budget: Dict[str, Any], top: int = 10) -> str:
+    summary = result["summary"]
+    lines = [f"{'metric':<30}{'median':>12}{'budget':>12}", "-" * 54]
+    for m in METRICS:
+        lines.append(f"{m:<30}{summary[m]:>12.1f}{str(budget.get(m, '-')):>12}")
+    lines.append(f"{'deferred loaded at import':<30}{', '.join(summary['deferred_loaded_at_import']) or 'none':>12}")
+    lines.append("")
+    lines.append(f"top {top} packages by self import time (-X importtime, ms)")
+    for name, ms in list(result["packages_ms"].items())[:top]:
+        lines.append(f"  {name:<28}{ms:>10.1f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    p = argparse.ArgumentParser(prog="python -m scripts.startup", description="app.main cold start benchmark")
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--top", type=int, default=10)
+    p.add_argument("--budget", default=str(BUDGET_PATH))
+    p.add_argument("--json", dest="json_path", default=None, help="write results as JSON")
+    p.add_argument("--check", action="store_true", help="exit 1 if the budget is exceeded")
+    p.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = p.parse_args(argv)
+
+    if args.child is not None:
+        print(json.dumps(_child(json.loads(args.child))))
+        return
+
+    budget = load_budget(Path(args.budget))
+    result = run_benchmark(args.runs, budget)
+    print(format_report(result, budget, args.top))
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    violations = check_budget(result["summary"], budget)
+    if violations:
+        print("\nbudget exceeded:\n  " + "\n  ".join(violations))
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from app.core.admission import AdmissionController, Overloaded
+from app.core.metrics import ADMISSION_REJECTED, Gauge
+
+
+def test_excess_load_is_rejected_fast_and_slots_are_handed_over_in_order():
+    async def main():
+        controller = AdmissionController(max_concurrent=1, max_queue=1, max_wait=1.0, pool="t1")
+        order = []
+
+        first = await controller.acquire()
+
+        async def queued():
+            with await controller.acquire():
+                order.append("queued")
+
+        task = asyncio.create_task(queued())
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 1
+
+        with pytest.raises(Overloaded) as full:
+            await controller.acquire()
+
+        first.release()
+        first.release()  ## 중복 반납은 무시
+        await task
+        return full.value, order, controller.in_flight
+
+    full, order, in_flight = asyncio.run(main())
+
+    assert (full.reason, full.status_code) == ("queue_full", 429)
+    assert full.retry_after >= 1
+    assert order == ["queued"]
+    assert in_flight == 0
+    assert ADMISSION_REJECTED.value("t1", "queue_full") == 1
+
+
+def test_queue_wait_is_bounded():
+    async def main():
+        controller = AdmissionController(max_concurrent=1, max_queue=4, max_wait=0.05, pool="t2")
+        held = await controller.acquire()
+        with pytest.raises(Overloaded) as timeout:
+            await controller.acquire()
+        held.release()
+        return timeout.value, controller
+
+    timeout, controller = asyncio.run(main())
+
+    assert (timeout.reason, timeout.status_code) == ("queue_timeout", 503)
+    assert controller.queue_depth == 0 and controller.in_flight == 0
+
+
+def test_gauge_renders_current_value():
+    g = Gauge("t_depth", "test", ("pool",))
+    g.set(3, "llm")
+    g.dec("llm")
+
+    assert 't_depth{pool="llm"} 2.0' in g.render()
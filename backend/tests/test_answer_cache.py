@@ -0,0 +1,143 @@
+import json
+
+from app.service.answer_cache import AnswerCache, normalize_question
+
+
+RESULT = {"answer": "답변 ⟦1⟧", "sources": [{"id": 1, "chunk_id": "law_1.docx::a::0"}]}
+
+
+def _cache(tmp_path, **kwargs):
+    manifest = tmp_path / "index_manifest.json"
+    if not manifest.exists():
+        manifest.write_text(json.dumps({"law_1.docx": {"sha256": "a" * 64}}), encoding="utf-8")
+    opts = {"max_entries": 8, "ttl_seconds": 60, "threshold": 0.95}
+    opts.update(kwargs)
+    return AnswerCache(manifest_path=str(manifest), **opts)
+
+
+def test_normalize_question_ignores_spacing_and_punctuation():
+    assert normalize_question(" 전세사기  피해자 신청 절차? ") == normalize_question("전세사기 피해자 신청 절차")
+
+
+def test_exact_hit_without_vector(tmp_path):
+    cache = _cache(tmp_path)
+    cache.store("신청 절차?", [1.0, 0.0], RESULT)
+
+    assert cache.lookup("신청 절차")["answer"] == RESULT["answer"]
+
+
+def test_semantic_hit_respects_threshold(tmp_path):
+    cache = _cache(tmp_path)
+    cache.store("신청 절차", [1.0, 0.0], RESULT)
+
+    assert cache.lookup("신청하는 방법", [0.99, 0.05]) is not None
+    assert cache.lookup("보증금 반환", [0.0, 1.0]) is None
+
+
+def test_article_citations_only_match_exactly(tmp_path):
+    cache = _cache(tmp_path)
+    cache.store("전세사기피해자법 제10조 내용", [1.0, 0.0], RESULT)
+
+    ## 조문 번호만 다른 질문은 임베딩이 같아도 miss
+    assert cache.lookup("전세사기피해자법 제12조 내용", [1.0, 0.0]) is None
+    assert cache.lookup("전세사기피해자법 제10조 내용?", [1.0, 0.0]) is not None
+    ## 조문 인용 답변이 일반 질문의 의미 기반 매칭에 쓰이지도 않음
+    assert cache.lookup("피해자 지원 내용", [1.0, 0.0]) is None
+
+
+def test_empty_results_are_not_cached(tmp_path):
+    cache = _cache(tmp_path)
+    cache.store("질문", [1.0, 0.0], {"answer": "", "sources": []})
+
+    assert len(cache) == 0
+
+
+def test_lru_eviction_and_ttl(tmp_path, monkeypatch):
+    cache = _cache(tmp_path, max_entries=2)
+    cache.store("a", None, RESULT)
+    cache.store("b", None, RESULT)
+    cache.lookup("a")
+    cache.store("c", None, RESULT)
+
+    assert cache.lookup("b") is None
+    assert cache.lookup("a") is not None
+
+    import app.service.answer_cache as mod
+    now = mod.time.time()
+    monkeypatch.setattr(mod.time, "time", lambda: now + 3600)
+    assert cache.lookup("a") is None
+
+
+def test_manifest_change_invalidates(tmp_path):
+    cache = _cache(tmp_path)
+    cache.store("질문", [1.0, 0.0], RESULT)
+
+    manifest = tmp_path / "index_manifest.json"
+    manifest.write_text(
+        json.dumps({"law_1.docx": {"sha256": "b" * 64, "pipeline_version": "indexing-v2"}}),
+        encoding="utf-8",
+    )
+    import os
+    st = os.stat(manifest)
+    os.utime(manifest, (st.st_atime, st.st_mtime + 10))
+
+    assert cache.lookup("질문") is None
+
+
+def test_default_manifest_path_does_not_depend_on_cwd(tmp_path, monkeypatch):
+    from app.core.config import INDEX_MANIFEST_PATH
+    from app.service.answer_cache import load_index_version
+
+    ## 서버를 backend/ 밖에서 실행해도 같은 manifest를 읽음
+    monkeypatch.chdir(tmp_path)
+    assert load_index_version(INDEX_MANIFEST_PATH) != ""
+
+
+def test_cacheable_miss_embeds_the_question_once(tmp_path):
+    import asyncio
+
+    from langchain_core.documents import Document
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    from langchain_core.language_models import FakeListChatModel
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.retrievers import BaseRetriever
+
+    from app.service.chain_builder import RagChain
+    from app.service.embeddings_service import CachedQueryEmbeddings
+
+    class CountingEmbeddings(DeterministicFakeEmbedding):
+        calls: int = 0
+
+        def embed_query(self, text):
+            self.calls += 1
+            return super().embed_query(text)
+
+    inner = CountingEmbeddings(size=8)
+    embeddings = CachedQueryEmbeddings(inner, model="m", max_entries=8)
+    docs = [Document(page_content="본문", metadata={"source": "law_1.docx", "chunk_id": "law_1.docx::a::0"})]
+
+    class EmbeddingRetriever(BaseRetriever):
+        ## dense retriever처럼 같은 embeddings 인스턴스로 질의 임베딩
+        def _get_relevant_documents(self, query, *, run_manager):
+            embeddings.embed_query(query)
+            return docs
+
+        async def _aget_relevant_documents(self, query, *, run_manager):
+            await embeddings.aembed_query(query)
+            return docs
+
+    chain = RagChain(
+        prompt=ChatPromptTemplate.from_template("{history}\n{question}\n{context}"),
+        llm=FakeListChatModel(responses=["답변 ⟦1⟧"]),
+        retriever=EmbeddingRetriever(),
+        parser=StrOutputParser(),
+        answer_cache=_cache(tmp_path),
+        embeddings=embeddings,
+    )
+
+    result = asyncio.run(chain.ainvoke({"question": "신청 절차?", "cacheable": True}))
+
+    assert result["sources"]
+    ## 답변 캐시 조회와 검색이 같은 질의 임베딩을 공유 (OpenAI 호출 1회)
+    assert inner.calls == 1
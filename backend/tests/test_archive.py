@@ -0,0 +1,169 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import zstandard
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.chat import Conversation, ConversationArchive, Message
+from app.repository import archive, chat, chat_async
+from app.repository.archive import read_archived_conversation
+from app.repository.history_cache import get_history_cache
+from app.service.archive_service import archive_idle_conversations
+
+
+SOURCES = [{"id": 1, "source": "law_1.docx", "chunk_id": "law_1.docx::aaaaaaaaaaaa::3", "citation": "제10조"}]
+
+
+def _setup(tmp_path):
+    get_history_cache().clear()
+    url = f"sqlite:///{tmp_path / 'chat.db'}"
+    engine = create_engine(url, future=True)
+    Base.metadata.create_all(engine)
+    return url, sessionmaker(bind=engine, future=True)
+
+
+def _seed(Session):
+    ## repository와 같은 naive UTC
+    old = datetime.utcnow() - timedelta(days=400)
+    with Session() as db:
+        chat.append_turn(db, "old", "질문1", "답변1", usage={"model": "m", "prompt_tokens": 10}, sources=SOURCES)
+        chat.append_turn(db, "old", "질문2", "답변2")
+        chat.get_or_create_conversation(db, "old-empty")
+        chat.append_turn(db, "fresh", "질문", "답변")
+        db.execute(update(Conversation).where(Conversation.id.in_(["old", "old-empty"])).values(updated_at=old))
+        db.commit()
+
+
+def test_archive_moves_idle_conversations_to_segments(tmp_path):
+    _, Session = _setup(tmp_path)
+    _seed(Session)
+    archive_dir = tmp_path / "archive"
+
+    with Session() as db:
+        stats = archive_idle_conversations(db, idle_days=30, batch_size=1, directory=str(archive_dir))
+
+    assert (stats.conversations, stats.messages, stats.batches) == (2, 4, 2)
+
+    with Session() as db:
+        assert db.execute(select(Conversation.id)).scalars().all() == ["fresh"]
+        assert db.execute(select(func.count()).select_from(Message)).scalar_one() == 2
+        entry = db.get(ConversationArchive, "old")
+
+    assert entry.message_count == 4
+    conversation, messages = read_archived_conversation(entry.segment, entry.offset, entry.length, str(archive_dir))
+    assert conversation["next_seq"] == 5
+    assert [(m["seq"], m["content"], m["model"]) for m in messages][:2] == [(1, "질문1", None), (2, "답변1", "m")]
+    assert messages[1]["sources"] == SOURCES
+
+    ## frame을 이어 붙인 세그먼트 전체도 일반 zstd 스트림으로 해제 가능
+    with open(archive_dir / entry.segment, "rb") as f:
+        data = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True).read()
+    assert data.count(b'"type": "conversation"') == 2
+
+
+def test_history_api_and_new_turn_restore_archived_conversation(tmp_path, monkeypatch):
+    url, Session = _setup(tmp_path)
+    _seed(Session)
+    archive_dir = tmp_path / "archive"
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", str(archive_dir))
+
+    with Session() as db:
+        archive_idle_conversations(db, idle_days=30, directory=str(archive_dir))
+
+    async def main():
+        engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+        factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        try:
+            async with factory() as db:
+                rows, has_more = await chat_async.list_message_page(db, "old", limit=10)
+                seq = await chat_async.append_turn(db, "old-empty", "다시 질문", "다시 답변")
+            return rows, has_more, seq
+        finally:
+            await engine.dispose()
+
+    rows, has_more, seq = asyncio.run(main())
+
+    assert [r["seq"] for r in rows] == [1, 2, 3, 4] and not has_more
+    assert rows[1]["sources"] == SOURCES
+    assert seq == 1
+
+    with Session() as db:
+        assert db.execute(select(func.count()).select_from(ConversationArchive)).scalar_one() == 0
+        assert db.get(Conversation, "old").next_seq == 5
+
+
+def test_sync_append_restores_archived_conversation(tmp_path, monkeypatch):
+    _, Session = _setup(tmp_path)
+    _seed(Session)
+    archive_dir = tmp_path / "archive"
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", str(archive_dir))
+
+    with Session() as db:
+        archive_idle_conversations(db, idle_days=30, directory=str(archive_dir))
+
+    ## 배치/스크립트의 동기 쓰기도 seq를 1부터 다시 시작하지 않고 아카이브된 메시지에 이어서 할당
+    with Session() as db:
+        seq = chat.append_turn(db, "old", "다시 질문", "다시 답변")
+        msg = chat.append_message(db, "old", "user", "또 질문")
+
+    assert (seq, msg.seq) == (5, 7)
+    with Session() as db:
+        assert db.get(ConversationArchive, "old") is None
+        assert [m.seq for m in chat.list_messages(db, "old", limit=10)] == list(range(1, 8))
+
+
+def test_failed_turn_rolls_back_restore_and_idempotency_record(tmp_path, monkeypatch):
+    import pytest
+
+    from app.models.chat import IdempotencyRecord
+    from app.repository.idempotency import add_idempotency_record
+
+    url, Session = _setup(tmp_path)
+    _seed(Session)
+    archive_dir = tmp_path / "archive"
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", str(archive_dir))
+
+    with Session() as db:
+        archive_idle_conversations(db, idle_days=30, directory=str(archive_dir))
+
+    async def fail(*args, **kwargs):
+        raise RuntimeError("insert failed")
+
+    ## 복원(+ seq 할당) 이후, 커밋 전에 실패
+    monkeypatch.setattr(chat_async, "save_sources", fail)
+
+    async def main():
+        engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+        factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        try:
+            async with factory() as db:
+                await add_idempotency_record(db, "old", "k1", "fp", {"answer": "답변"})
+                with pytest.raises(RuntimeError):
+                    await chat_async.append_turn(db, "old", "다시 질문", "다시 답변")
+                await db.rollback()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+    with Session() as db:
+        assert db.execute(select(func.count()).select_from(IdempotencyRecord)).scalar_one() == 0
+        assert db.get(Conversation, "old") is None
+        assert db.get(ConversationArchive, "old") is not None
+
+
+def test_idle_cutoff_is_compared_as_naive_utc(tmp_path):
+    _, Session = _setup(tmp_path)
+    _seed(Session)
+    ## aware(KST) now도 naive UTC로 바꿔 비교 → 400일 전 대화만 대상, 방금 갱신된 대화는 제외
+    kst_now = datetime.now(timezone(timedelta(hours=9)))
+
+    with Session() as db:
+        stats = archive_idle_conversations(db, idle_days=200, directory=str(tmp_path / "archive"), now=kst_now)
+
+    assert stats.conversations == 2
+    with Session() as db:
+        assert db.execute(select(Conversation.id)).scalars().all() == ["fresh"]
@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.chat import Conversation
+from app.repository.chat import (
+    append_message,
+    append_turn,
+    load_history,
+    update_conversation_summary,
+)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'chat.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autoflush=False)
+    engine.dispose()
+
+
+def test_append_allocates_sequential_seq(session_factory):
+    db = session_factory()
+
+    seqs = [append_message(db, "s1", "user", f"m{i}").seq for i in range(3)]
+
+    assert seqs == [1, 2, 3]
+    assert db.get(Conversation, "s1").next_seq == 4
+
+
+def test_append_without_returning_support(session_factory, monkeypatch):
+    db = session_factory()
+    monkeypatch.setattr(db.get_bind().dialect, "update_returning", False)
+
+    assert [append_message(db, "s1", "user", "m").seq for _ in range(2)] == [1, 2]
+
+
+def test_concurrent_appends_never_collide(session_factory):
+    def append(i):
+        db = session_factory()
+        try:
+            return append_message(db, "s1", "user", f"m{i}").seq
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        seqs = list(pool.map(append, range(40)))
+
+    assert sorted(seqs) == list(range(1, 41))
+
+
+def test_append_turn_creates_conversation_and_writes_pair(session_factory):
+    db = session_factory()
+
+    assert append_turn(db, "s1", "질문", "답변", usage={"model": "m", "prompt_tokens": 10}) == 1
+    assert append_turn(db, "s1", "질문2", "답변2") == 3
+
+    summary, messages = load_history(db, "s1", limit=10)
+    assert summary is None
+    assert [(m.seq, m.role) for m in messages] == [(1, "user"), (2, "assistant"), (3, "user"), (4, "assistant")]
+    assert db.get(Conversation, "s1").next_seq == 5
+
+
+def test_load_history_skips_summarized_messages(session_factory):
+    db = session_factory()
+    for i in range(3):
+        append_turn(db, "s1", f"q{i}", f"a{i}")
+    update_conversation_summary(db, "s1", "요약", upto_seq=4)
+
+    summary, messages = load_history(db, "s1", limit=1)
+    assert summary == "요약"
+    assert [m.seq for m in messages] == [6]
+
+    update_conversation_summary(db, "s1", "요약2", upto_seq=6)
+    assert load_history(db, "s1") == ("요약2", [])
+    assert load_history(db, "missing") == (None, [])
@@ -0,0 +1,52 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.base import Base
+from app.repository import chat_async
+from app.repository.history_cache import get_history_cache
+
+
+def _run(tmp_path, scenario):
+    async def main():
+        get_history_cache().clear()
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'chat.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        try:
+            return await scenario(factory)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_async_append_and_list(tmp_path):
+    async def scenario(factory):
+        async with factory() as db:
+            first = await chat_async.append_message(db, "s1", "user", "질문")
+            seq = await chat_async.append_turn(db, "s1", "질문2", "답변2", usage={"model": "m"})
+            messages = await chat_async.list_messages(db, "s1")
+            summary, history = await chat_async.load_history(db, "s1", limit=2)
+        return first.seq, seq, messages, summary, history
+
+    first_seq, turn_seq, messages, summary, history = _run(tmp_path, scenario)
+
+    assert (first_seq, turn_seq) == (1, 2)
+    assert [(m.seq, m.role, m.model) for m in messages] == [(1, "user", None), (2, "user", None), (3, "assistant", "m")]
+    assert summary is None
+    assert [m.seq for m in history] == [2, 3]
+
+
+def test_async_concurrent_turns_get_distinct_seqs(tmp_path):
+    async def scenario(factory):
+        async def turn(i):
+            async with factory() as db:
+                return await chat_async.append_turn(db, "s1", f"q{i}", f"a{i}")
+
+        return await asyncio.gather(*(turn(i) for i in range(10)))
+
+    seqs = _run(tmp_path, scenario)
+
+    assert sorted(seqs) == list(range(1, 21, 2))
@@ -0,0 +1,78 @@
+import json
+from pathlib import Path
+
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from app.service.citation_lookup import ArticleIndex, CitationRetriever, LawNameResolver
+
+LAW_MAP = json.loads((Path(__file__).resolve().parents[1] / "data" / "law_map.json").read_text(encoding="utf-8"))
+
+
+def _records():
+    chunks = [
+        ("전세사기피해자법", 9, "제9조(피해자 결정) 위원회는 … 제10조에 따른 지원"),
+        ("전세사기피해자법", 10, "제10조(지원대상) ① 다음 각 호의 … 제1항"),
+        ("전세사기피해자법 시행령", 10, "제10조(신청 절차) 시행령 본문"),
+    ]
+    return [
+        (f"id-{i}", {"law_short": law, "article_no": art, "chunk_index": i, "text": text})
+        for i, (law, art, text) in enumerate(chunks)
+    ]
+
+
+class FailingRetriever(BaseRetriever):
+    def _get_relevant_documents(self, query, *, run_manager):
+        raise AssertionError("vector search should be skipped")
+
+
+class StaticRetriever(BaseRetriever):
+    def _get_relevant_documents(self, query, *, run_manager):
+        return [Document(page_content="generic")]
+
+
+def test_parse_resolves_longest_law_name_and_clause():
+    resolver = LawNameResolver(LAW_MAP)
+
+    cq = resolver.parse("전세사기피해자법 시행령 제10조 제1항 알려줘")
+    assert (cq.law_short, cq.article_no, cq.clause_no) == ("전세사기피해자법 시행령", 10, 1)
+
+    assert resolver.parse("전세사기피해자법 제10조").law_short == "전세사기피해자법"
+    assert resolver.parse("보증금 돌려받는 방법") is None
+
+
+def test_article_index_returns_only_matching_article():
+    index = ArticleIndex(_records())
+
+    docs = index.lookup(LawNameResolver(LAW_MAP).parse("전세사기피해자법 제10조"), k=5)
+
+    assert [d.id for d in docs] == ["id-1"]
+    assert docs[0].page_content.startswith("제10조(지원대상)")
+
+
+def test_citation_retriever_skips_vector_search_on_hit():
+    retriever = CitationRetriever(
+        inner=FailingRetriever(),
+        resolver=LawNameResolver(LAW_MAP),
+        article_index=ArticleIndex(_records()),
+    )
+
+    assert [d.id for d in retriever.invoke("전세사기피해자법 시행령 제10조")] == ["id-2"]
+
+
+def test_citation_retriever_falls_back_for_generic_query():
+    retriever = CitationRetriever(
+        inner=StaticRetriever(),
+        resolver=LawNameResolver(LAW_MAP),
+        article_index=ArticleIndex(_records()),
+    )
+
+    assert retriever.invoke("보증금 반환")[0].page_content == "generic"
+
+
+def test_default_law_map_path_does_not_depend_on_cwd(tmp_path, monkeypatch):
+    from app.core.config import LAW_MAP_PATH
+
+    ## 서버를 backend/ 밖에서 실행해도 같은 law_map.json을 읽음
+    monkeypatch.chdir(tmp_path)
+    assert LawNameResolver.load(LAW_MAP_PATH).names == LawNameResolver(LAW_MAP).names
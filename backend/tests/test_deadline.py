@@ -0,0 +1,93 @@
+import asyncio
+import json
+import time
+
+from app.core import config
+from app.core.deadline import Deadline
+from app.service.chain_builder import DEGRADED_NOTICES, TRUNCATED_NOTICE
+from scripts.loadtest.runner import LoadTestConfig, offline_app
+
+
+def _run(monkeypatch, scenario, **latency):
+    import httpx
+
+    monkeypatch.setattr(config, "OPENAI_API_KEY", config.OPENAI_API_KEY or "test")
+    cfg = LoadTestConfig(**{"llm_latency": 0.0, "retriever_latency": 0.0, "embedding_latency": 0.0, **latency})
+
+    async def main():
+        async with offline_app(cfg) as app:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await scenario(client)
+
+    return asyncio.run(main())
+
+
+def _events(text):
+    frames = [f for f in text.split("\n\n") if f]
+    return [(f.split("\n")[0][len("event: "):], json.loads(f.split("\n")[1][len("data: "):])) for f in frames]
+
+
+TIMEOUT = {"X-Request-Timeout-Ms": "400"}
+
+
+def test_client_header_can_only_shorten_the_deadline():
+    assert Deadline.from_header("500", default=40).seconds == 0.5
+    assert Deadline.from_header("600000", default=40).seconds == 40
+    assert Deadline.from_header("abc", default=40).seconds == 40
+
+    deadline = Deadline(10, reserve=1)
+    assert deadline.budget("history") < deadline.budget("retrieval") < deadline.budget("generation") <= 9
+
+
+def test_slow_generation_returns_sources_with_notice(monkeypatch):
+    async def scenario(client):
+        start = time.perf_counter()
+        response = await client.post("/api/chat/s1", json={"message": "질문"}, headers=TIMEOUT)
+        elapsed = time.perf_counter() - start
+        history = (await client.get("/api/conversations/s1/messages")).json()
+        return response, elapsed, history
+
+    response, elapsed, history = _run(monkeypatch, scenario, llm_latency=3.0)
+
+    body = response.json()
+    assert response.status_code == 200 and elapsed < 1.5
+    assert body["degraded"] == "generation"
+    assert body["answer"] == DEGRADED_NOTICES["generation"]
+    assert body["sources"]
+    assert [m["role"] for m in history["messages"]] == ["user", "assistant"]
+
+
+def test_slow_retrieval_returns_notice_without_sources(monkeypatch):
+    async def scenario(client):
+        return await client.post("/api/chat/s1", json={"message": "질문"}, headers=TIMEOUT)
+
+    response = _run(monkeypatch, scenario, retriever_latency=3.0)
+
+    assert response.status_code == 200
+    assert response.json()["degraded"] == "retrieval"
+    assert response.json()["sources"] == []
+
+
+def test_slow_stream_is_truncated_with_notice(monkeypatch):
+    async def scenario(client):
+        return await client.post("/api/chat/s1/stream", json={"message": "질문"}, headers=TIMEOUT)
+
+    response = _run(monkeypatch, scenario, llm_latency=1.5)
+    events = _events(response.text)
+
+    tokens = [data["text"] for event, data in events if event == "token"]
+    done = events[-1]
+    assert events[0][0] == "sources" and events[0][1]["sources"]
+    assert len(tokens) > 1 and tokens[-1] == TRUNCATED_NOTICE
+    assert done[0] == "done" and done[1]["degraded"] == "generation"
+
+
+def test_fast_turn_is_not_degraded(monkeypatch):
+    async def scenario(client):
+        return await client.post("/api/chat/s1", json={"message": "질문"}, headers=TIMEOUT)
+
+    response = _run(monkeypatch, scenario, llm_latency=0.01)
+
+    assert response.status_code == 200
+    assert response.json()["degraded"] is None
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.metrics import EMBEDDING_CACHE_LOOKUPS, render_prometheus
+from app.service.embeddings_service import CachedQueryEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        return [float(len(text)), 1.0, 0.5]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+
+def test_memory_tier_hits_on_repeat_and_whitespace_variants():
+    inner = CountingEmbeddings()
+    emb = CachedQueryEmbeddings(inner, model="m", max_entries=4)
+
+    first = emb.embed_query("전세사기  피해자")
+    second = emb.embed_query(" 전세사기 피해자 ")
+
+    assert first == second
+    assert inner.calls == 1
+    assert emb.stats()["hits_memory"] == 1
+    assert emb.stats()["misses"] == 1
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    path = str(tmp_path / "emb.sqlite")
+    inner = CountingEmbeddings()
+    CachedQueryEmbeddings(inner, model="m", max_entries=4, sqlite_path=path).embed_query("질문")
+
+    emb = CachedQueryEmbeddings(inner, model="m", max_entries=4, sqlite_path=path)
+    assert emb.embed_query("질문") == [2.0, 1.0, 0.5]
+    assert inner.calls == 1
+    assert emb.stats()["hits_disk"] == 1
+
+
+def test_cache_key_includes_model(tmp_path):
+    path = str(tmp_path / "emb.sqlite")
+    inner = CountingEmbeddings()
+    CachedQueryEmbeddings(inner, model="a", max_entries=4, sqlite_path=path).embed_query("질문")
+    CachedQueryEmbeddings(inner, model="b", max_entries=4, sqlite_path=path).embed_query("질문")
+
+    assert inner.calls == 2
+
+
+def test_async_disk_tier_runs_off_the_event_loop_and_is_exported(tmp_path, monkeypatch):
+    path = str(tmp_path / "emb.sqlite")
+    inner = CountingEmbeddings()
+    CachedQueryEmbeddings(inner, model="m", max_entries=4, sqlite_path=path).embed_query("질문")
+    emb = CachedQueryEmbeddings(inner, model="m", max_entries=4, sqlite_path=path)
+
+    threads = []
+    disk_get = emb._disk_get
+    monkeypatch.setattr(emb, "_disk_get", lambda key: threads.append(threading.get_ident()) or disk_get(key))
+    before = EMBEDDING_CACHE_LOOKUPS.value("hit_disk")
+
+    async def main():
+        return await emb.aembed_query("질문"), threading.get_ident()
+
+    vector, loop_thread = asyncio.run(main())
+
+    assert vector == [2.0, 1.0, 0.5]
+    assert inner.calls == 1
+    assert threads and threads[0] != loop_thread
+    assert EMBEDDING_CACHE_LOOKUPS.value("hit_disk") == before + 1
+    assert 'chatbot_embedding_cache_lookups_total{result="hit_disk"}' in render_prometheus()
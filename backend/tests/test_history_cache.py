@@ -0,0 +1,91 @@
+import asyncio
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.base import Base
+from app.repository import chat_async
+from app.repository.history_cache import CachedMessage, HistoryCache, get_history_cache
+
+
+def _messages(*seqs):
+    return [CachedMessage(s, "user" if s % 2 else "assistant", f"m{s}") for s in seqs]
+
+
+def test_ring_buffer_keeps_recent_messages():
+    cache = HistoryCache(max_bytes=1 << 20, max_messages=4)
+    cache.put("s1", None, _messages(1, 2), next_seq=3, complete=True)
+    cache.append("s1", _messages(3, 4, 5, 6))
+
+    summary, messages = cache.get("s1", 4)
+    assert summary is None
+    assert [m.seq for m in messages] == [3, 4, 5, 6]
+    ## 밀려난 메시지가 있으므로 보관 개수보다 많이 요구하면 miss
+    assert cache.get("s1", 5) is None
+
+
+def test_append_with_gap_invalidates():
+    cache = HistoryCache(max_bytes=1 << 20, max_messages=10)
+    cache.put("s1", None, _messages(1, 2), next_seq=3, complete=True)
+    cache.append("s1", _messages(5, 6))
+
+    assert cache.get("s1", 10) is None
+
+
+def test_set_summary_drops_folded_messages():
+    cache = HistoryCache(max_bytes=1 << 20, max_messages=10)
+    cache.put("s1", None, _messages(1, 2, 3, 4), next_seq=5, complete=True)
+    cache.set_summary("s1", "요약", upto_seq=2)
+
+    summary, messages = cache.get("s1", 10)
+    assert summary == "요약"
+    assert [m.seq for m in messages] == [3, 4]
+
+
+def test_memory_cap_evicts_least_recently_used():
+    cache = HistoryCache(max_bytes=2000, max_messages=10)
+    for sid in ("a", "b", "c"):
+        cache.put(sid, None, [CachedMessage(1, "user", "x" * 400)], next_seq=2, complete=True)
+        cache.get("a", 1)
+
+    assert cache.get("a", 1) is not None
+    assert cache.get("b", 1) is None
+    assert cache.stats()["bytes"] <= 2000
+
+
+def test_load_history_reads_through_and_writes_through(tmp_path):
+    async def main():
+        get_history_cache().clear()
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'chat.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        statements = []
+
+        def count(*args):
+            statements.append(args[2])
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+        try:
+            async with factory() as db:
+                await chat_async.append_turn(db, "s1", "질문1", "답변1")
+                await chat_async.load_history(db, "s1", 20)        ## miss → DB
+                await chat_async.append_turn(db, "s1", "질문2", "답변2")
+
+                before = len(statements)
+                summary, history = await chat_async.load_history(db, "s1", 20)   ## hit
+                assert len(statements) == before
+
+                await chat_async.append_message(db, "s1", "user", "외부 경로")
+                _, after_invalidate = await chat_async.load_history(db, "s1", 20)
+            return summary, history, after_invalidate
+        finally:
+            await engine.dispose()
+
+    summary, history, after_invalidate = asyncio.run(main())
+
+    assert summary is None
+    assert [(m.seq, m.role, m.content) for m in history] == [
+        (1, "user", "질문1"), (2, "assistant", "답변1"), (3, "user", "질문2"), (4, "assistant", "답변2"),
+    ]
+    assert [m.seq for m in after_invalidate] == [1, 2, 3, 4, 5]
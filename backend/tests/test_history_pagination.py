@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db import get_async_db
+from app.models.base import Base
+from app.models.chat import Chunk
+from app.repository import chat_async
+from app.routers import history
+
+
+SOURCES = [
+    {"id": 1, "source": "law_1.docx", "chunk_id": "law_1.docx::aaaaaaaaaaaa::3", "citation": "제10조", "page": None},
+    {"id": 2, "source": "law_2.docx", "chunk_id": "", "citation": None, "snippet": "메타데이터 없는 청크"},
+]
+
+
+@pytest.fixture
+def client(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'chat.db'}")
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with factory() as db:
+            for i in range(5):
+                await chat_async.append_turn(db, "s1", f"q{i}", f"a{i}")  ## seq 1..10
+            await chat_async.append_turn(db, "s2", "q", "a", sources=SOURCES)
+            await chat_async.append_turn(db, "s2", "q2", "a2", sources=SOURCES[:1])
+
+    asyncio.run(setup())
+
+    async def _get_db():
+        async with factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(history.router, prefix="/api")
+    app.dependency_overrides[get_async_db] = _get_db
+    app.state.engine = engine
+    yield TestClient(app)
+    asyncio.run(engine.dispose())
+
+
+def test_keyset_pages_cover_history_without_spurious_page(client):
+    url = "/api/conversations/s1/messages"
+
+    first = client.get(url, params={"limit": 4}).json()
+    assert [m["seq"] for m in first["messages"]] == [7, 8, 9, 10]
+    assert first["has_more"] is True
+
+    second = client.get(url, params={"limit": 4, "cursor": first["next_cursor"]}).json()
+    assert [m["seq"] for m in second["messages"]] == [3, 4, 5, 6]
+
+    last = client.get(url, params={"limit": 2, "cursor": second["next_cursor"]}).json()
+    assert [m["seq"] for m in last["messages"]] == [1, 2]
+    assert last["has_more"] is False
+    assert last["next_cursor"] is None
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get("/api/conversations/s1/messages", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+def test_history_returns_persisted_sources_in_one_query(client):
+    statements = []
+    event.listen(client.app.state.engine.sync_engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    body = client.get("/api/conversations/s2/messages").json()
+
+    assert [m["sources"] for m in body["messages"]] == [[], SOURCES, [], SOURCES[:1]]
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 1
+
+
+def test_sources_share_deduplicated_chunks(client):
+    async def count():
+        async with AsyncSession(client.app.state.engine) as db:
+            return (await db.execute(select(func.count()).select_from(Chunk))).scalar_one()
+
+    assert asyncio.run(count()) == 2
@@ -0,0 +1,92 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.base import Base
+from app.repository import chat_async
+from app.repository.history_cache import get_history_cache
+from app.service import history_service, llm_service
+from app.service.history_service import select_history, strip_anchors
+
+
+@pytest.fixture(autouse=True)
+def approximate_tokens(monkeypatch):
+    ## tiktoken 인코딩 다운로드 없이 글자 수 근사치로 계산
+    monkeypatch.setattr(history_service, "_get_encoding", lambda: None)
+
+
+def _msgs(n, size=40):
+    return [
+        SimpleNamespace(seq=i + 1, role="user" if i % 2 == 0 else "assistant", content=f"{i}" * size)
+        for i in range(n)
+    ]
+
+
+def test_strip_anchors():
+    assert strip_anchors("신청 가능합니다 ⟦1⟧⟦3⟧") == "신청 가능합니다"
+
+
+def test_history_within_budget_is_kept_verbatim():
+    window = select_history(_msgs(3), summary=None, budget=1000)
+
+    assert len(window.lines) == 3
+    assert window.to_fold == []
+
+
+def test_overflow_folds_oldest_messages():
+    messages = _msgs(10)
+    window = select_history(messages, summary="요약", budget=300)
+
+    assert window.to_fold == messages[: len(window.to_fold)]
+    assert window.to_fold
+    assert window.lines[-1].endswith("9" * 40)
+    assert sum(len(line) + 1 for line in window.lines) <= 150
+
+
+class RecordingLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def bind(self, **kwargs):
+        return self
+
+    async def ainvoke(self, prompt):
+        self.prompts.append(prompt)
+        return SimpleNamespace(content=f"요약{len(self.prompts)}")
+
+
+def test_fold_includes_unsummarized_messages_older_than_the_history_window(tmp_path):
+    ## 30개 메시지, summary_upto_seq=0 (마이그레이션 직후의 기존 대화) → 조회 창(20개) 밖에 seq 1~10이 남음
+    llm = RecordingLLM()
+
+    async def main():
+        get_history_cache().clear()
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'chat.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        try:
+            async with factory() as db:
+                for i in range(1, 30, 2):
+                    await chat_async.append_turn(db, "s1", f"q{i:02d}".ljust(100, "."), f"a{i + 1:02d}".ljust(100, "."))
+                inputs = await llm_service._build_chain_inputs(db, "질문", "s1", SimpleNamespace(llm=llm))
+            get_history_cache().clear()
+            async with factory() as db:
+                summary, history = await chat_async.load_history(db, "s1", limit=llm_service.HISTORY_LIMIT)
+            return inputs, summary, history
+        finally:
+            await engine.dispose()
+
+    inputs, summary, history = asyncio.run(main())
+
+    folded = "".join(llm.prompts)
+    kept = [m.seq for m in history]
+    ## 요약에 접힌 메시지 + 남은 원문 = 전체 (건너뛴 메시지 없음)
+    for seq in range(1, kept[0]):
+        assert f"{'q' if seq % 2 else 'a'}{seq:02d}" in folded
+    assert kept == list(range(kept[0], 31))
+    assert len(llm.prompts) == 2  ## 창 밖 seq 1~10 → 창 안의 오래된 메시지 순
+    assert summary == "요약2"
+    assert "[이전 대화 요약]\n요약2" in inputs["history"]
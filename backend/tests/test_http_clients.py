@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.core import config
+from app.core.http_clients import (
+    AsyncInstrumentedTransport,
+    InstrumentedTransport,
+    get_async_http_client,
+    get_http_client,
+)
+from app.core.metrics import HTTP_CLIENT_CONNECTIONS, HTTP_CLIENT_IN_FLIGHT, HTTP_CLIENT_REQUESTS
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  ## keep-alive
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_sync_pool_reuses_connections_and_reports_usage():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+
+    transport = InstrumentedTransport(httpx.HTTPTransport(limits=httpx.Limits(max_connections=4)), "t-sync")
+    try:
+        with httpx.Client(transport=transport) as client:
+            for _ in range(3):
+                assert client.get(url).text == "ok"
+
+            with client.stream("GET", url) as response:
+                assert HTTP_CLIENT_IN_FLIGHT.value("t-sync") == 1
+                response.read()
+            assert HTTP_CLIENT_IN_FLIGHT.value("t-sync") == 0
+
+            assert HTTP_CLIENT_CONNECTIONS.value("t-sync", "open") == 1
+            assert HTTP_CLIENT_CONNECTIONS.value("t-sync", "idle") == 1
+            assert HTTP_CLIENT_REQUESTS.value("t-sync", "127.0.0.1", "200") == 4
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_async_transport_failures_release_in_flight():
+    def fail(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    async def main():
+        transport = AsyncInstrumentedTransport(httpx.MockTransport(fail), "t-async")
+        async with httpx.AsyncClient(transport=transport) as client:
+            with pytest.raises(httpx.ConnectError):
+                await client.get("http://api.example.test/")
+
+    asyncio.run(main())
+
+    assert HTTP_CLIENT_IN_FLIGHT.value("t-async") == 0
+    assert HTTP_CLIENT_REQUESTS.value("t-async", "api.example.test", "error") == 1
+
+
+def test_openai_clients_share_the_pools(monkeypatch):
+    from scripts.loadtest.fakes import FakeEmbeddings, FakeRetriever
+    from app.service.chain_builder import build_rag_chain
+
+    monkeypatch.setenv("OPENAI_API_KEY", config.OPENAI_API_KEY or "test")
+    chain = build_rag_chain(retriever=FakeRetriever(documents=[]), embeddings=FakeEmbeddings(size=8))
+
+    assert chain.llm.http_client is get_http_client()
+    assert chain.llm.http_async_client is get_async_http_client()
+    assert get_http_client().timeout.pool == config.HTTP_POOL_TIMEOUT_SECONDS
@@ -0,0 +1,63 @@
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from app.service.lexical_index import HybridRetriever, LexicalIndex, reciprocal_rank_fusion
+from scripts.indexing.lexical import build_lexical_index, char_ngrams
+
+
+def _doc(i, text=""):
+    return Document(
+        page_content=text,
+        metadata={"source": "law_1.docx", "doc_sha": "abcdef", "chunk_index": i},
+    )
+
+
+def _lexical():
+    texts = [
+        "임차인은 보증금 중 일정액을 최우선변제 받을 수 있다.",
+        "제10조(지원대상) 전세사기피해자 결정 신청",
+        "경매 유예 및 정지 신청 절차",
+    ]
+    rows = [
+        {"id": f"law_1.docx::abcdef::{i}", "metadata": {**_doc(i).metadata, "text": t}}
+        for i, t in enumerate(texts)
+    ]
+    return LexicalIndex(build_lexical_index(rows))
+
+
+class StaticRetriever(BaseRetriever):
+    docs: list
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        return self.docs
+
+
+def test_char_ngrams_bigrams_per_word():
+    assert char_ngrams("제10조 최우선변제") == ["제1", "10", "0조", "최우", "우선", "선변", "변제"]
+
+
+def test_bm25_prefers_exact_term():
+    index = _lexical()
+
+    assert index.search("최우선변제 대상", k=1)[0][0] == 0
+    assert index.search("제10조", k=1)[0][0] == 1
+
+
+def test_rrf_merges_and_dedupes():
+    fused = reciprocal_rank_fusion([[_doc(0), _doc(1)], [_doc(2), _doc(1)]], k=3)
+
+    assert [d.metadata["chunk_index"] for d in fused] == [1, 0, 2]
+
+
+def test_hybrid_retriever_adds_lexical_hit():
+    retriever = HybridRetriever(
+        dense=StaticRetriever(docs=[_doc(2, "경매"), _doc(1, "제10조")]),
+        lexical=_lexical(),
+        k=2,
+        lexical_k=2,
+    )
+
+    docs = retriever.invoke("최우선변제")
+
+    assert {d.metadata["chunk_index"] for d in docs} == {0, 2}
+    assert len(docs) == 2
@@ -0,0 +1,103 @@
+import asyncio
+
+import httpx
+
+from app.core import config
+from scripts.loadtest.runner import LoadTestConfig, offline_app
+
+
+def _run(monkeypatch, scenario, llm_latency=0.05):
+    ## app.main import 시 validate_runtime_env 통과용 (실제 OpenAI 호출 없음)
+    monkeypatch.setattr(config, "OPENAI_API_KEY", config.OPENAI_API_KEY or "test")
+    cfg = LoadTestConfig(llm_latency=llm_latency, retriever_latency=0.0, embedding_latency=0.0)
+
+    async def main():
+        async with offline_app(cfg) as app:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await scenario(client)
+
+    return asyncio.run(main())
+
+
+def _history(client, sid):
+    return client.get(f"/api/conversations/{sid}/messages")
+
+
+def test_concurrent_and_later_duplicates_share_one_turn(monkeypatch):
+    async def scenario(client):
+        headers = {"Idempotency-Key": "k1"}
+        body = {"message": "전세사기 피해자 결정 신청 방법"}
+        concurrent = await asyncio.gather(*(
+            client.post("/api/chat/s1", json=body, headers=headers) for _ in range(3)
+        ))
+        later = await client.post("/api/chat/s1", json=body, headers=headers)
+        stream = await client.post("/api/chat/s1/stream", json=body, headers=headers)
+        history = (await _history(client, "s1")).json()
+        return concurrent, later, stream, history
+
+    concurrent, later, stream, history = _run(monkeypatch, scenario)
+
+    answers = {r.json()["answer"] for r in concurrent + [later]}
+    assert all(r.status_code == 200 for r in concurrent) and len(answers) == 1
+    assert later.headers["Idempotent-Replayed"] == "true"
+    assert '"replayed": true' in stream.text
+    assert [m["seq"] for m in history["messages"]] == [1, 2]
+
+
+def test_key_reuse_with_different_message_is_rejected(monkeypatch):
+    async def scenario(client):
+        headers = {"Idempotency-Key": "k1"}
+        first = await client.post("/api/chat/s1", json={"message": "질문 A"}, headers=headers)
+        second = await client.post("/api/chat/s1", json={"message": "질문 B"}, headers=headers)
+        other_session = await client.post("/api/chat/s2", json={"message": "질문 B"}, headers=headers)
+        return first, second, other_session
+
+    first, second, other_session = _run(monkeypatch, scenario)
+
+    assert first.status_code == 200
+    assert second.status_code == 422
+    assert other_session.status_code == 200 and "Idempotent-Replayed" not in other_session.headers
+
+
+def test_degraded_answer_is_not_replayed(monkeypatch):
+    async def scenario(client):
+        body = {"message": "전세사기 피해자 결정 신청 방법"}
+        degraded = await client.post(
+            "/api/chat/s1", json=body, headers={"Idempotency-Key": "k1", "X-Request-Timeout-Ms": "200"}
+        )
+        retry = await client.post("/api/chat/s1", json=body, headers={"Idempotency-Key": "k1"})
+        again = await client.post("/api/chat/s1", json=body, headers={"Idempotency-Key": "k1"})
+        return degraded, retry, again
+
+    degraded, retry, again = _run(monkeypatch, scenario, llm_latency=0.5)
+
+    assert degraded.json()["degraded"] == "generation"
+    ## 재시도는 턴을 다시 실행하고, 정상 응답부터 재생
+    assert "Idempotent-Replayed" not in retry.headers and retry.json()["degraded"] is None
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.json()["answer"] == retry.json()["answer"]
+
+
+def test_stream_persist_failure_ends_with_error_event(monkeypatch):
+    from app.routers import chat as chat_router
+
+    async def broken_append_turn(**kwargs):
+        raise RuntimeError("database is locked")
+
+    async def scenario(client):
+        body = {"message": "전세사기 피해자 결정 신청 방법"}
+        headers = {"Idempotency-Key": "k1"}
+        with monkeypatch.context() as m:
+            m.setattr(chat_router, "append_turn", broken_append_turn)
+            failed = await client.post("/api/chat/s1/stream", json=body, headers=headers)
+        retry = await client.post("/api/chat/s1", json=body, headers=headers)
+        return failed, retry
+
+    failed, retry = _run(monkeypatch, scenario)
+
+    events = [frame.split("\n")[0] for frame in failed.text.split("\n\n") if frame]
+    assert events[0] == "event: sources" and events[-1] == "event: error"
+    assert "event: done" not in events
+    ## 저장 실패한 키는 해제 → 재시도가 턴을 실행
+    assert retry.status_code == 200 and "Idempotent-Replayed" not in retry.headers
@@ -0,0 +1,34 @@
+import asyncio
+
+from app.core import config
+from scripts.loadtest.runner import LoadTestConfig, ScenarioResult, run_benchmark
+
+
+def test_percentiles_use_nearest_rank():
+    result = ScenarioResult(name="t", latencies_ms=[float(i) for i in range(1, 101)], elapsed_s=2.0)
+
+    assert result.percentile(50) == 50.0
+    assert result.percentile(99) == 99.0
+    assert result.rps == 50.0
+
+
+def test_offline_benchmark_runs_without_errors(monkeypatch):
+    ## app.main import 시 validate_runtime_env 통과용 (실제 OpenAI 호출 없음)
+    monkeypatch.setattr(config, "OPENAI_API_KEY", config.OPENAI_API_KEY or "test")
+
+    cfg = LoadTestConfig(
+        requests=6,
+        concurrency=2,
+        sessions=2,
+        warmup=0,
+        scenarios=("chat", "stream", "history"),
+        llm_latency=0.0,
+        retriever_latency=0.0,
+        embedding_latency=0.0,
+    )
+    results = asyncio.run(run_benchmark(cfg))
+
+    assert [r.name for r in results] == ["chat", "stream", "history"]
+    for r in results:
+        assert r.count == 6
+        assert r.errors == 0
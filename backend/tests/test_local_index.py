@@ -0,0 +1,55 @@
+from langchain_core.embeddings import Embeddings
+
+from app.service.local_index import LocalVectorIndex, LocalVectorRetriever
+from scripts.indexing.snapshot import load_snapshot_rows, save_snapshot
+
+
+class KeywordEmbeddings(Embeddings):
+    """질의에 포함된 키워드로 3차원 벡터를 만드는 테스트용 임베딩"""
+
+    def embed_query(self, text):
+        return [float("보증금" in text), float("경매" in text), 0.1]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+
+def _rows():
+    texts = ["보증금 반환 절차", "경매 유예 신청", "기타 조항"]
+    vectors = [[3.0, 0.0, 0.0], [0.0, 2.0, 0.0], [0.0, 0.0, 1.0]]
+    return [
+        {
+            "id": f"law_1.docx::abc::{i}",
+            "values": vec,
+            "metadata": {"source": "law_1.docx", "doc_sha": "abc", "chunk_index": i, "text": text},
+        }
+        for i, (text, vec) in enumerate(zip(texts, vectors))
+    ]
+
+
+def test_snapshot_roundtrip_is_normalized(tmp_path):
+    save_snapshot(str(tmp_path), _rows(), model="m")
+
+    index = LocalVectorIndex.load(str(tmp_path))
+    assert len(index) == 3
+    assert index.model == "m"
+    assert abs(float((index.vectors[0] ** 2).sum()) - 1.0) < 1e-6
+
+    rows = load_snapshot_rows(str(tmp_path))
+    assert [r["id"] for r in rows["law_1.docx"]] == [r["id"] for r in _rows()]
+
+
+def test_local_retriever_ranks_by_similarity(tmp_path):
+    save_snapshot(str(tmp_path), _rows(), model="m")
+    retriever = LocalVectorRetriever(
+        index=LocalVectorIndex.load(str(tmp_path)),
+        embeddings=KeywordEmbeddings(),
+        k=2,
+    )
+
+    docs = retriever.invoke("경매 절차가 궁금해요")
+
+    assert len(docs) == 2
+    assert docs[0].page_content == "경매 유예 신청"
+    assert "text" not in docs[0].metadata
+    assert docs[0].metadata["chunk_index"] == 1
@@ -0,0 +1,40 @@
+from app.core.metrics import (
+    Histogram,
+    clear_request_timings,
+    format_server_timing,
+    stage,
+    start_request_timings,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram("t_seconds", "test", ("stage",), buckets=(0.1, 1.0))
+    h.observe(0.05, "llm")
+    h.observe(0.5, "llm")
+    h.observe(3.0, "llm")
+
+    lines = h.render()
+
+    assert 't_seconds_bucket{stage="llm",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="llm",le="1.0"} 2' in lines
+    assert 't_seconds_bucket{stage="llm",le="+Inf"} 3' in lines
+    assert 't_seconds_count{stage="llm"} 3' in lines
+    assert 't_seconds_sum{stage="llm"} 3.55' in lines
+
+
+def test_stage_accumulates_request_timings():
+    timings = start_request_timings()
+    try:
+        with stage("persist"):
+            pass
+        with stage("persist"):
+            pass
+        with stage("llm"):
+            pass
+    finally:
+        clear_request_timings()
+
+    assert set(timings) == {"persist", "llm"}
+    header = format_server_timing(timings, total_ms=12.34)
+    assert header.startswith("persist;dur=")
+    assert header.endswith("total;dur=12.3")
@@ -0,0 +1,91 @@
+import asyncio
+from functools import lru_cache
+
+import httpx
+
+from app.core import config
+from app.service.warmup_service import Readiness, get_readiness, warm_up
+from scripts.loadtest.runner import LoadTestConfig, offline_app
+
+
+def test_probe_results_are_cached_and_failures_reported():
+    calls = {"db": 0}
+
+    async def db():
+        calls["db"] += 1
+
+    async def broken():
+        raise ConnectionError("refused")
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def main():
+        readiness = Readiness({"db": db, "vector": broken, "llm": slow}, ttl=60, timeout=0.05)
+        await asyncio.gather(readiness.check_all(), readiness.check_all())
+        report = readiness.report(await readiness.check_all())
+        await readiness.check("db", force=True)
+        return report
+
+    report = asyncio.run(main())
+
+    deps = report["dependencies"]
+    assert report["status"] == "not_ready"
+    assert deps["db"]["ok"] and calls["db"] == 2
+    assert deps["vector"]["error"] == "ConnectionError: refused"
+    assert "timed out" in deps["llm"]["error"]
+
+
+def test_informational_probe_failure_keeps_service_ready():
+    async def ok():
+        pass
+
+    async def outage():
+        raise ConnectionError("pinecone unavailable")
+
+    async def main():
+        readiness = Readiness({"database": ok, "retrieval": outage}, informational=("retrieval",))
+        return readiness.report(await readiness.check_all())
+
+    report = asyncio.run(main())
+
+    assert report["status"] == "ready"
+    assert report["dependencies"]["retrieval"] == {
+        "ok": False,
+        "latency_ms": report["dependencies"]["retrieval"]["latency_ms"],
+        "error": "ConnectionError: pinecone unavailable",
+        "required": False,
+    }
+    assert report["dependencies"]["database"]["required"] is True
+
+
+def test_ready_endpoint_turns_ready_after_warm_up(monkeypatch):
+    monkeypatch.setattr(config, "OPENAI_API_KEY", config.OPENAI_API_KEY or "test")
+    get_readiness.cache_clear()
+
+    async def main():
+        from app.db import get_async_engine
+        from app.service import llm_service
+
+        async with offline_app(LoadTestConfig(llm_latency=0.0, retriever_latency=0.0)) as app:
+            ## 실제 get_chain처럼 첫 호출(warm-up) 전까지는 체인이 생성되지 않은 상태
+            llm_service.get_chain = lru_cache(maxsize=1)(llm_service.get_chain)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                before = await client.get("/health/ready")
+                liveness = await client.get("/health")
+                await warm_up()
+                after = await client.get("/health/ready")
+        await get_async_engine().dispose()
+        return before, liveness, after
+
+    try:
+        before, liveness, after = asyncio.run(main())
+    finally:
+        get_readiness.cache_clear()
+
+    assert before.status_code == 503
+    assert liveness.status_code == 200  ## liveness는 warm-up과 무관
+    assert before.json()["dependencies"]["chain"]["ok"] is False
+    assert after.status_code == 200, after.json()
+    assert set(after.json()["dependencies"]) == {"chain", "database", "retrieval"}
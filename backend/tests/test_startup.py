@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from scripts.startup.bench import check_budget, load_budget, parse_importtime
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def test_importing_app_main_defers_heavy_dependencies():
+    ## 다른 테스트가 이미 로드한 모듈과 섞이지 않게 새 인터프리터에서 확인
+    deferred = load_budget()["deferred_modules"]
+    code = (
+        "import json, sys, app.main; "
+        f"print(json.dumps([m for m in {deferred!r} if m in sys.modules]))"
+    )
+    env = {**os.environ, "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "test", "LOG_LEVEL": "WARNING"}
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+
+    assert "langchain_openai" in deferred
+    assert json.loads(proc.stdout.strip().splitlines()[-1]) == []
+
+
+def test_importtime_breakdown_covers_only_the_target_subtree():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       500 |        500 | psutil",
+        "import time:      1000 |       1000 |     sqlalchemy.sql",
+        "import time:      2000 |       3000 |   sqlalchemy",
+        "import time:       300 |        300 |   app.core.config",
+        "import time:       400 |       3700 | app.main",
+    ])
+
+    assert parse_importtime(stderr) == {"sqlalchemy": 3.0, "app": 0.7}
+
+
+def test_budget_violations_are_reported():
+    summary = {
+        "import_ms": 900.0,
+        "rss_after_import_mb": 120.0,
+        "rss_after_first_request_mb": 150.0,
+        "deferred_loaded_at_import": ["langchain_openai"],
+        "first_request_status": 200,
+    }
+    budget = {"import_ms": 1500, "rss_after_import_mb": 90, "rss_after_first_request_mb": 200}
+
+    violations = check_budget(summary, budget)
+
+    assert len(violations) == 2
+    assert violations[0].startswith("rss_after_import_mb=120.0")
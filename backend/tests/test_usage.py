@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from langchain_core.messages import AIMessage
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.chat import Conversation, Message
+from app.repository import usage_async
+from app.repository.usage import aggregate_usage
+from app.service import history_service
+from app.service.usage_service import (
+    TurnUsage,
+    record_embedding_usage,
+    record_llm_usage,
+    track_usage,
+)
+
+
+@pytest.fixture(autouse=True)
+def approximate_tokens(monkeypatch):
+    monkeypatch.setattr(history_service, "_get_encoding", lambda: None)
+
+
+def _ai(prompt, completion, cached=0):
+    return AIMessage(
+        content="ok",
+        usage_metadata={
+            "input_tokens": prompt,
+            "output_tokens": completion,
+            "total_tokens": prompt + completion,
+            "input_token_details": {"cache_read": cached},
+        },
+    )
+
+
+def test_track_usage_accumulates_llm_and_embedding_calls():
+    with track_usage() as usage:
+        record_llm_usage(_ai(1000, 200, cached=400))
+        record_llm_usage(_ai(100, 50))
+        record_llm_usage(AIMessage(content="no usage"))
+        record_embedding_usage("전세사기")
+
+    assert usage.prompt_tokens == 1100
+    assert usage.completion_tokens == 250
+    assert usage.cached_tokens == 400
+    assert usage.embedding_tokens == 4
+
+    ## 컨텍스트 밖 기록은 무시
+    record_llm_usage(_ai(10, 10))
+    assert usage.prompt_tokens == 1100
+
+
+def test_cost_uses_cached_input_price():
+    usage = TurnUsage(model="gpt-4o-mini", prompt_tokens=1_000_000, cached_tokens=500_000, completion_tokens=1_000_000)
+
+    assert usage.cost_usd == pytest.approx(0.5 * 0.15 + 0.5 * 0.075 + 0.60)
+
+
+def _seed(url):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    db.add_all([Conversation(id="a"), Conversation(id="b")])
+    db.add_all(
+        [
+            Message(conversation_id="a", role="user", content="q", seq=1, created_at=datetime(2026, 1, 1)),
+            Message(
+                conversation_id="a", role="assistant", content="x", seq=2, created_at=datetime(2026, 1, 1),
+                model="gpt-4o-mini", prompt_tokens=100, completion_tokens=10, cached_tokens=0,
+                embedding_tokens=5, cost_usd=0.001,
+            ),
+            Message(
+                conversation_id="b", role="assistant", content="y", seq=1, created_at=datetime(2026, 1, 2),
+                model="gpt-4o-mini", prompt_tokens=200, completion_tokens=20, cached_tokens=50,
+                embedding_tokens=0, cost_usd=0.002,
+            ),
+        ]
+    )
+    db.commit()
+    return db
+
+
+def test_aggregate_usage_groups_assistant_turns():
+    db = _seed("sqlite://")
+
+    by_model = aggregate_usage(db, group_by="model")
+    assert len(by_model) == 1
+    assert by_model[0]["turns"] == 2
+    assert by_model[0]["prompt_tokens"] == 300
+    assert by_model[0]["cost_usd"] == pytest.approx(0.003)
+
+    by_day = aggregate_usage(db, group_by="day", since=datetime(2026, 1, 2))
+    assert [str(r["key"]) for r in by_day] == ["2026-01-02"]
+
+    by_session = aggregate_usage(db, group_by="session")
+    assert {r["key"] for r in by_session} == {"a", "b"}
+
+
+def test_async_aggregate_usage_matches_sync(tmp_path):
+    url = f"sqlite:///{tmp_path / 'usage.db'}"
+    expected = aggregate_usage(_seed(url), group_by="model")
+
+    async def main():
+        engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+        try:
+            async with async_sessionmaker(bind=engine)() as db:
+                return await usage_async.aggregate_usage(db, group_by="model")
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(main()) == expected